@@ -7,9 +7,15 @@ class Config:
     DATA_DIR = os.path.join(ROOT_DIR, "data")  # Corrected to point to backend/data
     MODEL_DIR = os.path.join(ROOT_DIR, "models")
     LOG_FILE = os.path.join(ROOT_DIR, "logs", "fraud_detector.log")
+    CACHE_DIR = os.path.join(ROOT_DIR, "cache")  # On-disk columnar training data
+    AUDIT_DIR = os.path.join(ROOT_DIR, "audit")  # Binary audit log segments
 
     # Logging
     LOG_LEVEL = "INFO"
+    LOG_ASYNC = True  # Enqueue records and write them from a background thread
+    LOG_QUEUE_SIZE = 10_000  # Records beyond this are dropped (and counted) instead of blocking
+    LOG_REQUEST_SAMPLE_RATE = 0.01  # Share of per-request INFO lines that are kept
+    LOG_REQUEST_RATE_LIMIT = 50  # Per-request lines per second (below ERROR), per logger
 
     # Data Validation Configurations
     REQUIRED_COLUMNS = {
@@ -20,6 +26,24 @@ class Config:
         "combined_dataset": ["Time", "V1", "V2", "V3", "V4", "Amount", "Class"]
     }
     TARGET_COLUMN = "Class"
+    # Per-column checks used by the compiled validators (backend/app/utils/validator.py) wherever the column
+    # appears, in datasets and live requests. Columns not listed must be numeric and finite.
+    COLUMN_RULES = {
+        "Amount": {"min": 0},
+        "amount": {"min": 0},
+        "Class": {"values": (0, 1)},
+        "isFraud": {"values": (0, 1)},
+        "oldbalanceOrg": {"min": 0},
+        "newbalanceOrig": {"min": 0},
+        "oldbalanceDest": {"min": 0},
+        "newbalanceDest": {"min": 0},
+        "type": {"dtype": "category"},
+        "nameOrig": {"dtype": "string"},
+        "nameDest": {"dtype": "string"},
+    }
+
+    # Training Data Loading
+    LOADER_MEMORY_BUDGET_MB = 512  # Bounds the size of each CSV chunk held in memory
 
     # Model Training Configurations
     TEST_SIZE = 0.2
@@ -27,5 +51,120 @@ class Config:
     SMOTE_RANDOM_STATE = 42
     RF_N_ESTIMATORS = 100
     RF_CLASS_WEIGHT = "balanced"
+    # "smote", "undersample", "class_weight" or "balanced_bootstrap"; see backend/app/trainer/imbalance.py.
+    # SMOTE grows the training matrix to ~2x the majority class; prefer the others on large datasets.
+    IMBALANCE_STRATEGY = "smote"
+    UNDERSAMPLE_RATIO = 0.1  # Minority:majority ratio kept by "undersample"
+    TRAIN_N_JOBS = -1  # Cores used by the final forest fit (-1 = all)
+
+    # Hyperparameter search (trainer --search): successive halving over this grid
+    SEARCH_SPACE = {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [None, 16, 32],
+        "min_samples_leaf": [1, 5],
+        "imbalance": ["class_weight", "smote"],
+    }
+    SEARCH_HALVING_FACTOR = 3  # Keep the best 1/factor candidates per rung, give them factor x more rows
+    SEARCH_VALIDATION_SIZE = 0.2  # Share of the training split held out to rank candidates
+    SEARCH_MAX_WORKERS = os.cpu_count() or 1
+
+    # Offline bulk scoring (python -m backend.app.trainer.bulk_score)
+    BULK_SCORE_WORKERS = os.cpu_count() or 1
+    BULK_SCORE_CHUNK_MB = 32  # Input bytes (CSV) read and scored per task
+    BULK_SCORE_BLOCK_CELLS = 1 << 22  # Rows x trees scored at once within a chunk; bounds each worker's scoring memory
+    BULK_SCORE_IN_FLIGHT_PER_WORKER = 2  # Chunks queued or held per worker; bounds memory and keeps workers busy
+    BULK_SCORE_PROGRESS_SECONDS = 5.0
+
+    # Training profile (trainer --profile): per-stage wall/CPU time and peak RSS, stored in the metadata
+    PROFILE_SAMPLE_INTERVAL_SECONDS = 0.05  # RSS sampling period
+    PROFILE_TOP_ALLOCATIONS = 10  # Source lines listed per stage with --tracemalloc
+    PROFILE_REGRESSION_TOLERANCE = 0.2  # Flag stages >20% slower or bigger than the previous run
+    PROFILE_REGRESSION_MIN_SECONDS = 1.0  # ...and at least this much slower
+    PROFILE_REGRESSION_MIN_MB = 64.0  # ...or at least this much bigger
     VERSION = "1.0.0"
     MODEL_PATH = os.path.join(MODEL_DIR, f"fraud_model_{VERSION}.pkl")
+    METADATA_PATH = os.path.join(MODEL_DIR, f"fraud_model_{VERSION}_metadata.json")
+    PREPROCESSOR_PATH = os.path.join(MODEL_DIR, f"fraud_model_{VERSION}_preprocessor.json")
+    COMPILED_MODEL_PATH = os.path.join(MODEL_DIR, f"fraud_model_{VERSION}.fmodel")  # Memory-mappable artifact directory
+    THRESHOLDS_PATH = os.path.join(MODEL_DIR, f"fraud_model_{VERSION}_thresholds.json")  # Written by the trainer's sweep
+
+    # Serving Configurations
+    BATCH_MAX_ROWS = 100_000  # Upper bound for /api/predict/batch payloads
+    COMPILED_MAX_ROWS = 512  # Larger batches go to the sklearn forest (pickle), faster than the compiled one there
+
+    # Micro-batching of concurrent /api/predict calls
+    BATCHING_ENABLED = True
+    BATCH_MAX_WAIT_MS = 2.0  # Longest a request waits for others to join its batch
+    BATCH_MAX_SIZE = 64  # Rows scored per coalesced model call
+
+    # Streaming channel (WebSocket /api/predict/stream, see backend/app/model/stream.py)
+    STREAM_CREDITS = 1024  # Unanswered transactions a connection may have; more are rejected, not queued
+    STREAM_BATCH_MAX_ROWS = 256  # Rows scored per batch, coalesced across messages
+    STREAM_BATCH_WAIT_MS = 2.0  # Longest a row waits for its batch to fill
+    STREAM_BATCHES_IN_FLIGHT = 4  # Per connection; later rows wait and join a bigger batch
+
+    # Scoring worker pool (keeps sklearn calls off the event loop)
+    SCORING_POOL_MODE = "thread"  # "thread", "process" or "inline"
+    SCORING_POOL_SIZE = os.cpu_count() or 1
+    SCORING_QUEUE_LIMIT = 256  # Jobs queued or running before requests get 503
+    SCORING_RETRY_AFTER_SECONDS = 1
+
+    # Prometheus text metrics at /metrics
+    METRICS_ENABLED = True
+
+    # Model loading and readiness
+    MODEL_LOAD_BACKOFF_SECONDS = 1.0  # First retry delay after a failed load; doubles per failure
+    MODEL_LOAD_BACKOFF_MAX_SECONDS = 60.0
+    WARM_UP_ROWS = 64  # Rows scored at startup before /api/health/ready reports ready
+
+    # Hot model reload (POST /api/admin/model/reload, or watch the metadata file the trainer writes last)
+    MODEL_WATCH_ENABLED = False
+    MODEL_WATCH_INTERVAL_SECONDS = 5.0
+    # Shadow scoring of a candidate model on a sample of live traffic
+    SHADOW_SAMPLE_RATE = 0.1
+    SHADOW_MAX_PENDING = 64  # Queued shadow comparisons before samples are skipped
+
+    # Rules stage from RULES_CONFIG (root config.py), run before the model
+    RULES_ENABLED = True
+
+    # Decision thresholds (see backend/app/model/thresholds.py)
+    THRESHOLDS_RELOAD_SECONDS = 5.0  # How often the thresholds file is checked for changes
+    # Threshold sweep cost: each false block costs this much, each missed fraud its amount
+    THRESHOLD_FALSE_POSITIVE_COST = 10.0
+    THRESHOLD_MISSED_FRAUD_COST = 100.0  # Used when the features carry no Amount
+    THRESHOLD_SWEEP_STEP = 0.01
+    THRESHOLD_VALIDATION_SIZE = 0.2  # Share of the training split held out of the fit to sweep the threshold on
+
+    # Adapter projecting each training source onto the common feature space (backend/app/trainer/harmonize.py);
+    # files not listed are read as card-style data with the FEATURE_SPACE column names and TARGET_COLUMN
+    SOURCE_ADAPTERS = {
+        "PS_20174392719_1491204439457_log.csv": "paysim",
+    }
+    HARMONIZE_BLOCK_ROWS = 1_000_000  # Rows projected at a time when building the combined dataset
+
+    # Per-card velocity features (see backend/app/model/velocity.py)
+    VELOCITY_ENABLED = True
+    # Preallocated card slots, 472 bytes each: the default reserves ~950 MB of virtual memory in every
+    # process that scores (each uvicorn worker), committed only as slots are first used
+    VELOCITY_MAX_CARDS = 2_000_000
+    VELOCITY_TTL_SECONDS = 86400  # Cards idle this long are evicted first once every slot is taken
+    VELOCITY_MERCHANT_SLOTS = 8  # Distinct merchants tracked per card over 24h
+    # Training sources with a card key: velocity columns are rebuilt from their history at load time
+    VELOCITY_SOURCES = {
+        "PS_20174392719_1491204439457_log.csv": {
+            "key": "nameOrig", "time": "step", "time_unit_seconds": 3600,
+            "amount": "amount", "merchant": "nameDest",
+        },
+    }
+
+    # Idempotent /api/predict results for gateway retries (see backend/app/model/result_cache.py)
+    RESULT_CACHE_ENABLED = True
+    RESULT_CACHE_TTL_SECONDS = 600.0  # Retries with the same transaction_id and payload get the first decision
+    RESULT_CACHE_MAX_MB = 64  # Memory cap (~288 bytes per entry in memory, 68 per shared slot)
+    RESULT_CACHE_BACKEND = "memory"  # "memory" (per process) or "shared" (mmap'd file shared by the workers on a host)
+    RESULT_CACHE_PATH = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else CACHE_DIR, "fraud_result_cache.bin")
+
+    # Audit log of every scored transaction (see backend/app/utils/audit_log.py)
+    AUDIT_ENABLED = True
+    AUDIT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+    AUDIT_QUEUE_SIZE = 100_000  # Queued write requests before decisions are dropped (and counted)
@@ -0,0 +1,143 @@
+# backend/app/model/artifact.py
+"""
+Versioned on-disk model format.
+
+An artifact is a directory holding one raw `.npy` file per forest array and a
+`manifest.json` with the format version, model version, array dtypes/shapes,
+classes, and the scaler parameters and feature order used at training time.
+`.npy` data starts on a 64-byte aligned offset, so arrays are opened with
+`np.load(mmap_mode="r")`: loading is a handful of mmap calls regardless of
+forest size, and every worker on the host shares one page-cache copy.
+"""
+import os
+import json
+import shutil
+import hashlib
+import joblib
+import numpy as np
+from typing import Optional, Tuple
+
+from backend.app.model.compiled_forest import CompiledForest, HybridForest, FOREST_ARRAYS
+
+ARTIFACT_FORMAT_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+
+
+def save_artifact(path: str, forest: CompiledForest, scaler_info: dict, model_version: str) -> None:
+    """Write `forest` and its preprocessing parameters to an artifact directory, atomically."""
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    arrays = {}
+    for name in FOREST_ARRAYS:
+        array = np.ascontiguousarray(forest.arrays[name])
+        np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+        arrays[name] = {"file": f"{name}.npy", "dtype": array.dtype.str, "shape": list(array.shape)}
+
+    manifest = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model_version": model_version,
+        "n_estimators": forest.n_estimators,
+        "n_nodes": forest.n_nodes,
+        "max_depth": forest.max_depth,
+        "classes": forest.classes_.tolist(),
+        "scaler": scaler_info,
+        "arrays": arrays,
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    # Swap the finished directory into place so readers never see a partial artifact
+    old_path = f"{path}.old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA256 of a file, read in chunks so large pickles are never held in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_digest(path: str) -> str:
+    """SHA256 over every file of an artifact directory, in name order."""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        digest.update(name.encode("utf-8"))
+        digest.update(bytes.fromhex(file_sha256(os.path.join(path, name))))
+    return digest.hexdigest()
+
+
+def read_manifest(path: str) -> dict:
+    """Read and check the manifest of an artifact directory."""
+    with open(os.path.join(path, MANIFEST_FILE), "r") as f:
+        manifest = json.load(f)
+    version = manifest.get("format_version")
+    if version != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact format version: {version}")
+    return manifest
+
+
+def load_artifact(path: str, mmap: bool = True) -> Tuple[CompiledForest, dict]:
+    """
+    Open an artifact directory. With `mmap=True` (the default) the forest arrays
+    are read-only memory maps; nothing is copied into process memory.
+    """
+    manifest = read_manifest(path)
+    arrays = {}
+    for name, spec in manifest["arrays"].items():
+        array = np.load(os.path.join(path, spec["file"]), mmap_mode="r" if mmap else None)
+        if array.dtype.str != spec["dtype"] or list(array.shape) != spec["shape"]:
+            raise ValueError(f"Array '{name}' in {path} does not match its manifest entry")
+        arrays[name] = array
+    forest = CompiledForest(arrays, manifest["classes"], manifest["max_depth"])
+    return forest, manifest
+
+
+def estimator_path(path: str) -> str:
+    """The trainer's pickle next to an artifact directory (fraud_model_<version>.pkl for .fmodel)."""
+    return os.path.splitext(path.rstrip(os.sep))[0] + ".pkl"
+
+
+def recorded_estimator_sha256(path: str) -> Optional[str]:
+    """The pickle's SHA256 from the trainer's metadata next to an artifact directory, if recorded."""
+    metadata_path = os.path.splitext(path.rstrip(os.sep))[0] + "_metadata.json"
+    try:
+        with open(metadata_path, "r") as f:
+            return json.load(f).get("hash")
+    except (OSError, ValueError):
+        return None
+
+
+def open_model(path: str, estimator_sha256: Optional[str] = None):
+    """
+    Open a model for scoring: a joblib pickle, or an artifact directory wrapped
+    in a HybridForest that hands large batches to the pickle next to it. The
+    trainer rewrites that pickle in place, so it is only paired with the
+    artifact against a SHA256 taken now (`estimator_sha256`, else the one in
+    the trainer's metadata) and checked again when it is loaded on first use:
+    a pickle from a later training run is rejected, never mixed in.
+    """
+    if not os.path.isdir(path):
+        # The trainer writes the pickle with joblib.dump, which plain pickle cannot read
+        return joblib.load(path)
+    compiled, _ = load_artifact(path)
+    pickle_path = estimator_path(path)
+    expected = estimator_sha256 or recorded_estimator_sha256(path)
+    if not os.path.exists(pickle_path) or expected is None:
+        return HybridForest(compiled)
+
+    def load_estimator():
+        actual = file_sha256(pickle_path)
+        if actual != expected:
+            raise ValueError(f"SHA256 mismatch for {pickle_path}: expected {expected}, got {actual}")
+        return joblib.load(pickle_path)
+
+    return HybridForest(compiled, load_estimator)
@@ -0,0 +1,138 @@
+# backend/app/model/batcher.py
+import asyncio
+import time
+import numpy as np
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from backend.app.config import Config
+from backend.app.utils.logger import get_logger
+from backend.app.utils.metrics import Histogram
+
+logger = get_logger("MicroBatcher")
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+QUEUE_WAIT_MS_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row scoring requests into one matrix.
+
+    Callers `await submit(row)`; a background task drains the queue, waiting at
+    most `max_wait_ms` after the first row or until `max_batch` rows are queued,
+    scores them with one `await score_fn(X)` call and resolves each caller's
+    future with its own probability. Batches are dispatched without waiting for
+    the previous one, so a worker pool behind `score_fn` can run several at once.
+    """
+
+    def __init__(
+        self,
+        score_fn: Callable[[np.ndarray], Awaitable[np.ndarray]],
+        max_wait_ms: float = Config.BATCH_MAX_WAIT_MS,
+        max_batch: int = Config.BATCH_MAX_SIZE,
+    ):
+        self.score_fn = score_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self.batch_size_hist = Histogram("batch_size", BATCH_SIZE_BUCKETS)
+        self.queue_wait_hist = Histogram("queue_wait_ms", QUEUE_WAIT_MS_BUCKETS)
+        self._pending: List[Tuple[np.ndarray, float, asyncio.Future]] = []
+        self._has_items: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        if self._worker is not None and self._worker.done() and not self._worker.cancelled():
+            logger.error(f"Micro-batch worker stopped, restarting: {self._worker.exception()!r}")
+        if self._loop is not loop:
+            # Rows queued on another (finished) loop can't be scored here; fail them so no caller hangs
+            self._fail_pending(RuntimeError("Micro-batcher restarted on a new event loop"))
+        # Rows queued on this loop while the worker was down go to the new worker
+        self._loop = loop
+        self._has_items = asyncio.Event()
+        self._full = asyncio.Event()
+        if self._pending:
+            self._has_items.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        self._worker = loop.create_task(self._run())
+
+    def _fail_pending(self, error: Exception) -> None:
+        pending, self._pending = self._pending, []
+        for _, _, future in pending:
+            if future.done():
+                continue
+            try:
+                future.set_exception(error)
+            except RuntimeError:
+                pass  # Its loop is closed, so nobody is awaiting it
+
+    async def submit(self, row: np.ndarray) -> float:
+        """Queue one feature row and wait for its fraud probability."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._pending.append((row, time.perf_counter(), future))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[np.ndarray, float, asyncio.Future]]:
+        await self._has_items.wait()
+        if len(self._pending) < self.max_batch:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+
+        items = self._pending[:self.max_batch]
+        self._pending = self._pending[self.max_batch:]
+        if not self._pending:
+            self._has_items.clear()
+        if len(self._pending) < self.max_batch:
+            self._full.clear()
+        return items
+
+    async def _run(self) -> None:
+        while True:
+            items = await self._next_batch()
+            started = time.perf_counter()
+            self.batch_size_hist.observe(len(items))
+            for _, enqueued, _ in items:
+                self.queue_wait_hist.observe((started - enqueued) * 1000.0)
+
+            task = self._loop.create_task(self._score(items))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _score(self, items: List[Tuple[np.ndarray, float, asyncio.Future]]) -> None:
+        try:
+            probabilities = await self.score_fn(np.vstack([row for row, _, _ in items]))
+        except Exception as e:
+            logger.error(f"Batched scoring failed for {len(items)} rows: {e}")
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), probability in zip(items, probabilities):
+            if not future.done():
+                future.set_result(float(probability))
+
+    @property
+    def queued(self) -> int:
+        """Rows waiting for their batch to be dispatched."""
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        return {
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch": self.max_batch,
+            "batch_size": self.batch_size_hist.snapshot(),
+            "queue_wait_ms": self.queue_wait_hist.snapshot(),
+        }
@@ -0,0 +1,193 @@
+# backend/app/model/compiled_forest.py
+import threading
+import numpy as np
+from typing import Callable, Optional
+
+from backend.app.config import Config
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("CompiledForest")
+
+LEAF_CHECK_INTERVAL = 4
+BLOCK_SLOTS = 1 << 19  # (row, tree) pairs traversed at once; ~5k rows of a 100-tree forest
+
+# Arrays that make up a compiled forest, in the dtypes traversal expects
+FOREST_ARRAYS = {
+    "feature2": np.intp,
+    "threshold2": np.float64,
+    "children2": np.intp,
+    "is_leaf2": np.bool_,
+    "value": np.float64,
+    "roots": np.intp,
+}
+
+
+class CompiledForest:
+    """
+    A RandomForestClassifier flattened into contiguous node arrays.
+
+    All trees share one set of arrays; `roots[t]` is the first node of tree t.
+    Node tables are indexed by doubled node id (2 * node) so the child lookup
+    is a single take: `children2[2 * node + go_right] == 2 * child`.
+    Leaves point back to themselves with an infinite threshold, so traversal is
+    a branch-free gather step over every (row, tree) pair still in flight.
+    Inputs are walked in blocks of about BLOCK_SLOTS pairs, so working memory
+    stays bounded whatever the batch size. `predict_proba` matches sklearn's
+    output within float tolerance.
+
+    Arrays are used as given (no copies), so memory-mapped arrays stay shared.
+    """
+
+    def __init__(self, arrays: dict, classes, max_depth: int):
+        for name, dtype in FOREST_ARRAYS.items():
+            if arrays[name].dtype != dtype:
+                raise ValueError(f"Array '{name}' has dtype {arrays[name].dtype}, expected {np.dtype(dtype)}")
+        self.arrays = arrays
+        self._feature2 = arrays["feature2"]
+        self._threshold2 = arrays["threshold2"]
+        self._children2 = arrays["children2"]
+        self._is_leaf2 = arrays["is_leaf2"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.classes_ = np.asarray(classes)
+        self.max_depth = int(max_depth)
+        self.n_estimators = len(self.roots)
+        self.n_nodes = len(self.value)
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "CompiledForest":
+        """Flatten the fitted trees of a binary RandomForestClassifier."""
+        if len(forest.classes_) != 2:
+            raise ValueError("Only binary classifiers can be compiled")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.intp) + offset
+            is_leaf = tree.children_left == -1
+
+            counts = tree.value[:, 0, :]
+            proba = counts[:, 1] / counts.sum(axis=1)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            values.append(proba)
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        threshold = np.concatenate(thresholds)
+        arrays = {
+            "feature2": np.repeat(np.concatenate(features), 2).astype(np.intp),
+            "threshold2": np.repeat(threshold, 2).astype(np.float64),
+            "children2": 2 * np.column_stack([np.concatenate(lefts), np.concatenate(rights)]).ravel().astype(np.intp),
+            "is_leaf2": np.repeat(np.isinf(threshold), 2),
+            "value": np.concatenate(values).astype(np.float64),
+            "roots": np.array(roots, dtype=np.intp),
+        }
+        return cls(arrays, forest.classes_, max_depth)
+
+    def _leaf_nodes(self, X: np.ndarray) -> np.ndarray:
+        # sklearn compares float32 inputs against float64 thresholds; round to
+        # float32 first, then widen so the comparison needs no per-step cast
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        n_rows, n_features = X.shape
+        flat_x = X.astype(np.float64).ravel()
+
+        # One slot per (row, tree); slots are dropped from the working set once
+        # they reach a leaf so deep trees do not slow down shallow ones.
+        leaves = np.tile(2 * self.roots, n_rows)
+        nodes = leaves.copy()
+        slots = np.arange(nodes.size)
+        x_offsets = None
+        if n_rows > 1:
+            x_offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, self.n_estimators)
+
+        step = 0
+        while nodes.size:
+            features = self._feature2.take(nodes)
+            if x_offsets is not None:
+                features += x_offsets
+            go_right = flat_x.take(features) > self._threshold2.take(nodes)
+            nodes = self._children2.take(nodes + go_right)
+            step += 1
+            if step % LEAF_CHECK_INTERVAL == 0 or step >= self.max_depth:
+                done = self._is_leaf2.take(nodes)
+                if done.any():
+                    leaves[slots[done]] = nodes[done]
+                    active = ~done
+                    nodes, slots = nodes[active], slots[active]
+                    if x_offsets is not None:
+                        x_offsets = x_offsets[active]
+        return (leaves >> 1).reshape(n_rows, self.n_estimators)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities in `classes_` order, shape (n_rows, 2)."""
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        block = max(1, BLOCK_SLOTS // self.n_estimators)
+        positive = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), block):
+            leaves = self._leaf_nodes(X[start:start + block])
+            positive[start:start + block] = self.value.take(leaves).mean(axis=1)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+
+    def __repr__(self) -> str:
+        return f"CompiledForest(n_estimators={self.n_estimators}, n_nodes={self.n_nodes}, max_depth={self.max_depth})"
+
+
+class HybridForest:
+    """
+    Scores batches of up to `max_compiled_rows` rows with a CompiledForest and
+    larger ones with the sklearn forest it was compiled from, whose Cython
+    traversal is faster on big inputs. The sklearn forest is loaded by
+    `load_estimator()` on the first large batch (or by `estimator()`); when
+    there is none, or it fails to load, the compiled forest scores everything.
+    """
+
+    def __init__(self, compiled: CompiledForest, load_estimator: Optional[Callable] = None,
+                 max_compiled_rows: int = Config.COMPILED_MAX_ROWS):
+        self.compiled = compiled
+        self.classes_ = compiled.classes_
+        self.n_estimators = compiled.n_estimators
+        self.max_compiled_rows = max_compiled_rows
+        self._load_estimator = load_estimator
+        self._estimator = None
+        self._lock = threading.Lock()
+
+    def estimator(self):
+        """The sklearn forest, loaded once; None if there is none."""
+        if self._estimator is None and self._load_estimator is not None:
+            with self._lock:
+                if self._estimator is None and self._load_estimator is not None:
+                    try:
+                        self._estimator = self._load_estimator()
+                    except Exception as e:
+                        logger.error(f"❌ Large batches stay on the compiled forest; sklearn forest unavailable: {e}")
+                    self._load_estimator = None
+        return self._estimator
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if len(np.atleast_2d(X)) > self.max_compiled_rows:
+            estimator = self.estimator()
+            if estimator is not None:
+                return estimator.predict_proba(X)
+        return self.compiled.predict_proba(X)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+
+    def __repr__(self) -> str:
+        return f"HybridForest({self.compiled!r}, max_compiled_rows={self.max_compiled_rows})"
@@ -0,0 +1,31 @@
+# backend/app/model/features.py
+"""
+The feature space every model is trained and served on.
+
+Training sources are projected onto `FEATURE_SPACE` by the adapters in
+backend/app/trainer/harmonize.py; serving and bulk scoring build the same
+columns from requests. Rows that cannot provide a feature get `fill_value`:
+0 for the V columns (centred PCA components) and the transfer features, and
+the "no history" value for velocity features (no recent transactions, last
+one at least `Config.VELOCITY_TTL_SECONDS` ago).
+"""
+from config import MODEL_CONFIG
+from backend.app.config import Config
+from backend.app.model.velocity import VELOCITY_FEATURES
+
+CARD_FEATURES = list(MODEL_CONFIG["expected_features"])
+TRANSFER_FEATURES = [
+    "type_code",            # 1 + PaySim type category code; 0 when the source has no type
+    "orig_balance_delta",   # newbalanceOrig - oldbalanceOrg
+    "dest_balance_delta",   # newbalanceDest - oldbalanceDest
+    "orig_balance_error",   # oldbalanceOrg - amount - newbalanceOrig
+    "dest_balance_error",   # oldbalanceDest + amount - newbalanceDest
+]
+FEATURE_SPACE = CARD_FEATURES + TRANSFER_FEATURES + VELOCITY_FEATURES
+
+
+def fill_value(feature: str) -> float:
+    """Constant for `feature` in rows whose source can't provide it."""
+    if feature == "card_seconds_since_last":
+        return float(Config.VELOCITY_TTL_SECONDS)
+    return 0.0
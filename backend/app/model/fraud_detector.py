@@ -1,45 +1,561 @@
 import os
-import pickle
+import json
+import time
+import asyncio
+import threading
 import numpy as np
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from backend.app.utils.logger import get_logger
-from backend.app.utils.preprocessing import preprocess_data
-from backend.app.utils.validator import validate_dataframe
+from backend.app.utils.logger import get_logger, get_request_logger
+from backend.app.utils.preprocessing import FittedPreprocessor
 from backend.app.config import Config
 from backend.app.utils.security import verify_token
+from backend.app.model.batcher import MicroBatcher
+from backend.app.model.artifact import load_artifact, open_model, read_manifest, save_artifact
+from backend.app.model.compiled_forest import CompiledForest, HybridForest
+from backend.app.model.worker_pool import ScoringPool, ScoringPoolFull
+from backend.app.utils.audit_log import AuditLog
+from backend.app.model.velocity import VelocityStore, VELOCITY_FEATURES
+from backend.app.model.rules import RulesEngine, rule_columns, UNDECIDED
+from backend.app.model.thresholds import ThresholdPolicy
+from backend.app.model.result_cache import ResultCache, result_key
+from backend.app.utils.metrics import REGISTRY, NULL_STAGE_TIMER, StageTimer
+from backend.app.model.hot_reload import (
+    ModelBundle, ModelValidationError, ModelWatcher, ReloadInProgress, ShadowScorer, load_bundle,
+)
 
 
 # --- Constants & Globals ---
 _model = None
+_metadata = None
+_preprocessor = None
+_model_version = None  # Bare version ("1.0.0") of the serving model, however it was loaded
+_audit_log = None
+_velocity_store = None
+_rules_engine = None
+_threshold_policy = None
+_result_cache = None
+_shadow = None
+_watcher = None
+_swap_lock = threading.Lock()  # Model and preprocessor are read and replaced together
+_load_lock = threading.Lock()  # One disk load at a time; other callers wait for its result
+_next_load_attempt = 0.0  # time.monotonic() before which a failed load is not retried
+# Cached record behind /api/health and /api/status, so polls never touch the model
+_state = {
+    "loaded": False,
+    "warmed": False,
+    "model_version": None,
+    "source": None,
+    "sha256": None,
+    "loaded_at": None,
+    "load_seconds": None,
+    "warm_up_ms": None,
+    "load_failures": 0,
+    "last_error": None,
+    "last_scoring_latency_ms": None,
+}
+_reload_lock = threading.Lock()  # One reload at a time
+_batcher = None
+_scoring_pool = None
+_worker_artifact = (None, None)  # (serving model, artifact directory process workers map it from)
 MODEL_PATH = Config.MODEL_PATH
+COMPILED_MODEL_PATH = Config.COMPILED_MODEL_PATH
+METADATA_PATH = Config.METADATA_PATH
+PREPROCESSOR_PATH = Config.PREPROCESSOR_PATH
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 router = APIRouter()
 logger = get_logger("fraud_detector")  # ✅ Only initialized once
+request_logger = get_request_logger("fraud_detector.requests")  # Sampled per-request lines
+
+# --- Metrics (rendered by /metrics) ---
+PREDICT_STAGES = ("parse", "validate", "velocity", "rules", "score", "audit", "serialize")
+_stage_ms = REGISTRY.histogram(
+    "fraud_predict_stage_ms", "Time per /api/predict stage in milliseconds", label_names=("stage",)
+)
+STAGE_HISTOGRAMS = {stage: _stage_ms.labels(stage) for stage in PREDICT_STAGES}
+_decisions = REGISTRY.counter(
+    "fraud_decisions_total", "Decided transactions", ("decision", "decided_by", "model_version")
+)
+_errors = REGISTRY.counter("fraud_predict_errors_total", "Transactions that could not be scored", ("reason",))
+
+def stage_timer():
+    """
+    Per-request stage timer, or a no-op one when metrics are disabled.
+    """
+    return StageTimer(STAGE_HISTOGRAMS) if Config.METRICS_ENABLED else NULL_STAGE_TIMER
+
+def count_decisions(labels: np.ndarray, decided_by: str):
+    """
+    Add a batch of 0/1 labels to the decision counters.
+    """
+    if not Config.METRICS_ENABLED or not len(labels):
+        return
+    blocked = int(np.count_nonzero(labels))
+    version = model_version()
+    if blocked:
+        _decisions.labels("blocked", decided_by, version).inc(blocked)
+    if blocked < len(labels):
+        _decisions.labels("approved", decided_by, version).inc(len(labels) - blocked)
+
+def count_error(reason: str, n: int = 1):
+    if Config.METRICS_ENABLED and n:
+        _errors.labels(reason).inc(n)
 
 # --- Load Model ---
 def load_model():
     """
     Load the trained model from disk once and reuse from memory.
+    Prefers the memory-mapped compiled artifact when the trainer exported one;
+    batches above `Config.COMPILED_MAX_ROWS` rows then go to the pickle.
+    Concurrent callers share one load; after a failure, callers get an error
+    without touching the disk until the exponential backoff has passed.
     """
-    global _model
-    if _model is None:
+    global _model, _model_version, _next_load_attempt
+    if _model is not None:
+        return _model
+    with _load_lock:
+        if _model is not None:
+            return _model
+        wait = _next_load_attempt - time.monotonic()
+        if wait > 0:
+            raise RuntimeError(
+                f"Failed to load fraud detection model ({_state['last_error']}); next attempt in {wait:.1f}s"
+            )
+        started = time.perf_counter()
         try:
             logger.info("Loading trained fraud detection model...")
-            with open(MODEL_PATH, 'rb') as f:
-                _model = pickle.load(f)
-            logger.info("Model loaded successfully.")
+            if os.path.isdir(COMPILED_MODEL_PATH):
+                source, hash_key = COMPILED_MODEL_PATH, "compiled_hash"
+            else:
+                source, hash_key = MODEL_PATH, "hash"
+            # Large batches go to the pickle only if it is still the one this training run wrote
+            model = open_model(source, trainer_metadata().get("hash"))
         except Exception as e:
-            logger.error(f"Error loading model: {e}")
+            failures = _state["load_failures"] + 1
+            backoff = min(Config.MODEL_LOAD_BACKOFF_SECONDS * 2 ** (failures - 1), Config.MODEL_LOAD_BACKOFF_MAX_SECONDS)
+            _next_load_attempt = time.monotonic() + backoff
+            _state.update(load_failures=failures, last_error=str(e))
+            logger.error(f"Error loading model: {e} (attempt {failures}, retrying in {backoff:.0f}s)")
             raise RuntimeError("Failed to load fraud detection model.")
+        _model, _model_version = model, Config.VERSION
+        record_model_loaded(source, time.perf_counter() - started, hash_key)
+        logger.info(f"Model loaded successfully: {_model!r}")
     return _model
 
+def record_model_loaded(source: str, load_seconds: float, hash_key: str = None, sha256: str = None):
+    """
+    Update the cached model-state record after a load or a hot swap.
+    """
+    if sha256 is None and hash_key:
+        sha256 = trainer_metadata().get(hash_key)
+    _state.update(
+        loaded=True, model_version=model_version(), source=source, sha256=sha256,
+        loaded_at=time.strftime("%Y-%m-%dT%H:%M:%S"), load_seconds=round(load_seconds, 3),
+        last_error=None,
+    )
+
+def trainer_metadata() -> dict:
+    """
+    The trainer's metadata file, read fresh. Unlike `load_metadata`, which
+    prefers the artifact manifest, it carries the SHA256 of every file.
+    """
+    try:
+        with open(METADATA_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_metadata():
+    """
+    Load the training metadata (scaler parameters and feature order) once.
+    The model artifact carries its own copy; the JSON file is the fallback.
+    """
+    global _metadata
+    if _metadata is None:
+        try:
+            if os.path.isdir(COMPILED_MODEL_PATH):
+                _metadata = read_manifest(COMPILED_MODEL_PATH)
+            else:
+                with open(METADATA_PATH, "r") as f:
+                    _metadata = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading model metadata: {e}")
+            raise RuntimeError("Failed to load fraud detection model metadata.")
+    return _metadata
+
+def get_preprocessor() -> FittedPreprocessor:
+    """
+    Fitted preprocessing saved by the trainer, loaded once. Falls back to the
+    scaler parameters in the model metadata for models trained before it existed.
+    """
+    global _preprocessor
+    if _preprocessor is None:
+        if os.path.exists(PREPROCESSOR_PATH):
+            _preprocessor = FittedPreprocessor.load(PREPROCESSOR_PATH)
+        else:
+            _preprocessor = FittedPreprocessor.from_dict(load_metadata()["scaler"])
+    return _preprocessor
+
+def fraud_probabilities(model, X: np.ndarray) -> np.ndarray:
+    """
+    Return P(fraud) for every row of X with a single predict_proba call.
+    """
+    fraud_col = list(model.classes_).index(1)
+    return model.predict_proba(X)[:, fraud_col]
+
+def score_rows(raw: np.ndarray) -> np.ndarray:
+    """
+    Fraud probabilities for a raw (unscaled) feature matrix. The model and the
+    preprocessing are taken as one pair, so a hot reload never mixes them.
+    """
+    with _swap_lock:
+        model, preprocessor = load_model(), get_preprocessor()
+    return fraud_probabilities(model, preprocessor.transform(raw))
+
+def load_serving_state() -> tuple:
+    """
+    Load everything `score_rows` needs. Returns the arguments with which
+    `init_scoring_worker` maps the same model in a scoring worker process.
+    """
+    return worker_artifact(load_model()), get_preprocessor().to_dict()
+
+def worker_artifact(model) -> str:
+    """
+    Artifact directory holding the compiled arrays of `model`. Workers only map
+    it, so the model is never unpickled once per worker; a model loaded from a
+    pickle is compiled here once, under Config.CACHE_DIR.
+    """
+    global _worker_artifact
+    served, path = _worker_artifact
+    if served is model:
+        return path
+    source = _state["source"]
+    if isinstance(model, HybridForest) and source and os.path.isdir(source):
+        path = source
+    else:
+        # Keyed by the pickle's SHA256, so the API processes on a host share one copy
+        sha256 = _state["sha256"]
+        path = os.path.join(Config.CACHE_DIR, "scoring", f"{sha256 or os.getpid()}.fmodel")
+        if sha256 is None or not os.path.isdir(path):
+            save_artifact(path, CompiledForest.from_sklearn(model), get_preprocessor().to_dict(), model_version())
+    _worker_artifact = (model, path)
+    return path
+
+def init_scoring_worker(source: str, preprocessor: dict):
+    """
+    Process-pool initializer: map the serving model's compiled arrays (already
+    verified by the API process) and load its preprocessing in a freshly
+    started worker. Workers score every batch size with the compiled forest.
+    """
+    global _model, _preprocessor
+    _model, _ = load_artifact(source)
+    _preprocessor = FittedPreprocessor.from_dict(preprocessor)
+
+def get_scoring_pool() -> ScoringPool:
+    """
+    Shared worker pool that runs model calls off the event loop.
+    """
+    global _scoring_pool
+    if _scoring_pool is None:
+        _scoring_pool = ScoringPool(score_rows, preload=load_serving_state, initializer=init_scoring_worker)
+    return _scoring_pool
+
+async def score_rows_async(X: np.ndarray) -> np.ndarray:
+    """
+    Score a feature matrix in the worker pool. Raises ScoringPoolFull when saturated.
+    """
+    started = time.perf_counter()
+    probabilities = await get_scoring_pool().run(X)
+    _state["last_scoring_latency_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+    return probabilities
+
+async def warm_up(rows: int = Config.WARM_UP_ROWS) -> float:
+    """
+    Load the model (off the event loop) and score `rows` median rows through the
+    scoring pool, so caches, pages and pool workers are warm before readiness
+    goes green. Returns the warm-up scoring time in ms.
+    """
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, load_serving_state)
+    raw = np.repeat(get_preprocessor().median[None, :], rows, axis=0)
+    started = time.perf_counter()
+    await score_rows_async(raw)
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    _state.update(warmed=True, warm_up_ms=round(elapsed_ms, 3))
+    logger.info(f"🔥 Model warmed up with {rows} rows in {elapsed_ms:.1f} ms")
+    return elapsed_ms
+
+async def warm_up_until_ready():
+    """
+    Retry the warm-up, following the load backoff, until the model is ready.
+    """
+    while not _state["warmed"]:
+        try:
+            await warm_up()
+        except Exception as e:
+            logger.error(f"Warm-up failed: {e}")
+            await asyncio.sleep(max(_next_load_attempt - time.monotonic(), Config.MODEL_LOAD_BACKOFF_SECONDS))
+
+def serving_state() -> dict:
+    """
+    Cached model-state record plus live queue depth. Never loads the model.
+    """
+    state = dict(_state)
+    state["ready"] = state["loaded"] and state["warmed"]
+    retry_in = _next_load_attempt - time.monotonic()
+    state["next_load_attempt_in_s"] = round(retry_in, 1) if not state["loaded"] and retry_in > 0 else None
+    state["queue_depth"] = {
+        "batcher": get_batcher().queued,
+        "scoring_pool": get_scoring_pool().in_flight,
+    }
+    return state
+
+def get_batcher() -> MicroBatcher:
+    """
+    Shared micro-batcher that coalesces concurrent single-row predictions.
+    """
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher(score_rows_async)
+    return _batcher
+
+def get_audit_log() -> AuditLog:
+    """
+    Shared background writer for the binary audit log of scored transactions.
+    """
+    global _audit_log
+    if _audit_log is None:
+        _audit_log = AuditLog()
+    return _audit_log
+
+def get_velocity_store() -> VelocityStore:
+    """
+    Shared per-card velocity feature store.
+    """
+    global _velocity_store
+    if _velocity_store is None:
+        _velocity_store = VelocityStore()
+    return _velocity_store
+
+def apply_velocity(records: List[dict], raw: np.ndarray, errors: list) -> np.ndarray:
+    """
+    Record every valid transaction in the velocity store and, when the model
+    was trained with velocity features, write them into the raw feature rows.
+    Returns the velocity features per row (NaN where none were computed).
+    """
+    velocity = np.full((len(records), len(VELOCITY_FEATURES)), np.nan)
+    if not Config.VELOCITY_ENABLED:
+        return velocity
+    store = get_velocity_store()
+    src, dst = get_preprocessor().positions(VELOCITY_FEATURES)
+    now = time.time()
+    for i, record in enumerate(records):
+        if errors[i] is not None:
+            continue
+        key = record.get("card_number") or record.get("user_id")
+        if not key:
+            continue
+        velocity[i] = store.update(
+            str(key), now, float(record.get("amount") or 0.0),
+            record.get("merchant_id"), record.get("location"),
+        )
+        if len(dst):
+            raw[i, dst] = velocity[i, src]
+    return velocity
+
+def get_rules_engine() -> RulesEngine:
+    """
+    Rules compiled once from RULES_CONFIG.
+    """
+    global _rules_engine
+    if _rules_engine is None:
+        _rules_engine = RulesEngine()
+    return _rules_engine
+
+def install_model(bundle: ModelBundle):
+    """
+    Swap a verified model in for the serving one. Requests already scoring finish
+    on the old model; process-mode workers are replaced with ones that load the new.
+    """
+    global _model, _metadata, _preprocessor, _model_version, _threshold_policy
+    current = get_preprocessor()
+    if bundle.preprocessor.features != current.features:
+        raise ModelValidationError(
+            "Candidate model uses a different feature set; restart the API to deploy it"
+        )
+    with _swap_lock:
+        _model, _metadata, _preprocessor = bundle.model, bundle.metadata, bundle.preprocessor
+        _model_version = bundle.version
+        if _threshold_policy is not None and _threshold_policy.path != bundle.thresholds_path:
+            _threshold_policy = ThresholdPolicy(bundle.thresholds_path)
+    record_model_loaded(bundle.source, bundle.load_seconds, sha256=bundle.sha256)
+    get_scoring_pool().restart()
+    logger.info(f"✅ Now serving model {bundle.version} ({bundle.source})")
+
+def reload_model(version: str = None, shadow: bool = False, sample_rate: float = None) -> dict:
+    """
+    Load and verify a model version, then serve it or, with `shadow`, score a
+    sample of traffic with it alongside the serving model. Blocking; run it off
+    the event loop. Raises ReloadInProgress, FileNotFoundError or ModelValidationError.
+    """
+    global _shadow
+    if not _reload_lock.acquire(blocking=False):
+        raise ReloadInProgress("A model reload is already in progress")
+    try:
+        bundle = load_bundle(version)
+        if shadow:
+            if bundle.preprocessor.features != get_preprocessor().features:
+                raise ModelValidationError("Shadow model must use the serving feature set")
+            previous = _shadow
+            _shadow = ShadowScorer(bundle, Config.SHADOW_SAMPLE_RATE if sample_rate is None else sample_rate)
+            if previous is not None:
+                previous.close()
+            logger.info(f"👥 Shadow scoring model {bundle.version} on {_shadow.sample_rate:.0%} of traffic")
+        else:
+            install_model(bundle)
+        return bundle.describe()
+    finally:
+        _reload_lock.release()
+
+def promote_shadow() -> dict:
+    """
+    Serve the shadow model and stop shadow scoring.
+    """
+    global _shadow
+    shadow = _shadow
+    if shadow is None:
+        raise LookupError("No shadow model loaded")
+    install_model(shadow.bundle)
+    _shadow = None
+    shadow.close()
+    return shadow.stats()
+
+def stop_shadow():
+    """
+    Drop the shadow model; returns its final comparison stats, or None.
+    """
+    global _shadow
+    shadow, _shadow = _shadow, None
+    if shadow is None:
+        return None
+    shadow.close()
+    return shadow.stats()
+
+def get_shadow():
+    return _shadow
+
+def shadow_score(raw: np.ndarray, probabilities, thresholds):
+    """
+    Offer scored rows to the shadow model, if one is loaded. Never raises.
+    """
+    shadow = _shadow
+    if shadow is None:
+        return
+    try:
+        shadow.offer(raw, probabilities, thresholds)
+    except Exception as e:
+        logger.error(f"Shadow scoring unavailable: {e}")
+
+def start_model_watcher() -> ModelWatcher:
+    """
+    Reload whenever the trainer rewrites the serving version's metadata file.
+    """
+    global _watcher
+    if _watcher is None:
+        _watcher = ModelWatcher(METADATA_PATH, lambda: reload_model(Config.VERSION))
+        _watcher.start()
+    return _watcher
+
+def stop_model_watcher():
+    global _watcher
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
+
+def model_state() -> dict:
+    """
+    Serving model, shadow model and watcher, for the admin endpoint.
+    """
+    shadow = _shadow
+    return {
+        "model": serving_state(),
+        "reloading": _reload_lock.locked(),
+        "watching": _watcher is not None and _watcher.running,
+        "shadow": shadow.stats() if shadow is not None else None,
+    }
+
+def get_threshold_policy() -> ThresholdPolicy:
+    """
+    Decision thresholds, reloaded when the trainer (or an operator) rewrites the file.
+    """
+    global _threshold_policy
+    if _threshold_policy is None:
+        _threshold_policy = ThresholdPolicy()
+    return _threshold_policy
+
+def get_result_cache() -> ResultCache:
+    """
+    Decisions already returned, replayed to gateway retries of the same transaction.
+    """
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
+
+def apply_rules(records: List[dict], velocity: np.ndarray, valid: np.ndarray):
+    """
+    Run the rules stage on the valid rows. Returns (decision, fired rule index)
+    arrays; UNDECIDED rows still need the model.
+    """
+    if not Config.RULES_ENABLED:
+        n = len(records)
+        return np.full(n, UNDECIDED, dtype=np.int8), np.full(n, -1, dtype=np.int16)
+    return get_rules_engine().evaluate(rule_columns(records, velocity), valid)
+
+def model_version() -> str:
+    """
+    Version string recorded with every audited decision and metric. Set by
+    `load_model` and `install_model` alike, so a hot reload keeps the same form.
+    """
+    return _model_version or Config.VERSION
+
+def serving_generation() -> Optional[str]:
+    """
+    What decides a transaction right now: the serving model and the thresholds
+    file, from the cached model-state record. Part of every result-cache key, so
+    a reload or threshold edit in any worker stops retries from getting the
+    previous decision. None until a model is loaded.
+    """
+    if not _state["loaded"]:
+        return None
+    return f"{model_version()}:{_state['sha256']}:{get_threshold_policy().generation}"
+
+def audit_decisions(raw: np.ndarray, probabilities, labels, transaction_ids, started: float, rules=None):
+    """
+    Queue decided rows (raw features, probability, label, deciding rule) for
+    the audit log. Rows a rule decided carry a NaN probability.
+    """
+    if not Config.AUDIT_ENABLED:
+        return
+    try:
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        get_audit_log().record(
+            raw, get_preprocessor().features, probabilities, labels,
+            model_version(), transaction_ids, latency_ms, rules,
+        )
+    except Exception as e:
+        logger.error(f"Audit log unavailable: {e}")
+
 # --- Prediction Endpoint ---
 @router.post("/predict")
-async def predict_fraud(transaction_data: dict, token: str = Depends(oauth2_scheme)):
+async def predict_fraud(transaction_data: dict, token: str = Depends(oauth2_scheme),
+                        idempotency_key: Optional[str] = None):
     """
-    Predict whether a transaction is fraudulent.
+    Predict whether a transaction is fraudulent. With an `idempotency_key` (the
+    transaction_id the gateway sent), retries of the same payload get the first
+    decision instead of being scored again.
     """
     # Step 1: Verify Token
     try:
@@ -58,36 +574,78 @@ async def predict_fraud(transaction_data: dict, token: str = Depends(oauth2_sche
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Step 2: Validate Input
-    try:
-        validated_input = validate_dataframe(transaction_data)
-        logger.info(f"Validated input data: {validated_input}")
-    except ValueError as ve:
-        logger.warning(f"Invalid input data: {ve}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid input: {str(ve)}"
-        )
+    generation = serving_generation() if idempotency_key is not None and Config.RESULT_CACHE_ENABLED else None
+    if generation is not None:
+        key = result_key(idempotency_key, transaction_data, generation)
+        return await get_result_cache().get_or_compute(key, lambda: score_transaction(transaction_data))
+    # Before the first load nothing names the model that will score, so the decision isn't cached
+    return await score_transaction(transaction_data)
 
-    # Step 3: Preprocess Input
+async def score_transaction(transaction_data: dict) -> dict:
+    """
+    Validate, run the rules and score one transaction (the body of predict_fraud after auth).
+    """
+    # Step 2: Validate & Preprocess Input
+    started = time.perf_counter()
+    timer = stage_timer()
     try:
-        input_vector = preprocess_data(validated_input)
-        input_array = np.array([input_vector])
-        logger.info(f"Preprocessed input vector: {input_vector}")
+        preprocessor = get_preprocessor()
+        raw, errors = preprocessor.raw_matrix([transaction_data])
+        timer.mark("validate")
+        velocity = apply_velocity([transaction_data], raw, errors)
+        timer.mark("velocity")
     except Exception as pe:
+        count_error("preprocessing")
         logger.error(f"Preprocessing failed: {pe}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Input preprocessing failed"
         )
 
+    if errors[0] is not None:
+        count_error("invalid_input")
+        request_logger.warning("Invalid input data: %s", errors[0])
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid input: {errors[0]}"
+        )
+
+    # Step 3: Rules (obvious blocks/approvals never reach the model)
+    decision, fired = apply_rules([transaction_data], velocity, np.ones(1, dtype=bool))
+    timer.mark("rules")
+    if decision[0] != UNDECIDED:
+        prediction = int(decision[0])
+        rule = get_rules_engine().rule_name(int(fired[0]))
+        request_logger.info("Rule %s decided: %s", rule, prediction)
+        count_decisions(decision, "rule")
+        audit_decisions(raw, [np.nan], [prediction], [transaction_data.get("transaction_id")], started, [rule])
+        timer.mark("audit")
+        # The model never scored it, so there is no probability to report
+        return {"prediction": prediction, "probability": None, "rule": rule}
+
     # Step 4: Predict
     try:
-        model = load_model()
-        prediction = model.predict(input_array)[0]
-        probability = round(model.predict_proba(input_array)[0][1], 4)
-        logger.info(f"Prediction: {prediction} | Probability: {probability}")
+        request_logger.info("Raw input vector: %s", raw[0])
+        if Config.BATCHING_ENABLED:
+            fraud_probability = await get_batcher().submit(raw[0])
+        else:
+            fraud_probability = float((await score_rows_async(raw))[0])
+        threshold = get_threshold_policy().threshold(transaction_data)
+        prediction = int(fraud_probability > threshold)
+        timer.mark("score")
+        shadow_score(raw, [fraud_probability], [threshold])
+        probability = round(fraud_probability, 4)
+        request_logger.info("Prediction: %s | Probability: %s", prediction, probability)
+    except ScoringPoolFull as busy:
+        count_error("scoring_busy")
+        request_logger.warning("Scoring pool saturated: %s", busy)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Scoring capacity exhausted, retry later",
+            headers={"Retry-After": str(busy.retry_after)},
+        )
     except Exception as e:
+        count_error("model_error")
         logger.error(f"Model prediction failed: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -102,7 +660,89 @@ async def predict_fraud(transaction_data: dict, token: str = Depends(oauth2_sche
             detail="Invalid prediction value returned by model"
         )
 
+    count_decisions([prediction], "model")
+    audit_decisions(raw, [fraud_probability], [prediction], [transaction_data.get("transaction_id")], started)
+    timer.mark("audit")
+
     return {
         "prediction": int(prediction),
         "probability": probability
     }
+
+# --- Batch Prediction ---
+async def predict_fraud_batch(records: List[dict]) -> List[dict]:
+    """
+    Score a batch of transaction dicts with one feature matrix and a single
+    predict_proba call in the worker pool. Results keep input order; invalid
+    rows get an error entry instead of failing the whole batch.
+    """
+    started = time.perf_counter()
+    preprocessor = get_preprocessor()
+    raw, errors = preprocessor.raw_matrix(records)
+    velocity = apply_velocity(records, raw, errors)
+    valid = np.array([e is None for e in errors], dtype=bool)
+    decision, fired = apply_rules(records, velocity, valid)
+    to_model = valid & (decision == UNDECIDED)
+
+    # NaN where the model didn't score the row: invalid, or decided by a rule
+    probabilities = np.full(len(records), np.nan)
+    ruled = decision != UNDECIDED
+    if to_model.any():
+        probabilities[to_model] = await score_rows_async(raw[to_model])
+
+    labels = np.where(ruled, decision, 0).astype(int)
+    if to_model.any():
+        thresholds = get_threshold_policy().thresholds([records[i] for i in np.flatnonzero(to_model)])
+        labels[to_model] = probabilities[to_model] > thresholds
+        shadow_score(raw[to_model], probabilities[to_model], thresholds)
+    count_decisions(labels[ruled], "rule")
+    count_decisions(labels[to_model], "model")
+    count_error("invalid_input", int(len(records) - valid.sum()))
+    rule_names = [get_rules_engine().rule_name(int(k)) for k in fired]
+    if valid.any():
+        audit_decisions(
+            raw[valid], probabilities[valid], labels[valid],
+            [r.get("transaction_id") for r, ok in zip(records, valid) if ok], started,
+            [name for name, ok in zip(rule_names, valid) if ok],
+        )
+    predictions = labels.tolist()
+    probabilities = np.round(probabilities, 4).tolist()
+
+    results = []
+    for i, error in enumerate(errors):
+        if error is not None:
+            results.append({"error": error})
+        elif rule_names[i] is not None:
+            results.append({"prediction": predictions[i], "probability": None, "rule": rule_names[i]})
+        else:
+            results.append({"prediction": predictions[i], "probability": probabilities[i]})
+    return results
+
+# --- Gauges read at scrape time ---
+REGISTRY.collector(
+    "fraud_model_info", "Serving model (value is 1)", "gauge",
+    lambda: {(_state["model_version"] or "none", _state["source"] or "none"): 1}, ("model_version", "source"),
+)
+REGISTRY.collector("fraud_model_ready", "1 once the model is loaded and warmed up", "gauge",
+                   lambda: int(_state["loaded"] and _state["warmed"]))
+REGISTRY.collector("fraud_scoring_in_flight", "Scoring jobs queued or running in the pool", "gauge",
+                   lambda: get_scoring_pool().in_flight)
+REGISTRY.collector("fraud_scoring_rejected_total", "Scoring jobs rejected because the pool was full", "counter",
+                   lambda: get_scoring_pool().rejected)
+REGISTRY.collector("fraud_batcher_queued", "Rows waiting for a micro-batch", "gauge", lambda: get_batcher().queued)
+REGISTRY.collector("fraud_batcher_batch_size", "Rows per micro-batch", "histogram",
+                   lambda: get_batcher().batch_size_hist)
+REGISTRY.collector("fraud_batcher_queue_wait_ms", "Time rows waited for their micro-batch", "histogram",
+                   lambda: get_batcher().queue_wait_hist)
+REGISTRY.collector("fraud_audit_dropped_total", "Audit records dropped because the queue was full", "counter",
+                   lambda: get_audit_log().dropped if _audit_log is not None else None)
+REGISTRY.collector("fraud_result_cache_hits_total", "Retries answered from the result cache", "counter",
+                   lambda: _result_cache.hits if _result_cache is not None else None)
+REGISTRY.collector("fraud_result_cache_misses_total", "Keyed transactions scored and cached", "counter",
+                   lambda: _result_cache.misses if _result_cache is not None else None)
+REGISTRY.collector("fraud_result_cache_coalesced_total", "Concurrent duplicates that awaited one scoring", "counter",
+                   lambda: _result_cache.coalesced if _result_cache is not None else None)
+REGISTRY.collector("fraud_result_cache_evictions_total", "Live results evicted to stay within the memory cap",
+                   "counter", lambda: _result_cache.store.evictions if _result_cache is not None else None)
+REGISTRY.collector("fraud_velocity_cards", "Cards tracked by the velocity store", "gauge",
+                   lambda: len(_velocity_store) if _velocity_store is not None else None)
@@ -0,0 +1,242 @@
+# backend/app/model/hot_reload.py
+"""
+Loading replacement models while the API keeps serving.
+
+`load_bundle` reads a model version's metadata, checks the artifact against
+the SHA256 the trainer recorded there (`compiled_hash` for the memory-mapped
+artifact, `hash` for the pickle), loads it and scores one warm-up row, all on
+the calling thread so the event loop is never blocked. The caller swaps the
+verified bundle in (see `fraud_detector.install_model`) or hands it to a
+`ShadowScorer`, which scores a sample of live traffic with it on its own
+thread and counts how often it disagrees with the serving model.
+`ModelWatcher` polls the metadata file, which the trainer writes last, and
+triggers a reload when it changes.
+"""
+import os
+import json
+import random
+import time
+import threading
+import joblib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from backend.app.config import Config
+from backend.app.model.artifact import artifact_digest, file_sha256, open_model
+from backend.app.utils.preprocessing import FittedPreprocessor
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("HotReload")
+
+
+class ModelValidationError(ValueError):
+    """Raised when a candidate model is missing its hash, fails it, or doesn't fit the serving schema."""
+
+
+class ReloadInProgress(RuntimeError):
+    """Raised when a reload is requested while another one is still loading."""
+
+
+def model_paths(version: str, model_dir: str = None) -> dict:
+    """Files the trainer writes for `version`."""
+    model_dir = model_dir or Config.MODEL_DIR
+    name = f"fraud_model_{version}"
+    return {
+        "pickle": os.path.join(model_dir, f"{name}.pkl"),
+        "compiled": os.path.join(model_dir, f"{name}.fmodel"),
+        "metadata": os.path.join(model_dir, f"{name}_metadata.json"),
+        "thresholds": os.path.join(model_dir, f"{name}_thresholds.json"),
+    }
+
+
+class ModelBundle:
+    """A verified model with the metadata and preprocessing it was trained with."""
+
+    def __init__(self, model, metadata: dict, preprocessor: FittedPreprocessor, version: str,
+                 source: str, sha256: str, thresholds_path: str, load_seconds: float = 0.0):
+        self.model = model
+        self.metadata = metadata
+        self.preprocessor = preprocessor
+        self.version = version
+        self.source = source
+        self.sha256 = sha256
+        self.thresholds_path = thresholds_path
+        self.load_seconds = load_seconds
+
+    def describe(self) -> dict:
+        return {"version": self.version, "source": self.source, "sha256": self.sha256}
+
+
+def _verify(path: str, actual: str, expected: Optional[str]):
+    if not expected:
+        raise ModelValidationError(f"No SHA256 recorded in the metadata for {path}")
+    if actual != expected:
+        raise ModelValidationError(f"SHA256 mismatch for {path}: expected {expected}, got {actual}")
+
+
+def load_bundle(version: str = None, model_dir: str = None) -> ModelBundle:
+    """
+    Load and verify a model version (default `Config.VERSION`). Blocking; run it
+    off the event loop. Raises FileNotFoundError or ModelValidationError.
+    """
+    started = time.perf_counter()
+    version = version or Config.VERSION
+    paths = model_paths(version, model_dir)
+    with open(paths["metadata"], "r") as f:
+        metadata = json.load(f)
+
+    # Prefer the memory-mapped artifact when the trainer recorded its digest
+    if os.path.isdir(paths["compiled"]) and metadata.get("compiled_hash"):
+        source = paths["compiled"]
+        digest = artifact_digest(source)
+        _verify(source, digest, metadata["compiled_hash"])
+        # Large batches go to the pickle, checked against its own hash when first loaded
+        model = open_model(source, metadata.get("hash"))
+    else:
+        source = paths["pickle"]
+        digest = file_sha256(source)
+        _verify(source, digest, metadata.get("hash"))
+        model = joblib.load(source)
+
+    preprocessor = FittedPreprocessor.from_dict(metadata["scaler"])
+    # Touch every tree once so the first live request doesn't pay for page faults
+    model.predict_proba(preprocessor.transform(preprocessor.median))
+    logger.info(f"✅ Verified model {version} from {source}")
+    return ModelBundle(
+        model, metadata, preprocessor, version, source, digest, paths["thresholds"], time.perf_counter() - started
+    )
+
+
+class ShadowScorer:
+    """
+    Scores a sampled fraction of live rows with a candidate model on a single
+    background thread and compares its decisions with the serving model's.
+    At most `max_pending` comparisons are queued; beyond that samples are skipped.
+    """
+
+    def __init__(self, bundle: ModelBundle, sample_rate: float = Config.SHADOW_SAMPLE_RATE,
+                 max_pending: int = Config.SHADOW_MAX_PENDING):
+        self.bundle = bundle
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.sampled = 0
+        self.skipped = 0
+        self.compared = 0
+        self.disagreements = 0
+        self.flipped_to_blocked = 0
+        self.flipped_to_approved = 0
+        self.abs_probability_change = 0.0
+        self.errors = 0
+
+    def offer(self, raw: np.ndarray, probabilities: np.ndarray, thresholds: np.ndarray):
+        """Maybe queue some of the scored rows (raw features, serving probability, threshold) for comparison."""
+        n = len(raw)
+        if n == 1:
+            if random.random() >= self.sample_rate:
+                return
+            rows = slice(None)
+        else:
+            rows = np.flatnonzero(np.random.random(n) < self.sample_rate)
+            if not len(rows):
+                return
+        with self._lock:
+            count = n if isinstance(rows, slice) else len(rows)
+            if self._pending >= self.max_pending:
+                self.skipped += count
+                return
+            self._pending += 1
+            self.sampled += count
+        self._executor.submit(
+            self._compare, np.array(raw[rows], dtype=np.float64, ndmin=2),
+            np.asarray(probabilities, dtype=np.float64)[rows], np.asarray(thresholds, dtype=np.float64)[rows],
+        )
+
+    def _compare(self, raw: np.ndarray, served: np.ndarray, thresholds: np.ndarray):
+        try:
+            model = self.bundle.model
+            fraud_col = list(model.classes_).index(1)
+            shadow = model.predict_proba(self.bundle.preprocessor.transform(raw, copy=False))[:, fraud_col]
+            served_label = served > thresholds
+            shadow_label = shadow > thresholds
+            with self._lock:
+                self.compared += len(raw)
+                self.disagreements += int((served_label != shadow_label).sum())
+                self.flipped_to_blocked += int((shadow_label & ~served_label).sum())
+                self.flipped_to_approved += int((served_label & ~shadow_label).sum())
+                self.abs_probability_change += float(np.abs(shadow - served).sum())
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logger.error(f"❌ Shadow scoring failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> dict:
+        compared = self.compared
+        return {
+            **self.bundle.describe(),
+            "sample_rate": self.sample_rate,
+            "sampled": self.sampled,
+            "skipped": self.skipped,
+            "compared": compared,
+            "disagreements": self.disagreements,
+            "disagreement_rate": round(self.disagreements / compared, 6) if compared else 0.0,
+            "flipped_to_blocked": self.flipped_to_blocked,
+            "flipped_to_approved": self.flipped_to_approved,
+            "mean_abs_probability_change": round(self.abs_probability_change / compared, 6) if compared else 0.0,
+            "errors": self.errors,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ModelWatcher:
+    """Calls `on_change()` from a daemon thread whenever `path` gets a new mtime."""
+
+    def __init__(self, path: str, on_change: Callable[[], None],
+                 interval: float = Config.MODEL_WATCH_INTERVAL_SECONDS):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mtime = self._current_mtime()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+            logger.info(f"👀 Watching {self.path} for new models every {self.interval}s")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            mtime = self._current_mtime()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.error(f"❌ Reload after {self.path} changed failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
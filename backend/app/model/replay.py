@@ -0,0 +1,168 @@
+# backend/app/model/replay.py
+"""
+Re-score audited traffic against another model and report how decisions move.
+
+    python -m backend.app.model.replay --artifact backend/models/fraud_model_1.1.0.fmodel \\
+        --start 2026-10-17T00:00 --end 2026-10-18T00:00
+
+Audit segments hold raw features, so the candidate model's own preprocessing is
+applied. Rows are scored in vectorized batches straight from the decoded segments.
+Decisions made by the rules stage never reached the model; they are counted
+separately and left out of the old/new comparison. New decisions use the
+default threshold of the thresholds file serving uses (`--thresholds`, see
+thresholds.py) unless `--threshold` overrides it; audited rows carry no
+merchant category or card type, so per-segment overrides don't apply.
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Tuple
+
+from backend.app.config import Config
+from backend.app.model.artifact import open_model, read_manifest
+from backend.app.model.thresholds import ThresholdPolicy
+from backend.app.utils.audit_log import iter_range
+from backend.app.utils.preprocessing import FittedPreprocessor
+
+HISTOGRAM_BINS = np.linspace(0.0, 1.0, 11)
+
+
+def parse_when(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds from an epoch number or an ISO-8601 timestamp (local time if naive)."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def load_candidate(path: str, preprocessor_path: Optional[str] = None) -> Tuple[object, FittedPreprocessor]:
+    """
+    Model and preprocessing for a compiled artifact directory or a joblib pickle.
+    An artifact scores large batches with the pickle next to it when there is one.
+    """
+    model = open_model(path)
+    if os.path.isdir(path):
+        preprocessor = FittedPreprocessor.from_dict(read_manifest(path)["scaler"])
+    else:
+        if preprocessor_path is None:
+            raise ValueError("--preprocessor is required when replaying against a pickle")
+        preprocessor = None
+    if preprocessor_path is not None:
+        preprocessor = FittedPreprocessor.load(preprocessor_path)
+    return model, preprocessor
+
+
+def align_columns(X: np.ndarray, audit_features: list, model_features: list) -> np.ndarray:
+    """Reorder audited columns to the candidate's feature order; unknown features become NaN (median-filled)."""
+    if audit_features == model_features:
+        return X.astype(np.float64)
+    position = {name: j for j, name in enumerate(audit_features)}
+    aligned = np.full((len(X), len(model_features)), np.nan)
+    for j, name in enumerate(model_features):
+        if name in position:
+            aligned[:, j] = X[:, position[name]]
+    return aligned
+
+
+def replay(audit_dir: str, model, preprocessor: FittedPreprocessor, start: Optional[float] = None,
+           end: Optional[float] = None, threshold: Optional[float] = None, batch_size: int = 50_000,
+           thresholds_path: str = Config.THRESHOLDS_PATH) -> dict:
+    """
+    Re-score every model decision audited in `[start, end)` and summarize old vs
+    new decisions. Without `threshold`, the default of `thresholds_path` applies.
+    """
+    if threshold is None:
+        threshold = ThresholdPolicy(thresholds_path).threshold({})
+    fraud_col = list(model.classes_).index(1)
+    old_hist = np.zeros(len(HISTOGRAM_BINS) - 1, dtype=np.int64)
+    new_hist = np.zeros(len(HISTOGRAM_BINS) - 1, dtype=np.int64)
+    versions = Counter()
+    rules = Counter()
+    n = old_blocked = new_blocked = to_blocked = to_approved = segments = 0
+    rule_records = rule_blocked = 0
+    abs_change = 0.0
+    first = last = None
+
+    started = time.perf_counter()
+    for segment in iter_range(audit_dir, start, end):
+        segments += 1
+        if not len(segment["X"]):
+            continue
+        by_rule = np.array([bool(rule) for rule in segment["rule"]])
+        if by_rule.any():
+            rules.update(rule for rule in segment["rule"] if rule)
+            rule_records += int(by_rule.sum())
+            rule_blocked += int(segment["label"][by_rule].sum())
+        by_model = ~by_rule
+        X = align_columns(segment["X"][by_model], segment["features"], preprocessor.features)
+        probability, label = segment["probability"][by_model], segment["label"][by_model]
+        for lo in range(0, len(X), batch_size):
+            hi = lo + batch_size
+            new_prob = model.predict_proba(preprocessor.transform(X[lo:hi], copy=False))[:, fraud_col]
+            old_prob = probability[lo:hi].astype(np.float64)
+            old_label = label[lo:hi].astype(bool)
+            new_label = new_prob > threshold
+
+            n += len(new_prob)
+            old_blocked += int(old_label.sum())
+            new_blocked += int(new_label.sum())
+            to_blocked += int((new_label & ~old_label).sum())
+            to_approved += int((old_label & ~new_label).sum())
+            abs_change += float(np.abs(new_prob - old_prob).sum())
+            old_hist += np.histogram(old_prob, HISTOGRAM_BINS)[0]
+            new_hist += np.histogram(new_prob, HISTOGRAM_BINS)[0]
+        versions.update(segment["model_version"])
+        ts = segment["timestamp"]
+        first = ts.min() if first is None else min(first, ts.min())
+        last = ts.max() if last is None else max(last, ts.max())
+
+    elapsed = time.perf_counter() - started
+    rate = lambda k: round(k / n, 6) if n else 0.0
+    return {
+        "records": n,
+        "segments": segments,
+        "first_record": datetime.fromtimestamp(first).isoformat() if first is not None else None,
+        "last_record": datetime.fromtimestamp(last).isoformat() if last is not None else None,
+        "recorded_model_versions": dict(versions),
+        "threshold": threshold,
+        "old": {"blocked": old_blocked, "block_rate": rate(old_blocked)},
+        "new": {"blocked": new_blocked, "block_rate": rate(new_blocked)},
+        "flipped_to_blocked": to_blocked,
+        "flipped_to_approved": to_approved,
+        "mean_abs_probability_change": round(abs_change / n, 6) if n else 0.0,
+        "rule_decided": {"records": rule_records, "blocked": rule_blocked, "by_rule": dict(rules)},
+        "probability_histogram": {
+            "bins": HISTOGRAM_BINS.round(2).tolist(),
+            "old": old_hist.tolist(),
+            "new": new_hist.tolist(),
+        },
+        "elapsed_s": round(elapsed, 3),
+        "records_per_sec": round(n / elapsed, 1) if elapsed else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score audited transactions against a new model.")
+    parser.add_argument("--artifact", required=True, help="Compiled model directory (.fmodel) or joblib pickle")
+    parser.add_argument("--preprocessor", default=None, help="Preprocessor JSON (required for pickles)")
+    parser.add_argument("--audit-dir", default=Config.AUDIT_DIR)
+    parser.add_argument("--start", default=None, help="Epoch seconds or ISO timestamp (inclusive)")
+    parser.add_argument("--end", default=None, help="Epoch seconds or ISO timestamp (exclusive)")
+    parser.add_argument("--thresholds", default=Config.THRESHOLDS_PATH,
+                        help="Thresholds file whose default decides (as in serving)")
+    parser.add_argument("--threshold", type=float, default=None, help="One threshold instead of the file's")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    model, preprocessor = load_candidate(args.artifact, args.preprocessor)
+    report = replay(
+        args.audit_dir, model, preprocessor, parse_when(args.start), parse_when(args.end),
+        args.threshold, args.batch_size, args.thresholds,
+    )
+    print(json.dumps(report, indent=2))
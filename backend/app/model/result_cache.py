@@ -0,0 +1,276 @@
+# backend/app/model/result_cache.py
+"""
+Idempotent results for gateway retries of /api/predict.
+
+Payment gateways retry on timeouts, so during an incident the same transaction
+arrives several times, exactly when scoring capacity is shortest. The first
+decision for a (transaction_id, payload) pair is kept for
+`Config.RESULT_CACHE_TTL_SECONDS` and returned to every retry without
+validating, updating velocity, scoring, counting or auditing it again. Keys are
+a 16-byte BLAKE2b digest of the serving generation (model version and SHA256,
+thresholds file), the transaction_id and the canonical JSON payload, so a
+reused id with different contents is scored as a new transaction, and so is a
+retry after a model reload, promotion or threshold edit.
+
+Concurrent requests for the same key are single-flight: the first one scores
+and the others await its result (or its error). Only decisions are cached,
+never errors.
+
+Two stores, both bounded by `Config.RESULT_CACHE_MAX_MB`:
+
+- "memory": an LRU ordered dict per process; entries expire after the TTL and
+  the least recently used are evicted once the entry budget is reached;
+- "shared": a fixed table of 68-byte slots in a memory-mapped file
+  (`Config.RESULT_CACHE_PATH`, under /dev/shm where available), so every
+  uvicorn worker on the host sees the others' results. Slots are 4-way set
+  associative and a full set replaces the entry closest to expiry. Each slot
+  carries a CRC32, so a slot torn by two workers writing at once reads as a miss.
+  Single-flight stays per process.
+"""
+import os
+import json
+import math
+import mmap
+import time
+import zlib
+import struct
+import asyncio
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+from backend.app.config import Config
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("ResultCache")
+
+# (prediction, probability (NaN when a rule decided), rule name or None)
+Decision = Tuple[int, float, Optional[str]]
+
+# Approximate bytes held per in-memory entry: the 16-byte key, the (expires, prediction,
+# probability, rule) tuple and its floats, and the ordered dict's slot and link
+MEMORY_ENTRY_BYTES = 288
+# Shared slot: digest | float64 expires | float64 probability | int8 prediction | rule name, then CRC32
+_SLOT = struct.Struct("<16sddb31s")
+_CHECK = struct.Struct("<I")
+_EXPIRES = struct.Struct("<d")
+SLOT_BYTES = _SLOT.size + _CHECK.size
+WAYS = 4
+
+
+def result_key(transaction_id: str, payload: dict, generation: str = "") -> bytes:
+    """Digest identifying one transaction (its id plus every field it was sent with) as decided by `generation`."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(generation.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(str(transaction_id).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(canonical.encode("utf-8"))
+    return digest.digest()
+
+
+class MemoryStore:
+    """Per-process LRU of decisions with a fixed lifetime. Safe to call from several threads."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.capacity = max(1, int(max_bytes // MEMORY_ENTRY_BYTES))
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes, now: float) -> Optional[Decision]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[1:]
+
+    def put(self, key: bytes, decision: Decision, now: float):
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds,) + decision
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                _, entry = self._entries.popitem(last=False)
+                if entry[0] <= now:
+                    self.expirations += 1
+                else:
+                    self.evictions += 1
+
+    def stats(self, now: float) -> dict:
+        return {
+            "entries": len(self._entries),
+            "capacity": self.capacity,
+            "bytes": len(self._entries) * MEMORY_ENTRY_BYTES,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SharedStore:
+    """Decisions in a memory-mapped slot table shared by every process that opens `path`."""
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.n_sets = max(1, int(max_bytes // (SLOT_BYTES * WAYS)))
+        self.capacity = self.n_sets * WAYS
+        size = self.capacity * SLOT_BYTES
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size != size:
+                # Left by a different size or layout; workers started with the same config agree on this one
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.evictions = 0
+        self.expirations = 0
+        self.torn = 0
+
+    def _set(self, key: bytes) -> range:
+        first = (int.from_bytes(key[:8], "little") % self.n_sets) * WAYS
+        return range(first, first + WAYS)
+
+    def get(self, key: bytes, now: float) -> Optional[Decision]:
+        mm = self._mm
+        for slot in self._set(key):
+            offset = slot * SLOT_BYTES
+            if mm[offset:offset + 16] != key:
+                continue
+            raw = mm[offset:offset + SLOT_BYTES]
+            body = raw[:_SLOT.size]
+            if zlib.crc32(body) != _CHECK.unpack_from(raw, _SLOT.size)[0]:
+                self.torn += 1
+                return None
+            _, expires, probability, prediction, rule = _SLOT.unpack(body)
+            if expires <= now:
+                self.expirations += 1
+                return None
+            return prediction, probability, rule.rstrip(b"\0").decode("utf-8") or None
+        return None
+
+    def put(self, key: bytes, decision: Decision, now: float):
+        mm = self._mm
+        victim, soonest = None, None
+        for slot in self._set(key):
+            offset = slot * SLOT_BYTES
+            expires = _EXPIRES.unpack_from(mm, offset + 16)[0]
+            if expires <= now or mm[offset:offset + 16] == key:
+                victim = slot  # free, expired or the same transaction
+                break
+            if soonest is None or expires < soonest:
+                victim, soonest = slot, expires
+        else:
+            self.evictions += 1
+        prediction, probability, rule = decision
+        body = _SLOT.pack(key, now + self.ttl_seconds, probability, prediction, (rule or "").encode("utf-8")[:31])
+        offset = victim * SLOT_BYTES
+        mm[offset:offset + SLOT_BYTES] = body + _CHECK.pack(zlib.crc32(body))
+
+    def stats(self, now: float) -> dict:
+        expires = np.ndarray((self.capacity,), dtype="<f8", buffer=self._mm, offset=16, strides=(SLOT_BYTES,))
+        entries = int(np.count_nonzero(expires > now))
+        del expires  # a live view would keep the map from being closed
+        return {
+            "path": self.path,
+            "entries": entries,
+            "capacity": self.capacity,
+            "bytes": self.capacity * SLOT_BYTES,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "torn_reads": self.torn,
+        }
+
+
+class ResultCache:
+    """Single-flight front of a decision store, with hit/miss counters (this process only)."""
+
+    def __init__(self, backend: str = Config.RESULT_CACHE_BACKEND,
+                 ttl_seconds: float = Config.RESULT_CACHE_TTL_SECONDS,
+                 max_mb: float = Config.RESULT_CACHE_MAX_MB, path: str = Config.RESULT_CACHE_PATH):
+        max_bytes = int(max_mb * 1024 * 1024)
+        if backend == "memory":
+            self.store = MemoryStore(max_bytes, ttl_seconds)
+        elif backend == "shared":
+            self.store = SharedStore(path, max_bytes, ttl_seconds)
+        else:
+            raise ValueError(f"Unknown result cache backend: {backend} (expected 'memory' or 'shared')")
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: bytes) -> Optional[dict]:
+        decision = self.store.get(key, time.time())
+        if decision is None:
+            return None
+        self.hits += 1
+        prediction, probability, rule = decision
+        result = {"prediction": int(prediction), "probability": None if math.isnan(probability) else probability}
+        if rule is not None:
+            result["rule"] = rule
+        return result
+
+    def put(self, key: bytes, result: dict):
+        probability = result["probability"]
+        decision = (int(result["prediction"]), math.nan if probability is None else float(probability), result.get("rule"))
+        self.store.put(key, decision, time.time())
+
+    async def get_or_compute(self, key: bytes, compute: Callable[[], Awaitable[dict]]) -> dict:
+        """The cached decision for `key`, or the result of the one `compute()` running for it."""
+        result = self.get(key)
+        if result is not None:
+            return result
+        task = self._pending.get(key)
+        if task is None:
+            self.misses += 1
+            # Scored in its own task, so a caller that disconnects doesn't cancel it for the others
+            task = asyncio.ensure_future(compute())
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._settle(key, done))
+        else:
+            self.coalesced += 1
+        return dict(await asyncio.shield(task))
+
+    def _settle(self, key: bytes, task: asyncio.Future):
+        self._pending.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return  # errors reach the callers awaiting the task but are not cached
+        try:
+            self.put(key, task.result())
+        except Exception as e:
+            logger.error(f"⚠️ Could not cache result: {e}")
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "backend": self.backend,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            **self.store.stats(time.time()),
+        }
@@ -0,0 +1,145 @@
+# backend/app/model/rules.py
+"""
+Rules stage run before the model.
+
+`RULES_CONFIG` (root config.py) is compiled once into an ordered list of rules.
+Each rule is a vectorized test over batch columns (NumPy comparisons, set
+lookups for country lists) with an action: "block" rows are declined and
+"approve" rows are accepted without a model call. Rules are checked in order
+and stop as soon as every row in the batch is decided; rows no rule decides go
+to the model. The engine counts hits per rule for /api/status.
+"""
+import threading
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+from config import RULES_CONFIG
+from backend.app.model.velocity import VELOCITY_FEATURES
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("RulesEngine")
+
+UNDECIDED = -1
+APPROVE = 0
+BLOCK = 1
+
+
+def country_code(location) -> str:
+    """Country from a `location` string: the last comma-separated part, upper-cased ("Austin, US" -> "US")."""
+    if not location:
+        return ""
+    return str(location).rsplit(",", 1)[-1].strip().upper()
+
+
+def rule_columns(records: List[dict], velocity: np.ndarray) -> Dict[str, np.ndarray]:
+    """Columns the rules read, for a batch of transaction dicts and their velocity features."""
+    n = len(records)
+    amount = np.empty(n, dtype=np.float64)
+    country = []
+    for i, record in enumerate(records):
+        try:
+            amount[i] = float(record.get("amount"))
+        except (TypeError, ValueError, AttributeError):
+            amount[i] = np.nan
+        country.append(country_code(record.get("location")) if isinstance(record, dict) else "")
+    return {
+        "amount": amount,
+        "country": country,
+        "card_amount_1h": velocity[:, VELOCITY_FEATURES.index("card_amount_1h")],
+        "card_txn_count_1h": velocity[:, VELOCITY_FEATURES.index("card_txn_count_1h")],
+    }
+
+
+def _in_set(values: List[str], members: set) -> np.ndarray:
+    return np.fromiter((v in members for v in values), dtype=bool, count=len(values))
+
+
+def compile_rules(config: dict = RULES_CONFIG) -> List[Tuple[str, int, Callable]]:
+    """(name, action, test) for every rule enabled in `config`, blocks first."""
+    rules = []
+    if config.get("geo_check"):
+        high_risk = {c.upper() for c in config.get("high_risk_countries", [])}
+        rules.append(("high_risk_country", BLOCK, lambda c: _in_set(c["country"], high_risk)))
+
+    if config.get("amount_threshold") is not None:
+        limit = float(config["amount_threshold"])
+        rules.append(("amount_threshold", BLOCK, lambda c: c["amount"] > limit))
+
+    if config.get("hourly_limit") is not None:
+        hourly = float(config["hourly_limit"])
+        # NaN (card unknown or velocity store disabled) compares False
+        rules.append(("hourly_limit", BLOCK, lambda c: c["card_amount_1h"] > hourly))
+
+    if config.get("device_check"):
+        # Transactions carry no device identifier yet, so there is nothing to check
+        logger.warning("⚠️ device_check is enabled but transactions have no device field; rule skipped")
+
+    if config.get("auto_approve_amount") is not None and config.get("allowed_countries"):
+        small = float(config["auto_approve_amount"])
+        allowed = {c.upper() for c in config["allowed_countries"]}
+        max_hourly = config.get("auto_approve_max_hourly_txns")
+
+        def small_known_country(c):
+            mask = (c["amount"] <= small) & _in_set(c["country"], allowed)
+            if max_hourly is not None:
+                mask &= c["card_txn_count_1h"] <= max_hourly
+            return mask
+
+        rules.append(("auto_approve_small_amount", APPROVE, small_known_country))
+    return rules
+
+
+class RulesEngine:
+    """Evaluates the compiled rules on a batch and keeps per-rule hit counts."""
+
+    def __init__(self, config: dict = RULES_CONFIG):
+        self.rules = compile_rules(config)
+        self.names = [name for name, _, _ in self.rules]
+        self.hits = [0] * len(self.rules)
+        self.evaluated = 0
+        self._lock = threading.Lock()
+
+    def evaluate(self, columns: Dict[str, np.ndarray], active: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decide what the rules can for the rows in `active` (all rows by default).
+        Returns the decision per row (UNDECIDED, APPROVE or BLOCK) and the index
+        into `self.names` of the rule that fired (-1 if none).
+        """
+        n = len(columns["amount"])
+        pending = np.ones(n, dtype=bool) if active is None else active.copy()
+        decision = np.full(n, UNDECIDED, dtype=np.int8)
+        fired = np.full(n, -1, dtype=np.int16)
+        hits = [0] * len(self.rules)
+        evaluated = int(pending.sum())
+
+        for k, (_, action, test) in enumerate(self.rules):
+            if not pending.any():
+                break
+            mask = test(columns) & pending
+            count = int(mask.sum())
+            if count:
+                decision[mask] = action
+                fired[mask] = k
+                pending &= ~mask
+                hits[k] = count
+
+        with self._lock:
+            self.evaluated += evaluated
+            for k, count in enumerate(hits):
+                self.hits[k] += count
+        return decision, fired
+
+    def rule_name(self, index: int):
+        return self.names[index] if index >= 0 else None
+
+    def stats(self) -> dict:
+        evaluated = self.evaluated
+        decided = sum(self.hits)
+        return {
+            "evaluated": evaluated,
+            "model_calls_avoided": decided,
+            "rules": {
+                name: {"hits": hits, "hit_rate": round(hits / evaluated, 6) if evaluated else 0.0}
+                for name, hits in zip(self.names, self.hits)
+            },
+        }
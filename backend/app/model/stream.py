@@ -0,0 +1,172 @@
+# backend/app/model/stream.py
+"""
+Scoring side of the long-lived streaming channel (/api/predict/stream).
+
+A client sends transactions tagged with its own correlation `id`, one or many
+per message, and gets every result back exactly once, in the order scoring
+finishes. Rows are coalesced across messages into batches of up to
+`Config.STREAM_BATCH_MAX_ROWS` (waiting at most `Config.STREAM_BATCH_WAIT_MS`
+for a batch to fill) and scored with the batch pipeline. Up to
+`Config.STREAM_BATCHES_IN_FLIGHT` batches run at once and each is sent as soon
+as it is done; while they are all busy, arriving rows keep joining the next
+batch, so batches grow with load instead of flooding the scoring pool.
+
+Flow control is credit based. The stream opens with `Config.STREAM_CREDITS`
+credits. Each transaction takes one, and it is returned when that
+transaction's result has been sent. A transaction sent without credit is
+answered at once with a "credit_exceeded" error and is not scored. A client
+that keeps at most `credit` transactions unanswered therefore never sees this
+error, and the server never holds more than that many rows per connection.
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Set
+
+from backend.app.config import Config
+from backend.app.model.worker_pool import ScoringPoolFull
+from backend.app.utils.logger import get_logger
+from backend.app.utils.metrics import REGISTRY
+
+logger = get_logger("ScoringStream")
+
+# Totals over every stream of this process, for /api/status and /metrics
+_totals = {"open": 0, "opened": 0, "rows": 0, "batches": 0, "credit_exceeded": 0}
+
+
+def error_result(correlation_id, error: str, **extra) -> dict:
+    return {"id": correlation_id, "status": "error", "error": error, **extra}
+
+
+class ScoringStream:
+    """
+    One connection's queue of transactions to score. `submit` is called with
+    each incoming message's (correlation id, row) pairs; `send(results)` is
+    awaited with each finished batch's results, one call at a time.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[dict]], Awaitable[List[dict]]],
+        send: Callable[[List[dict]], Awaitable[None]],
+        credit: int = Config.STREAM_CREDITS,
+        max_batch: int = Config.STREAM_BATCH_MAX_ROWS,
+        max_wait_ms: float = Config.STREAM_BATCH_WAIT_MS,
+        max_batches: int = Config.STREAM_BATCHES_IN_FLIGHT,
+    ):
+        self.score_batch = score_batch
+        self._send = send
+        self.credit = credit
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batches = max_batches
+        self._batches = 0  # Batches scoring or waiting to be sent
+        self.outstanding = 0  # Rows accepted whose result hasn't been sent
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._send_lock = asyncio.Lock()
+        self._closed = False
+        self.rows = 0
+        _totals["open"] += 1
+        _totals["opened"] += 1
+
+    def submit(self, items: List[tuple]) -> None:
+        """Queue (correlation id, row) pairs; rows without credit are rejected immediately."""
+        rejected = []
+        for correlation_id, row in items:
+            if self.outstanding >= self.credit:
+                rejected.append(error_result(
+                    correlation_id, "credit_exceeded", detail=f"At most {self.credit} unanswered transactions",
+                ))
+                continue
+            self.outstanding += 1
+            self._pending.append((correlation_id, row))
+        if rejected:
+            _totals["credit_exceeded"] += len(rejected)
+            self._spawn(self.send(rejected, 0))
+
+        while len(self._pending) >= self.max_batch and self._batches < self.max_batches:
+            self._flush()
+        self._arm()
+
+    def _arm(self) -> None:
+        """Flush what is pending after the batch wait, unless every batch slot is busy."""
+        if self._pending and self._timer is None and self._batches < self.max_batches and not self._closed:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._batches >= self.max_batches:
+            return  # the next finished batch flushes
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if batch:
+            self._batches += 1
+            self._spawn(self._score(batch))
+        self._arm()
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _score(self, batch: List[tuple]) -> None:
+        ids = [correlation_id for correlation_id, _ in batch]
+        try:
+            scored = await self.score_batch([row for _, row in batch])
+            results = [{"id": correlation_id, **result} for correlation_id, result in zip(ids, scored)]
+        except ScoringPoolFull as busy:
+            results = [error_result(i, "Scoring capacity exhausted, retry later", retry_after=busy.retry_after)
+                       for i in ids]
+        except Exception as e:
+            logger.error(f"Stream batch of {len(batch)} rows failed: {e}")
+            results = [error_result(i, "Internal Server Error") for i in ids]
+        self.rows += len(batch)
+        _totals["rows"] += len(batch)
+        _totals["batches"] += 1
+        try:
+            await self.send(results, len(batch))
+        finally:
+            self._batches -= 1
+            if self._pending and not self._closed:
+                self._flush()  # rows that queued up while every slot was busy
+
+    async def send(self, results: List[dict], credit: int) -> None:
+        """Send one frame of results, returning `credit` just before it goes out."""
+        async with self._send_lock:
+            # Returned before the send, so a client never sees a result whose credit isn't back yet;
+            # frames waiting for the lock still hold theirs, which bounds what a slow reader can pile up
+            self.outstanding -= credit
+            if self._closed:
+                return
+            try:
+                await self._send(results)
+            except Exception as e:
+                # The client is gone; results of batches still running are dropped
+                logger.warning(f"⚠️ Stream send failed, closing: {e}")
+                self._closed = True
+
+    async def close(self) -> None:
+        """Stop accepting rows; batches already scoring finish (their side effects are kept), queued ones are dropped."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending = []
+        self._closed = True
+        try:
+            if self._in_flight:
+                # Shielded: when the handler itself is cancelled, the batches still finish in the background
+                await asyncio.shield(asyncio.gather(*self._in_flight, return_exceptions=True))
+        finally:
+            _totals["open"] -= 1
+
+
+def stream_stats() -> dict:
+    return dict(_totals)
+
+
+REGISTRY.collector("fraud_stream_open", "Open streaming connections", "gauge", lambda: _totals["open"])
+REGISTRY.collector("fraud_stream_rows_total", "Rows scored over streaming connections", "counter",
+                   lambda: _totals["rows"])
+REGISTRY.collector("fraud_stream_credit_exceeded_total", "Streamed rows rejected for lack of credit", "counter",
+                   lambda: _totals["credit_exceeded"])
@@ -0,0 +1,165 @@
+# backend/app/model/thresholds.py
+"""
+Decision thresholds applied to the model's fraud probability.
+
+A transaction is blocked when its probability is above its threshold. The
+threshold comes from a JSON file written by the trainer's threshold sweep and
+editable by hand:
+
+    {
+        "default": 0.82,
+        "merchant_category": {"gambling": 0.6},
+        "card_type": {"Prepaid": 0.7},
+        "sweep": {...}
+    }
+
+A merchant category override wins over a card type override, which wins over
+"default". Without the file, `RULES_CONFIG["ml_threshold"]` is used. The file
+is checked for changes at most every `Config.THRESHOLDS_RELOAD_SECONDS` and
+swapped in whole, so edits apply without a restart; an invalid file is logged
+and the previous thresholds stay in effect.
+"""
+import os
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from config import RULES_CONFIG
+from backend.app.config import Config
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("ThresholdPolicy")
+
+SEGMENT_FIELDS = ("merchant_category", "card_type")  # Lookup order, most specific first
+
+
+def _check(value, where: str) -> float:
+    value = float(value)
+    if not 0.0 <= value <= 1.0:
+        raise ValueError(f"threshold {where}={value} is outside [0, 1]")
+    return value
+
+
+def parse_thresholds(data: dict, default: float) -> Tuple[float, Dict[str, Dict[str, float]]]:
+    """(default, {field: {segment (case-folded): threshold}}) from a thresholds document."""
+    base = _check(data.get("default", default), "default")
+    overrides = {}
+    for field in SEGMENT_FIELDS:
+        overrides[field] = {
+            str(segment).casefold(): _check(value, f"{field}.{segment}")
+            for segment, value in (data.get(field) or {}).items()
+        }
+    return base, overrides
+
+
+class ThresholdPolicy:
+    """Per-transaction thresholds with hot reload from `path`."""
+
+    def __init__(self, path: str = Config.THRESHOLDS_PATH,
+                 default: float = RULES_CONFIG["ml_threshold"],
+                 reload_seconds: float = Config.THRESHOLDS_RELOAD_SECONDS):
+        self.path = path
+        self.fallback = _check(default, "ml_threshold")
+        self.reload_seconds = reload_seconds
+        self._table = (self.fallback, {field: {} for field in SEGMENT_FIELDS})
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.reload_errors = 0
+        self.reload(force=True)
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the file if it changed (or always with `force`). Returns True if thresholds were swapped."""
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except FileNotFoundError:
+                if self._mtime is not None:
+                    logger.warning(f"⚠️ Thresholds file {self.path} removed; falling back to ml_threshold={self.fallback}")
+                    self._table = (self.fallback, {field: {} for field in SEGMENT_FIELDS})
+                    self._mtime = None
+                    return True
+                return False
+            if not force and mtime == self._mtime:
+                return False
+            try:
+                with open(self.path) as f:
+                    table = parse_thresholds(json.load(f), self.fallback)
+            except Exception as e:
+                self.reload_errors += 1
+                self._mtime = mtime  # don't retry until the file changes again
+                logger.error(f"❌ Ignoring invalid thresholds file {self.path}: {e}")
+                return False
+            self._table = table
+            self._mtime = mtime
+            self.reloads += 1
+            logger.info(f"✅ Thresholds loaded from {self.path}: default={table[0]}")
+            return True
+
+    def _current(self):
+        if time.monotonic() - self._checked >= self.reload_seconds:
+            self.reload()
+        return self._table
+
+    @property
+    def generation(self) -> Optional[float]:
+        """Modification time of the thresholds file in use (None on the fallback); changes with every edit."""
+        self._current()
+        return self._mtime
+
+    def threshold(self, record: dict) -> float:
+        """Threshold for one transaction dict."""
+        default, overrides = self._current()
+        for field in SEGMENT_FIELDS:
+            table = overrides[field]
+            if table:
+                value = table.get(str(record.get(field) or "").casefold())
+                if value is not None:
+                    return value
+        return default
+
+    def thresholds(self, records: List[dict]) -> np.ndarray:
+        """Thresholds for a batch, one per record."""
+        default, overrides = self._current()
+        out = np.full(len(records), default, dtype=np.float64)
+        # Most specific field last so it overwrites the broader one
+        for field in reversed(SEGMENT_FIELDS):
+            table = overrides[field]
+            if not table:
+                continue
+            for i, record in enumerate(records):
+                value = table.get(str(record.get(field) or "").casefold())
+                if value is not None:
+                    out[i] = value
+        return out
+
+    def column_thresholds(self, segments: Dict[str, object], n_rows: int) -> np.ndarray:
+        """Thresholds for a batch given as columns ({segment field: values}), one vectorized lookup per field."""
+        default, overrides = self._current()
+        out = np.full(n_rows, default, dtype=np.float64)
+        for field in reversed(SEGMENT_FIELDS):
+            table = overrides[field]
+            values = segments.get(field)
+            if not table or values is None:
+                continue
+            keys = pd.Series(values, dtype=object).fillna("").astype(str).str.casefold()
+            mapped = keys.map(table).to_numpy(dtype=np.float64, na_value=np.nan)
+            hit = ~np.isnan(mapped)
+            out[hit] = mapped[hit]
+        return out
+
+    def stats(self) -> dict:
+        default, overrides = self._table
+        return {
+            "path": self.path,
+            "loaded_from_file": self._mtime is not None,
+            "default": default,
+            "overrides": {field: len(table) for field, table in overrides.items()},
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+        }
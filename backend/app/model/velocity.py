@@ -0,0 +1,259 @@
+# backend/app/model/velocity.py
+"""
+In-process per-card velocity feature store.
+
+Every card (or user) gets one slot in preallocated, flat NumPy arrays:
+
+- for each window (1m, 1h, 24h) a ring of time buckets holding a transaction
+  count and an amount sum; stale buckets are cleared lazily on the card's next
+  transaction, so an update touches only the buckets that expired since the
+  previous one (amortized O(1));
+- a small table of the most recent distinct merchants with their last-seen time;
+- the last location hash and last transaction time.
+
+Windows are sliding at bucket resolution (10s, 5min and 1h). Scalar reads and
+writes go through memoryviews of the arrays, which avoids NumPy's per-call
+overhead on the single-transaction path. Memory is bounded by
+`Config.VELOCITY_MAX_CARDS`; when every slot is taken, cards idle for longer
+than `Config.VELOCITY_TTL_SECONDS` are evicted, then the least recently seen.
+"""
+import threading
+import zlib
+import numpy as np
+from typing import Dict, List, Optional
+
+from backend.app.config import Config
+
+# (name, window seconds, buckets per window)
+WINDOWS = (("1m", 60, 6), ("1h", 3600, 12), ("24h", 86400, 24))
+
+VELOCITY_FEATURES = [
+    *(f"card_{kind}_{name}" for name, _, _ in WINDOWS for kind in ("txn_count", "amount")),
+    "card_distinct_merchants_24h",
+    "card_location_changed",
+    "card_seconds_since_last",
+]
+
+_NEVER = -(2 ** 31)
+_DAY = 86400
+
+
+def stable_hash(value) -> int:
+    """Process-independent 32-bit hash (non-zero) for merchants and locations."""
+    return zlib.crc32(str(value).encode("utf-8")) or 1
+
+
+class VelocityStore:
+    """Sliding-window aggregates per card key. Safe to call from several threads."""
+
+    def __init__(self, capacity: int = Config.VELOCITY_MAX_CARDS,
+                 ttl_seconds: float = Config.VELOCITY_TTL_SECONDS,
+                 merchant_slots: int = Config.VELOCITY_MERCHANT_SLOTS):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.merchant_slots = merchant_slots
+
+        # np.zeros is backed by calloc, so pages are only committed for slots in use
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._rings = []
+        for name, window, n_buckets in WINDOWS:
+            self._rings.append((
+                window // n_buckets,
+                n_buckets,
+                self._view(f"count_{name}", capacity * n_buckets, np.uint32),
+                self._view(f"sum_{name}", capacity * n_buckets, np.float32),
+                self._view(f"last_bucket_{name}", capacity, np.int32),
+                # Buckets before this one hold another period's data and count as empty
+                self._view(f"first_bucket_{name}", capacity, np.int32),
+                self._view(f"total_count_{name}", capacity, np.uint32),
+                self._view(f"total_sum_{name}", capacity, np.float64),
+            ))
+        self._merchant_hash = self._view("merchant_hash", capacity * merchant_slots, np.uint32)
+        self._merchant_seen = self._view("merchant_seen", capacity * merchant_slots, np.uint32)
+        self._location = self._view("location", capacity, np.uint32)
+        self._last_seen = self._view("last_seen", capacity, np.float64)
+
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = [None] * capacity
+        self._free: List[int] = []
+        self._high_water = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _view(self, name: str, size: int, dtype) -> memoryview:
+        array = np.zeros(size, dtype=dtype)
+        self._arrays[name] = array
+        return memoryview(array)
+
+    @property
+    def bytes_per_card(self) -> int:
+        return sum(a.nbytes for a in self._arrays.values()) // self.capacity
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _assign(self, key: str, now: float) -> int:
+        if self._free:
+            slot = self._free.pop()
+        elif self._high_water < self.capacity:
+            slot = self._high_water
+            self._high_water += 1
+        else:
+            self._evict(now)
+            slot = self._free.pop()
+
+        for ring in self._rings:
+            ring[4][slot] = _NEVER
+        base = slot * self.merchant_slots
+        for i in range(base, base + self.merchant_slots):
+            self._merchant_hash[i] = 0
+        self._location[slot] = 0
+        self._last_seen[slot] = _NEVER
+        self._slots[key] = slot
+        self._keys[slot] = key
+        return slot
+
+    def _evict(self, now: float):
+        """Free every slot idle past the TTL, or else the least recently seen 1%."""
+        last_seen = self._arrays["last_seen"]
+        victims = np.flatnonzero(last_seen < now - self.ttl_seconds)
+        if not len(victims):
+            n = max(1, self.capacity // 100)
+            victims = np.argpartition(last_seen, n - 1)[:n]
+        for slot in victims.tolist():
+            del self._slots[self._keys[slot]]
+            self._keys[slot] = None
+            self._free.append(slot)
+        self.evictions += len(victims)
+
+    def update(self, key: str, timestamp: float, amount: float,
+               merchant: Optional[str] = None, location: Optional[str] = None) -> List[float]:
+        """
+        Record one transaction for `key` and return its velocity features
+        (in VELOCITY_FEATURES order, as plain numbers), including the transaction itself.
+        """
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._assign(key, timestamp)
+            features = []
+            append = features.append
+            seconds = int(timestamp)
+
+            # Running totals per window; an update only visits buckets that expired since the last one
+            for width, n_buckets, counts, sums, last, first, total_count, total_sum in self._rings:
+                bucket = seconds // width
+                previous = last[slot]
+                base = slot * n_buckets
+                if bucket - previous >= n_buckets:
+                    # Whole window expired: restart without clearing the ring
+                    first[slot] = bucket
+                    last[slot] = bucket
+                    i = base + bucket % n_buckets
+                    counts[i] = 1
+                    sums[i] = amount
+                    total_count[slot] = 1
+                    total_sum[slot] = amount
+                    append(1)
+                    append(amount)
+                    continue
+                count = total_count[slot]
+                amount_sum = total_sum[slot]
+                if bucket > previous:
+                    start = first[slot]
+                    for expired in range(previous + 1, bucket + 1):
+                        i = base + expired % n_buckets
+                        if expired - n_buckets >= start:
+                            count -= counts[i]
+                            amount_sum -= sums[i]
+                        counts[i] = 0
+                        sums[i] = 0.0
+                    last[slot] = bucket
+                if previous - bucket < n_buckets:  # late events older than the window are not counted
+                    i = base + bucket % n_buckets
+                    counts[i] += 1
+                    sums[i] += amount
+                    count += 1
+                    amount_sum += amount
+                total_count[slot] = count
+                total_sum[slot] = amount_sum
+                append(count)
+                append(amount_sum)
+
+            base = slot * self.merchant_slots
+            append(self._merchants(base, stable_hash(merchant) if merchant is not None else 0, seconds))
+
+            changed = 0
+            if location is not None:
+                location_hash = stable_hash(location)
+                previous_location = self._location[slot]
+                if previous_location != location_hash:
+                    changed = int(previous_location != 0)
+                    self._location[slot] = location_hash
+            append(changed)
+
+            previous_seen = self._last_seen[slot]
+            elapsed = timestamp - previous_seen
+            if elapsed > 0:
+                self._last_seen[slot] = timestamp
+                append(elapsed if elapsed < self.ttl_seconds else self.ttl_seconds)
+            else:
+                append(0.0)  # same-instant or late event
+            return features
+
+    def _merchants(self, base: int, merchant_hash: int, seconds: int) -> int:
+        """
+        Refresh the merchant's last-seen time (or replace the stalest entry) and
+        return how many tracked merchants were seen in the last 24h, in one pass.
+        """
+        hashes, seen = self._merchant_hash, self._merchant_seen
+        cutoff = seconds - _DAY
+        distinct = 0
+        found = merchant_hash == 0
+        empty = oldest = -1
+        for i in range(base, base + self.merchant_slots):
+            h = hashes[i]
+            if not h:
+                if empty < 0:
+                    empty = i
+                continue
+            t = seen[i]
+            if h == merchant_hash:
+                found = True
+                if seconds > t:
+                    seen[i] = t = seconds
+            elif oldest < 0 or t < seen[oldest]:
+                oldest = i
+            if t > cutoff:
+                distinct += 1
+        if not found:
+            victim = empty
+            if victim < 0:
+                victim = oldest
+                if seen[victim] > cutoff:
+                    distinct -= 1
+            hashes[victim] = merchant_hash
+            seen[victim] = seconds
+            distinct += 1
+        return distinct
+
+    def update_many(self, keys, timestamps, amounts, merchants=None, locations=None) -> np.ndarray:
+        """Replay a time-ordered history; returns a float32 (n, len(VELOCITY_FEATURES)) matrix."""
+        out = np.empty((len(keys), len(VELOCITY_FEATURES)), dtype=np.float32)
+        timestamps = np.asarray(timestamps, dtype=np.float64).tolist()
+        amounts = np.asarray(amounts, dtype=np.float64).tolist()
+        for i, key in enumerate(keys):
+            out[i] = self.update(
+                key, timestamps[i], amounts[i],
+                merchants[i] if merchants is not None else None,
+                locations[i] if locations is not None else None,
+            )
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "cards": len(self._slots),
+            "capacity": self.capacity,
+            "evictions": self.evictions,
+            "bytes_per_card": self.bytes_per_card,
+        }
@@ -0,0 +1,127 @@
+# backend/app/model/worker_pool.py
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from backend.app.config import Config
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("ScoringPool")
+
+
+class ScoringPoolFull(RuntimeError):
+    """Raised when the scoring pool already holds its maximum number of jobs."""
+
+    def __init__(self, in_flight: int, retry_after: int = Config.SCORING_RETRY_AFTER_SECONDS):
+        super().__init__(f"Scoring pool saturated ({in_flight} jobs in flight)")
+        self.retry_after = retry_after
+
+
+class ScoringPool:
+    """
+    Runs CPU-bound scoring off the event loop.
+
+    `mode` is "thread", "process" or "inline" (score on the calling thread).
+    At most `max_pending` jobs may be queued or running; further calls raise
+    ScoringPoolFull instead of growing the queue.
+
+    In process mode workers are started from a fork server (spawned where
+    there is none), never forked from the API process: it already runs the
+    log listener and audit writer threads, and a fork taken while one of them
+    holds a lock leaves that lock held forever in the child. `preload()` loads
+    the model here and returns the arguments `initializer(*args)` needs to
+    open the same model in each worker, from memory-mapped arrays shared
+    through the page cache rather than one unpickled copy per worker.
+    """
+
+    def __init__(
+        self,
+        fn: Callable,
+        mode: str = Config.SCORING_POOL_MODE,
+        size: int = Config.SCORING_POOL_SIZE,
+        max_pending: int = Config.SCORING_QUEUE_LIMIT,
+        preload: Optional[Callable[[], tuple]] = None,
+        initializer: Optional[Callable] = None,
+    ):
+        if mode not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown scoring pool mode: {mode}")
+        self.fn = fn
+        self.mode = mode
+        self.size = size
+        self.max_pending = max_pending
+        self.preload = preload
+        self.initializer = initializer
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _new_executor(self) -> Executor:
+        if self.mode == "process":
+            initargs = self.preload() if self.preload is not None else ()
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            executor = ProcessPoolExecutor(
+                max_workers=self.size, mp_context=context, initializer=self.initializer, initargs=initargs
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="scoring")
+        logger.info(f"Started {self.mode} scoring pool with {self.size} workers")
+        return executor
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._new_executor()
+        return self._executor
+
+    def restart(self) -> None:
+        """
+        Replace process workers (after a model swap) without dropping work:
+        the new workers are started and loaded before they take over, and jobs
+        already submitted finish on the old ones. Threads share the swapped
+        model, so thread and inline pools are left alone.
+        """
+        if self.mode != "process" or self._executor is None:
+            return
+        executor = self._new_executor()
+        # Start the workers now, on this thread, rather than on the first request
+        executor.submit(int).result()
+        with self._lock:
+            old, self._executor = self._executor, executor
+        old.shutdown(wait=False)
+        self.restarts += 1
+
+    async def run(self, *args):
+        """Run `fn(*args)` in the pool, or raise ScoringPoolFull if it is saturated."""
+        if self.mode == "inline":
+            return self.fn(*args)
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise ScoringPoolFull(self.in_flight)
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), self.fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "size": self.size,
+            "in_flight": self.in_flight,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
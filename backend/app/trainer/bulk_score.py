@@ -0,0 +1,381 @@
+# backend/app/trainer/bulk_score.py
+"""
+Offline bulk scoring of a CSV or Parquet file with a trained model.
+
+    python -m backend.app.trainer.bulk_score transactions.csv scores.csv --id-columns transaction_id
+
+The input is cut into chunks that worker processes read, preprocess and score
+themselves: CSV files by byte ranges ending on line boundaries, Parquet files
+by row group. CSV cuts are made at raw newlines, so quoted fields must not
+span lines; convert such files to Parquet first. Workers are started from a
+fork server (spawned where there is none), never forked from this process
+and its log listener thread. They score with the compiled forest only, from
+memory-mapped arrays shared through the page cache: a compiled artifact is
+mapped as is, and a pickled forest is compiled once into a temporary
+artifact. With `--workers 1` the chunks are scored here, and a compiled
+artifact hands them to the sklearn pickle next to it, which is faster on large
+batches. Rows get the training preprocessing: the source adapter (`--adapter`,
+see harmonize.py) projects them onto the feature space, features it can't
+fill get the training fill value, then the model's median fill and scaling.
+
+Scores are written in input order. At most `--workers` x
+`Config.BULK_SCORE_IN_FLIGHT_PER_WORKER` chunks are queued or waiting to be
+written, and each chunk is preprocessed and scored in row blocks of about
+`Config.BULK_SCORE_BLOCK_CELLS` rows x trees, which bounds memory regardless
+of the input size or the forest. Id columns are copied to the output as the
+input spells them, even when the model also uses them as features. Every row is
+scored on its own: velocity features are used when the input carries them as
+columns, otherwise they get the no-history fill value. A row with a value that
+isn't a number gets no score and its problem in the `error` column; the rest
+of the file is still scored.
+"""
+import io
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from backend.app.config import Config
+from backend.app.model.artifact import load_artifact, save_artifact
+from backend.app.model.compiled_forest import CompiledForest, HybridForest
+from backend.app.model.features import FEATURE_SPACE, fill_value
+from backend.app.model.replay import load_candidate
+from backend.app.model.thresholds import SEGMENT_FIELDS, ThresholdPolicy
+from backend.app.trainer.data_loader import CATEGORICAL_COLUMNS, csv_dtypes
+from backend.app.trainer.harmonize import ADAPTERS
+from backend.app.utils.logger import get_logger
+from backend.app.utils.preprocessing import FittedPreprocessor
+
+logger = get_logger("BulkScorer")
+
+OUTPUT_COLUMNS = ["fraud_probability", "prediction", "error"]
+
+# Scoring state: set in this process by bulk_score, or in a worker by _init_worker
+_worker = {}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet input or output needs pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def _file_format(path: str) -> str:
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def csv_ranges(path: str, chunk_bytes: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """Header and (start, end) byte ranges of about `chunk_bytes`, each ending on a line boundary."""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as f:
+        header = pd.read_csv(io.BytesIO(f.readline()), nrows=0).columns.tolist()
+        start = f.tell()
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            if f.tell() < size:
+                f.readline()  # finish the line the cut landed in
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def _input_columns(header: List[str], features: List[str], adapter, id_columns: List[str]) -> dict:
+    """Which header columns each chunk reads: numeric inputs, segment fields and passthrough ids."""
+    wanted = set(features) | set(adapter.requires)
+    numeric = [col for col in header if col in wanted]
+    segments = [col for col in SEGMENT_FIELDS if col in header and col not in numeric]
+    missing = [col for col in adapter.requires if col not in header]
+    if missing:
+        raise ValueError(f"Input lacks columns the '{adapter.name}' adapter needs: {missing}")
+    missing_ids = [col for col in id_columns if col not in header]
+    if missing_ids:
+        raise ValueError(f"Id columns not in the input: {missing_ids}")
+    return {"numeric": numeric, "segments": segments, "ids": list(id_columns)}
+
+
+def _read_chunk(task) -> pd.DataFrame:
+    state = _worker
+    columns = state["columns"]
+    usecols = list(dict.fromkeys(columns["numeric"] + columns["segments"] + columns["ids"]))
+    if state["format"] == "csv":
+        start, end = task
+        with open(state["path"], "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        # Id columns are read as text so they are copied exactly; _feature_matrix parses the ones that are features
+        text = {col: str for col in columns["segments"] + columns["ids"]}
+        try:
+            dtypes = {**csv_dtypes(columns["numeric"]), **text}
+            return pd.read_csv(io.BytesIO(data), header=None, names=state["header"], usecols=usecols, dtype=dtypes)
+        except ValueError:
+            # A cell that isn't a number: read the numeric columns as text and let _feature_matrix flag the rows
+            dtypes = {**{col: str for col in columns["numeric"] if col not in CATEGORICAL_COLUMNS},
+                      **csv_dtypes([col for col in columns["numeric"] if col in CATEGORICAL_COLUMNS]), **text}
+            return pd.read_csv(io.BytesIO(data), header=None, names=state["header"], usecols=usecols, dtype=dtypes)
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(state["path"]).read_row_group(task, columns=usecols).to_pandas()
+
+
+def _feature_matrix(df: pd.DataFrame) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Raw (unscaled) features in the model's order, projected the way training
+    projected the source, plus a per-row error list (None for a valid row).
+    """
+    state = _worker
+    errors: List[Optional[str]] = [None] * len(df)
+    raw = {}
+    for col in state["columns"]["numeric"]:
+        if col in CATEGORICAL_COLUMNS:
+            raw[col] = pd.Categorical(df[col], categories=CATEGORICAL_COLUMNS[col]).codes.astype(np.float32)
+        elif not pd.api.types.is_numeric_dtype(df[col]):
+            values = pd.to_numeric(df[col], errors="coerce")
+            for i in np.flatnonzero(values.isna().to_numpy() & df[col].notna().to_numpy()):
+                if errors[i] is None:
+                    errors[i] = f"Invalid value for '{col}': {df[col].iat[i]!r}"
+            raw[col] = values.to_numpy(dtype=np.float32, na_value=np.nan)
+        else:
+            raw[col] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+    projected, _ = state["adapter"].project(raw)
+
+    features = state["preprocessor"].features
+    X = np.empty((len(df), len(features)), dtype=np.float64)
+    for j, name in enumerate(features):
+        values = projected.get(name, raw.get(name))
+        if values is not None:
+            X[:, j] = values
+        else:
+            # Training filled features the source couldn't provide; unknown ones are median-filled
+            X[:, j] = fill_value(name) if name in FEATURE_SPACE else np.nan
+    return X, errors
+
+
+def _score_chunk(task) -> dict:
+    """Read, preprocess and score one chunk; returns the rows ready to write, in order."""
+    started = time.perf_counter()
+    state = _worker
+    df = _read_chunk(task)
+    probabilities = np.empty(len(df))
+    errors: List[Optional[str]] = []
+    block = state["block_rows"]
+    for start in range(0, len(df), block):
+        raw, block_errors = _feature_matrix(df.iloc[start:start + block])
+        X = state["preprocessor"].transform(raw, copy=False)
+        probabilities[start:start + block] = state["model"].predict_proba(X)[:, state["fraud_col"]]
+        errors.extend(block_errors)
+    if state["threshold"] is not None:
+        thresholds = state["threshold"]
+    else:
+        segments = {col: df[col].to_numpy() for col in state["columns"]["segments"]}
+        thresholds = state["policy"].column_thresholds(segments, len(df))
+    invalid = np.array([error is not None for error in errors], dtype=bool)
+    labels = pd.array((probabilities > thresholds).astype(np.int8), dtype="Int8")
+    probabilities[invalid] = np.nan
+    labels[invalid] = pd.NA
+
+    out = df[state["columns"]["ids"]].copy()
+    out["fraud_probability"] = probabilities.round(6)
+    out["prediction"] = labels
+    out["error"] = pd.array(errors, dtype="string")
+    result = {
+        "rows": len(df), "blocked": int(labels.sum()), "errors": int(invalid.sum()),
+        "seconds": time.perf_counter() - started,
+    }
+    if state["output_format"] == "csv":
+        # Formatting in the worker keeps the parent's writer from becoming the bottleneck
+        result["payload"] = out.to_csv(header=False, index=False).encode()
+    else:
+        result["payload"] = out
+    return result
+
+
+def _init_worker(state: dict):
+    """Pool initializer: map the shared compiled forest and rebuild the scoring state."""
+    compiled, _ = load_artifact(state["artifact"])
+    _set_state(state, compiled, FittedPreprocessor.from_dict(state["preprocessor"]))
+
+
+def _set_state(state: dict, model, preprocessor: FittedPreprocessor):
+    _worker.clear()
+    _worker.update(state)
+    _worker["model"] = model
+    _worker["preprocessor"] = preprocessor
+    _worker["fraud_col"] = list(model.classes_).index(1)
+    _worker["block_rows"] = max(1, Config.BULK_SCORE_BLOCK_CELLS // getattr(model, "n_estimators", 1))
+    _worker["adapter"] = ADAPTERS[state["adapter_name"]]
+    _worker["policy"] = ThresholdPolicy(state["thresholds_path"]) if state["threshold"] is None else None
+
+
+def _worker_artifact(model, model_path: str, preprocessor: FittedPreprocessor, tmp_dir: str) -> str:
+    """Artifact directory the workers map: the compiled model itself, or the pickled forest compiled into `tmp_dir`."""
+    if isinstance(model, HybridForest):
+        return model_path
+    path = os.path.join(tmp_dir, "model.fmodel")
+    save_artifact(path, CompiledForest.from_sklearn(model), preprocessor.to_dict(), "bulk_score")
+    return path
+
+
+class _Writer:
+    """Appends scored chunks to a CSV or Parquet file in the order they are handed over."""
+
+    def __init__(self, path: str, id_columns: List[str]):
+        self.path = path
+        self.format = _file_format(path)
+        self._parquet = None
+        if self.format == "csv":
+            self._file = open(path, "wb")
+            self._file.write((",".join(id_columns + OUTPUT_COLUMNS) + "\n").encode())
+
+    def write(self, payload):
+        if self.format == "csv":
+            self._file.write(payload)
+            return
+        pa = _require_pyarrow()
+        table = pa.Table.from_pandas(payload, preserve_index=False)
+        if self._parquet is None:
+            self._parquet = pa.parquet.ParquetWriter(self.path, table.schema)
+        self._parquet.write_table(table)
+
+    def close(self):
+        if self.format == "csv":
+            self._file.close()
+        elif self._parquet is not None:
+            self._parquet.close()
+
+
+def _tasks(path: str, chunk_mb: float) -> Tuple[List[str], list, List[int]]:
+    """Header, chunk tasks and the input bytes (or row groups) each one covers, for progress."""
+    if _file_format(path) == "csv":
+        header, ranges = csv_ranges(path, int(chunk_mb * 1024 * 1024))
+        return header, ranges, [end - start for start, end in ranges]
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+    parquet = pq.ParquetFile(path)
+    groups = list(range(parquet.num_row_groups))
+    return parquet.schema_arrow.names, groups, [parquet.metadata.row_group(g).num_rows for g in groups]
+
+
+def bulk_score(input_path: str, output_path: str, model_path: str = None, preprocessor_path: str = None,
+               thresholds_path: str = Config.THRESHOLDS_PATH, threshold: Optional[float] = None,
+               adapter: str = "card", id_columns: List[str] = (), workers: int = Config.BULK_SCORE_WORKERS,
+               chunk_mb: float = Config.BULK_SCORE_CHUNK_MB,
+               progress_seconds: float = Config.BULK_SCORE_PROGRESS_SECONDS) -> dict:
+    """Score every row of `input_path` into `output_path` (same row order) and return a summary."""
+    started = time.perf_counter()
+    if model_path is None:
+        model_path = Config.COMPILED_MODEL_PATH if os.path.isdir(Config.COMPILED_MODEL_PATH) else Config.MODEL_PATH
+    if preprocessor_path is None and not os.path.isdir(model_path):
+        preprocessor_path = Config.PREPROCESSOR_PATH
+    if adapter not in ADAPTERS:
+        raise ValueError(f"Unknown adapter: {adapter} (expected one of {sorted(ADAPTERS)})")
+
+    header, tasks, weights = _tasks(input_path, chunk_mb)
+    state = {
+        "path": input_path, "format": _file_format(input_path), "output_format": _file_format(output_path),
+        "header": header, "model_path": model_path, "preprocessor_path": preprocessor_path,
+        "thresholds_path": thresholds_path, "threshold": threshold, "adapter_name": adapter,
+    }
+    model, preprocessor = load_candidate(model_path, preprocessor_path)
+    if workers <= 1 and isinstance(model, HybridForest):
+        model.estimator()  # Chunks are large batches: load the sklearn forest up front
+    state["columns"] = _input_columns(header, preprocessor.features, ADAPTERS[adapter], list(id_columns))
+    _set_state(state, model, preprocessor)
+    logger.info(f"🚀 Scoring {input_path} in {len(tasks)} chunks with {workers} workers ({model_path})")
+
+    writer = _Writer(output_path, list(id_columns))
+    total_weight = sum(weights) or 1
+    done_weight = rows = blocked = errors = 0
+    last_report = time.perf_counter()
+    tmp_dir = None
+
+    def write(result, weight):
+        nonlocal done_weight, rows, blocked, errors, last_report
+        writer.write(result["payload"])
+        rows += result["rows"]
+        blocked += result["blocked"]
+        errors += result["errors"]
+        done_weight += weight
+        now = time.perf_counter()
+        if now - last_report >= progress_seconds:
+            last_report = now
+            logger.info(f"⏳ {rows:,} rows ({done_weight / total_weight:.0%}) — {rows / (now - started):,.0f} rows/s")
+
+    try:
+        if workers <= 1:
+            for task, weight in zip(tasks, weights):
+                write(_score_chunk(task), weight)
+        else:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            max_in_flight = workers * Config.BULK_SCORE_IN_FLIGHT_PER_WORKER
+            tmp_dir = tempfile.mkdtemp(prefix="bulk_score_")
+            state["artifact"] = _worker_artifact(model, model_path, preprocessor, tmp_dir)
+            state["preprocessor"] = preprocessor.to_dict()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_worker, initargs=(state,)) as pool:
+                pending = deque()
+                for task, weight in zip(tasks, weights):
+                    pending.append((pool.submit(_score_chunk, task), weight))
+                    if len(pending) >= max_in_flight:
+                        future, w = pending.popleft()
+                        write(future.result(), w)
+                while pending:
+                    future, w = pending.popleft()
+                    write(future.result(), w)
+    finally:
+        writer.close()
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "input": input_path,
+        "output": output_path,
+        "model": model_path,
+        "rows": rows,
+        "blocked": blocked,
+        "block_rate": round(blocked / rows, 6) if rows else 0.0,
+        "errors": errors,
+        "chunks": len(tasks),
+        "workers": workers,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else None,
+    }
+    logger.info(f"✅ Scored {rows:,} rows in {elapsed:.1f}s ({summary['rows_per_sec']:,} rows/s)")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of transactions offline.")
+    parser.add_argument("input", help="CSV (no quoted fields spanning lines) or Parquet (.parquet) file of transactions")
+    parser.add_argument("output", help="Scores file (.csv or .parquet), rows in input order")
+    parser.add_argument("--model", default=None,
+                        help="Compiled model directory (.fmodel) or joblib pickle (default: the current version)")
+    parser.add_argument("--preprocessor", default=None, help="Preprocessor JSON for a pickled model")
+    parser.add_argument("--thresholds", default=Config.THRESHOLDS_PATH,
+                        help="Thresholds file; per-segment overrides apply when the input has those columns")
+    parser.add_argument("--threshold", type=float, default=None, help="One threshold for every row instead")
+    parser.add_argument("--adapter", choices=sorted(ADAPTERS), default="card",
+                        help="How the input's columns map onto the model features (as in training)")
+    parser.add_argument("--id-columns", nargs="*", default=[], help="Input columns copied to the output")
+    parser.add_argument("--workers", type=int, default=Config.BULK_SCORE_WORKERS)
+    parser.add_argument("--chunk-mb", type=float, default=Config.BULK_SCORE_CHUNK_MB)
+    args = parser.parse_args()
+
+    report = bulk_score(
+        args.input, args.output, args.model, args.preprocessor, args.thresholds, args.threshold,
+        args.adapter, args.id_columns, args.workers, args.chunk_mb,
+    )
+    print(json.dumps(report, indent=2))
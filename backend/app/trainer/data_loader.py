@@ -0,0 +1,347 @@
+# backend/app/trainer/data_loader.py
+import os
+import re
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+from backend.app.config import Config
+from backend.app.utils.logger import get_logger
+from backend.app.utils.validator import check_target, get_schema, log_problems
+from backend.app.model.velocity import VelocityStore, VELOCITY_FEATURES
+from backend.app.model.features import FEATURE_SPACE, fill_value
+from backend.app.trainer.harmonize import HARMONIZE_VERSION, adapter_for
+
+logger = get_logger("DataLoader")
+
+# PaySim transaction types; stored as float32 category codes (-1 for unseen values)
+CATEGORICAL_COLUMNS = {
+    "type": ["CASH_IN", "CASH_OUT", "DEBIT", "PAYMENT", "TRANSFER"],
+}
+# Free-text identifiers carry no signal for the model and would force object dtype
+SKIPPED_COLUMNS = {"nameOrig", "nameDest"}
+CACHE_FORMAT_VERSION = 2
+MANIFEST_FILE = "manifest.json"
+# Estimated bytes held per parsed cell while a chunk is in flight (text + parsed value + copies)
+PARSE_BYTES_PER_CELL = 64
+
+
+def count_rows(path: str, block_size: int = 16 * 1024 * 1024) -> int:
+    """Count data rows in a CSV by scanning raw bytes for newlines (header excluded)."""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def csv_dtypes(columns: List[str]) -> Dict[str, object]:
+    """Explicit parse dtypes: float32 for numeric features and labels, categoricals for `type`."""
+    dtypes = {}
+    for col in columns:
+        if col in CATEGORICAL_COLUMNS:
+            dtypes[col] = pd.CategoricalDtype(CATEGORICAL_COLUMNS[col])
+        elif col not in SKIPPED_COLUMNS:
+            dtypes[col] = np.float32
+    return dtypes
+
+
+def chunk_rows_for_budget(n_columns: int, budget_mb: float = Config.LOADER_MEMORY_BUDGET_MB) -> int:
+    """Rows per read_csv chunk so one in-flight chunk stays within the memory budget."""
+    rows = int(budget_mb * 1024 * 1024 // (max(n_columns, 1) * PARSE_BYTES_PER_CELL))
+    return max(rows, 1000)
+
+
+def _output_columns(file: str, header: List[str]) -> List[str]:
+    """Columns a source contributes: its parsed header plus any required columns it lacks."""
+    columns = []
+    for col in header + (Config.REQUIRED_COLUMNS.get(file) or []):
+        if col not in SKIPPED_COLUMNS and col not in columns:
+            columns.append(col)
+    if file in Config.VELOCITY_SOURCES:
+        columns += VELOCITY_FEATURES
+    return columns
+
+
+def _column_file(col: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", col) + ".npy"
+
+
+def hash_file(path: str, block_size: int = 16 * 1024 * 1024) -> str:
+    """SHA256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _schema_key(file: str) -> dict:
+    """Everything besides the file content that changes what the cache holds."""
+    return {
+        "format_version": CACHE_FORMAT_VERSION,
+        "required_columns": Config.REQUIRED_COLUMNS.get(file),
+        "target_column": Config.TARGET_COLUMN,
+        "categorical_columns": CATEGORICAL_COLUMNS,
+        "skipped_columns": sorted(SKIPPED_COLUMNS),
+        "velocity": [Config.VELOCITY_SOURCES.get(file), VELOCITY_FEATURES],
+    }
+
+
+def _read_manifest(cache_dir: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(cache_dir: str, manifest: dict) -> None:
+    with open(os.path.join(cache_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=4)
+
+
+def _replace_dir(tmp_dir: str, cache_dir: str) -> None:
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.rename(tmp_dir, cache_dir)
+
+
+def _open_columns(cache_dir: str, manifest: dict) -> Dict[str, np.ndarray]:
+    """Open cached columns copy-on-write: callers may modify them without touching the cache."""
+    rows = manifest["rows"]
+    return {
+        col: np.load(os.path.join(cache_dir, _column_file(col)), mmap_mode="c")[:rows]
+        for col in manifest["columns"]
+    }
+
+
+def _cached_source(file: str, path: str, cache_dir: str) -> Optional[dict]:
+    """Return the cache manifest for `file` if it still matches the source and schema."""
+    manifest = _read_manifest(cache_dir)
+    if manifest is None or manifest.get("schema") != _schema_key(file):
+        return None
+    stat = os.stat(path)
+    source = manifest["source"]
+    if source["size"] != stat.st_size:
+        return None
+    if source["mtime_ns"] != stat.st_mtime_ns:
+        # Touched but possibly unchanged: only the content hash can tell
+        if hash_file(path) != source["sha256"]:
+            return None
+        source["mtime_ns"] = stat.st_mtime_ns
+        _write_manifest(cache_dir, manifest)
+    return manifest
+
+
+def _build_source_cache(file: str, path: str, cache_dir: str) -> dict:
+    """Parse one CSV into per-column .npy files and write its manifest last."""
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    stat = os.stat(path)
+    sha256 = hash_file(path)
+    n_rows = count_rows(path)
+    columns = _output_columns(file, header)
+
+    tmp_dir = f"{cache_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    arrays = {}
+    for col in columns:
+        arrays[col] = np.lib.format.open_memmap(
+            os.path.join(tmp_dir, _column_file(col)), mode="w+", dtype=np.float32, shape=(n_rows,)
+        )
+        arrays[col][:] = np.nan
+
+    try:
+        try:
+            written = _stream_file(file, path, header, n_rows, arrays, 0)
+            for array in arrays.values():
+                array.flush()
+        finally:
+            del arrays  # Unmap the columns before the directory is moved or removed
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    manifest = {
+        "schema": _schema_key(file),
+        "source": {"file": file, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256},
+        "rows": written,
+        "columns": columns,
+    }
+    _write_manifest(tmp_dir, manifest)
+    _replace_dir(tmp_dir, cache_dir)
+    return manifest
+
+
+def _check_chunk(chunk: pd.DataFrame, file: str) -> None:
+    """Per-chunk version of validate_dataframe for the columns the loader keeps (missing ones are NaN-filled)."""
+    result = get_schema(file, with_target=Config.TARGET_COLUMN in chunk.columns).validate(chunk)
+    log_problems(result, file)
+    check_target(result, file, adapter_for(file).label)
+
+
+def _stream_file(file: str, path: str, header: List[str], n_rows: int, arrays: Dict[str, np.ndarray], start: int) -> int:
+    """Parse one CSV chunk by chunk into the preallocated column arrays; returns rows written."""
+    required_columns = Config.REQUIRED_COLUMNS.get(file)
+    if required_columns:
+        for col in required_columns:
+            if col not in header:
+                logger.warning(f"⚠️ Column '{col}' missing in {file}. Filling with NaN.")
+    else:
+        logger.warning(f"⚠️ No schema defined for {file}. Skipping validation.")
+
+    usecols = [col for col in header if col not in SKIPPED_COLUMNS]
+    # Card-keyed sources replay their history through a fresh velocity store, chunk by chunk
+    velocity = Config.VELOCITY_SOURCES.get(file)
+    store = None
+    read_cols = usecols
+    if velocity is not None and not all(velocity[k] in header for k in ("key", "time", "amount")):
+        logger.warning(f"⚠️ {file} lacks the velocity key/time/amount columns; velocity features left empty")
+        velocity = None
+    if velocity is not None:
+        store = VelocityStore()
+        read_cols = usecols + [velocity[k] for k in ("key", "merchant") if velocity.get(k) in SKIPPED_COLUMNS]
+    chunk_rows = chunk_rows_for_budget(len(header))
+    written = 0
+    dtypes = {**csv_dtypes(usecols), **{col: str for col in read_cols if col not in usecols}}
+    reader = pd.read_csv(path, usecols=read_cols, dtype=dtypes, chunksize=chunk_rows)
+    for chunk in reader:
+        if required_columns:
+            _check_chunk(chunk, file)
+
+        end = start + written + len(chunk)
+        if written + len(chunk) > n_rows:
+            raise ValueError(f"{file} has more rows than counted ({n_rows}); quoted newlines are not supported")
+        for col in usecols:
+            if col in CATEGORICAL_COLUMNS:
+                values = chunk[col].cat.codes.to_numpy(dtype=np.float32)
+            else:
+                values = chunk[col].to_numpy(dtype=np.float32, na_value=np.nan)
+            arrays[col][start + written:end] = values
+        if store is not None:
+            history = store.update_many(
+                chunk[velocity["key"]].tolist(),
+                chunk[velocity["time"]].to_numpy(dtype=np.float64) * velocity.get("time_unit_seconds", 1),
+                chunk[velocity["amount"]].to_numpy(dtype=np.float64),
+                chunk[velocity["merchant"]].tolist() if velocity.get("merchant") else None,
+            )
+            for k, col in enumerate(VELOCITY_FEATURES):
+                arrays[col][start + written:end] = history[:, k]
+        written += len(chunk)
+    return written
+
+
+def _combine(sources: List[Tuple[str, dict]]) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Project every source cache onto FEATURE_SPACE with its adapter and write
+    the result as one set of dense float32 column files (features any source
+    provides, then the target), reusing it when the same source versions are
+    combined again.
+    """
+    adapters = [adapter_for(manifest["source"]["file"]) for _, manifest in sources]
+    provided = [adapter.features(m["columns"]) for adapter, (_, m) in zip(adapters, sources)]
+    columns = [name for name in FEATURE_SPACE if any(name in features for features in provided)]
+    columns.append(Config.TARGET_COLUMN)
+    key = {
+        "sources": [[m["source"]["file"], m["source"]["sha256"], m["rows"], adapter.name]
+                    for adapter, (_, m) in zip(adapters, sources)],
+        "columns": columns,
+        "harmonize_version": HARMONIZE_VERSION,
+        "fill_values": [fill_value(col) for col in columns],
+        "schema": _schema_key("combined_dataset"),
+    }
+    combined_dir = os.path.join(Config.CACHE_DIR, "combined")
+    manifest = _read_manifest(combined_dir)
+    if manifest is not None and manifest.get("key") == key:
+        logger.info("♻️ Reusing combined dataset cache")
+        return _open_columns(combined_dir, manifest), manifest["rows"]
+
+    total_rows = sum(m["rows"] for _, m in sources)
+    tmp_dir = f"{combined_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    out = {
+        col: np.lib.format.open_memmap(
+            os.path.join(tmp_dir, _column_file(col)), mode="w+", dtype=np.float32, shape=(total_rows,)
+        )
+        for col in columns
+    }
+    offset = 0
+    block = Config.HARMONIZE_BLOCK_ROWS
+    for adapter, (cache_dir, source) in zip(adapters, sources):
+        rows = source["rows"]
+        arrays = {
+            col: np.load(os.path.join(cache_dir, _column_file(col)), mmap_mode="r")[:rows]
+            for col in source["columns"]
+        }
+        for start in range(0, rows, block):
+            stop = min(start + block, rows)
+            features, label = adapter.project({col: a[start:stop] for col, a in arrays.items()})
+            features[Config.TARGET_COLUMN] = label
+            for col, dest in out.items():
+                values = features.get(col)
+                dest[offset + start:offset + stop] = fill_value(col) if values is None else values
+        logger.info(f"🧩 Projected {source['source']['file']} with the '{adapter.name}' adapter")
+        offset += rows
+        del arrays
+    for dest in out.values():
+        dest.flush()
+    del out
+
+    manifest = {"key": key, "rows": total_rows, "columns": columns}
+    _write_manifest(tmp_dir, manifest)
+    _replace_dir(tmp_dir, combined_dir)
+    return _open_columns(combined_dir, manifest), total_rows
+
+
+def load_all_csvs_streaming(rebuild_cache: bool = False) -> pd.DataFrame:
+    """
+    Load every CSV in the data directory through the columnar dataset cache.
+
+    Each source is cached under CACHE_DIR/<file>/ as one float32 .npy per
+    column, keyed by the file's size, mtime and SHA256 plus the schema in
+    REQUIRED_COLUMNS. Unchanged files are reused; changed or new files are
+    streamed in chunks sized from LOADER_MEMORY_BUDGET_MB with explicit dtypes
+    and validated chunk by chunk. `rebuild_cache=True` re-parses everything.
+    Sources are then projected onto the common feature space by their
+    adapters (see harmonize.py), so the returned DataFrame is dense float32
+    with one target column; it wraps copy-on-write memory maps (no copies).
+    """
+    os.makedirs(Config.CACHE_DIR, exist_ok=True)
+    logger.info("🔍 Loading datasets from /data")
+
+    sources = []
+    for file in sorted(os.listdir(Config.DATA_DIR)):
+        if not file.endswith(".csv"):
+            continue
+        path = os.path.join(Config.DATA_DIR, file)
+        cache_dir = os.path.join(Config.CACHE_DIR, os.path.splitext(file)[0])
+        try:
+            manifest = None if rebuild_cache else _cached_source(file, path, cache_dir)
+            if manifest is not None:
+                logger.info(f"♻️ Using cached {file} — rows: {manifest['rows']}")
+            else:
+                manifest = _build_source_cache(file, path, cache_dir)
+                logger.info(f"✅ Loaded {file} — rows: {manifest['rows']}")
+            adapter_for(file).check(file, manifest["columns"])
+            sources.append((cache_dir, manifest))
+        except Exception as e:
+            logger.warning(f"❌ Skipped {file}: {e}")
+
+    if not sources:
+        raise ValueError("No valid CSVs found in the data directory.")
+
+    arrays, _ = _combine(sources)
+    combined_df = pd.DataFrame(arrays, copy=False)
+    logger.info(f"📊 Combined dataset shape: {combined_df.shape}")
+    return combined_df
@@ -0,0 +1,81 @@
+# backend/app/trainer/harmonize.py
+"""
+Projects each training source onto one declared feature space.
+
+Sources differ in what they record: the European card data has `Time`,
+`V1..V28` and `Amount`, while PaySim has `step`, a transaction `type` and
+account balances. Instead of taking the union of their columns (mostly NaN),
+every source goes through an adapter that maps its cached float32 columns
+onto `FEATURE_SPACE` and its label onto `Config.TARGET_COLUMN`; features a
+source cannot provide get `fill_value` (both in backend/app/model/features.py,
+shared with serving). Adapters are vectorized and the loader runs them on row
+blocks, so projecting never holds more than one block of derived features.
+"""
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+from backend.app.config import Config
+from backend.app.model.features import FEATURE_SPACE
+from backend.app.model.velocity import VELOCITY_FEATURES
+
+HARMONIZE_VERSION = 1
+
+Columns = Dict[str, np.ndarray]
+
+
+def _card(columns: Columns) -> Tuple[Columns, np.ndarray]:
+    """Card-style sources already use the feature names; anything else they carry is dropped."""
+    features = {name: columns[name] for name in FEATURE_SPACE if name in columns}
+    return features, columns.get(Config.TARGET_COLUMN)
+
+
+def _paysim(columns: Columns) -> Tuple[Columns, np.ndarray]:
+    amount = columns["amount"]
+    old_orig, new_orig = columns["oldbalanceOrg"], columns["newbalanceOrig"]
+    old_dest, new_dest = columns["oldbalanceDest"], columns["newbalanceDest"]
+    features = {
+        "Time": columns["step"] * np.float32(3600),
+        "Amount": amount,
+        "type_code": columns["type"] + np.float32(1),  # the loader stores codes, -1 for unseen types
+        "orig_balance_delta": new_orig - old_orig,
+        "dest_balance_delta": new_dest - old_dest,
+        "orig_balance_error": old_orig - amount - new_orig,
+        "dest_balance_error": old_dest + amount - new_dest,
+    }
+    features.update({name: columns[name] for name in VELOCITY_FEATURES if name in columns})
+    return features, columns.get("isFraud")
+
+
+class SourceAdapter:
+    """How one source maps onto FEATURE_SPACE: the columns it needs, its label, and the projection."""
+
+    def __init__(self, name: str, label: str, project: Callable[[Columns], Tuple[Columns, np.ndarray]],
+                 requires: List[str] = ()):
+        self.name = name
+        self.label = label
+        self.project = project
+        self.requires = list(requires)
+
+    def check(self, file: str, columns: List[str]) -> None:
+        missing = [col for col in self.requires + [self.label] if col not in columns]
+        if missing:
+            raise ValueError(f"{file} lacks columns the '{self.name}' adapter needs: {missing}")
+
+    def features(self, columns: List[str]) -> List[str]:
+        """FEATURE_SPACE names this adapter fills for a source cache holding `columns`."""
+        projected, _ = self.project({col: np.empty(0, dtype=np.float32) for col in columns})
+        return [name for name in FEATURE_SPACE if name in projected]
+
+
+ADAPTERS = {
+    "card": SourceAdapter("card", Config.TARGET_COLUMN, _card),
+    "paysim": SourceAdapter(
+        "paysim", "isFraud", _paysim,
+        requires=["step", "type", "amount", "oldbalanceOrg", "newbalanceOrig", "oldbalanceDest", "newbalanceDest"],
+    ),
+}
+
+
+def adapter_for(file: str) -> SourceAdapter:
+    """The adapter `Config.SOURCE_ADAPTERS` assigns to `file` (card-style by default)."""
+    return ADAPTERS[Config.SOURCE_ADAPTERS.get(file, "card")]
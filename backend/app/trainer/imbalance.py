@@ -0,0 +1,51 @@
+# backend/app/trainer/imbalance.py
+import numpy as np
+from typing import Tuple
+from sklearn.ensemble import RandomForestClassifier
+from imblearn.over_sampling import SMOTE
+from imblearn.under_sampling import RandomUnderSampler
+from imblearn.ensemble import BalancedRandomForestClassifier
+
+from backend.app.config import Config
+
+# How the trainer compensates for the rare fraud class:
+#   smote              - synthesize minority rows over the whole training matrix (grows it to 2x majority)
+#   undersample        - drop majority rows down to Config.UNDERSAMPLE_RATIO (shrinks the matrix)
+#   class_weight       - keep the data as is, weight classes inversely to their frequency
+#   balanced_bootstrap - each tree draws its own class-balanced bootstrap sample
+IMBALANCE_STRATEGIES = ("smote", "undersample", "class_weight", "balanced_bootstrap")
+
+
+def _check_strategy(strategy: str):
+    if strategy not in IMBALANCE_STRATEGIES:
+        raise ValueError(f"Unknown imbalance strategy: {strategy} (expected one of {IMBALANCE_STRATEGIES})")
+
+
+def resample(X: np.ndarray, y: np.ndarray, strategy: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Rebalance the training rows for strategies that work on the data itself."""
+    _check_strategy(strategy)
+    if strategy == "smote":
+        return SMOTE(random_state=Config.SMOTE_RANDOM_STATE).fit_resample(X, y)
+    if strategy == "undersample":
+        sampler = RandomUnderSampler(sampling_strategy=Config.UNDERSAMPLE_RATIO, random_state=Config.RANDOM_SEED)
+        return sampler.fit_resample(X, y)
+    return X, y
+
+
+def build_classifier(params: dict, n_jobs: int = 1):
+    """Forest for one hyperparameter config; `imbalance` picks the class weighting or sampler."""
+    strategy = params.get("imbalance", Config.IMBALANCE_STRATEGY)
+    _check_strategy(strategy)
+    common = dict(
+        n_estimators=params.get("n_estimators", Config.RF_N_ESTIMATORS),
+        max_depth=params.get("max_depth"),
+        min_samples_leaf=params.get("min_samples_leaf", 1),
+        random_state=Config.RANDOM_SEED,
+        n_jobs=n_jobs,
+    )
+    if strategy == "balanced_bootstrap":
+        return BalancedRandomForestClassifier(
+            sampling_strategy="all", replacement=True, bootstrap=False, **common
+        )
+    class_weight = Config.RF_CLASS_WEIGHT if strategy == "class_weight" else None
+    return RandomForestClassifier(class_weight=class_weight, **common)
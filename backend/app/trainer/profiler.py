@@ -0,0 +1,181 @@
+# backend/app/trainer/profiler.py
+"""
+Per-stage resource profile of a training run (trainer --profile).
+
+Each `with profiler.stage(name):` block records wall-clock seconds, CPU
+seconds (this process's threads plus reaped worker processes) and the peak
+RSS seen while it ran, sampled from /proc by a background thread. With
+`tracemalloc`, it also records the peak traced Python/NumPy allocation and
+the top allocating source lines. The trainer stores the profile in the model
+metadata and `compare_profiles` flags stages that got slower or bigger than
+in the previous run's profile.
+"""
+import os
+import time
+import threading
+import resource
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+from backend.app.config import Config
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("TrainingProfiler")
+
+MB = 1024 * 1024
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, or None where /proc isn't available."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def max_rss() -> int:
+    """Lifetime peak RSS of this process in bytes (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def _cpu_seconds() -> float:
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+class _RssSampler:
+    """Tracks the highest RSS seen since `reset()` from a daemon thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        rss = current_rss()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def reset(self):
+        self.peak = 0
+        self.sample()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(self.interval + 1)
+
+
+class TrainingProfiler:
+    """Collects stage profiles in the order the stages ran."""
+
+    def __init__(self, trace_allocations: bool = False, top_allocations: int = Config.PROFILE_TOP_ALLOCATIONS,
+                 sample_interval: float = Config.PROFILE_SAMPLE_INTERVAL_SECONDS):
+        self.trace_allocations = trace_allocations
+        self.top_allocations = top_allocations
+        self.stages = {}
+        self._sampler = _RssSampler(sample_interval)
+        self._started = time.perf_counter()
+        self._sampler.start()
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        self._sampler.reset()
+        rss_before = self._sampler.peak
+        baseline = None
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.take_snapshot()
+        wall, cpu = time.perf_counter(), _cpu_seconds()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, _cpu_seconds() - cpu
+            self._sampler.sample()
+            record = {
+                "wall_seconds": round(wall, 3),
+                "cpu_seconds": round(cpu, 3),
+                "peak_rss_mb": round(self._sampler.peak / MB, 1),
+                "rss_growth_mb": round((self._sampler.peak - rss_before) / MB, 1),
+            }
+            if self.trace_allocations:
+                record["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / MB, 1)
+                record["top_allocations"] = self._top_allocations(baseline)
+            self.stages[name] = record
+            logger.info(
+                f"⏱️ {name}: {record['wall_seconds']}s wall, {record['cpu_seconds']}s CPU, "
+                f"peak RSS {record['peak_rss_mb']} MB"
+            )
+
+    def _top_allocations(self, baseline) -> list:
+        """Source lines holding the most memory allocated during the stage and still live at its end."""
+        stats = tracemalloc.take_snapshot().compare_to(baseline, "lineno")[:self.top_allocations]
+        return [
+            {"location": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "size_mb": round(s.size_diff / MB, 2),
+             "count": s.count_diff}
+            for s in stats if s.size_diff > 0
+        ]
+
+    def finish(self) -> dict:
+        """Stop sampling and return the profile stored in the metadata."""
+        self._sampler.stop()
+        if self.trace_allocations:
+            tracemalloc.stop()
+        return {
+            "stages": self.stages,
+            "total_wall_seconds": round(time.perf_counter() - self._started, 3),
+            "max_rss_mb": round(max_rss() / MB, 1),
+            "cpu_count": os.cpu_count(),
+        }
+
+
+class NullTrainingProfiler:
+    """Stand-in when profiling is off: stages run unmeasured and nothing is stored."""
+
+    @contextmanager
+    def stage(self, name: str):
+        yield
+
+    def finish(self) -> Optional[dict]:
+        return None
+
+
+def compare_profiles(current: dict, previous: Optional[dict],
+                     tolerance: float = Config.PROFILE_REGRESSION_TOLERANCE,
+                     min_seconds: float = Config.PROFILE_REGRESSION_MIN_SECONDS,
+                     min_mb: float = Config.PROFILE_REGRESSION_MIN_MB) -> list:
+    """
+    Stages whose wall time or peak RSS grew by more than `tolerance` (a
+    fraction) over `previous`, ignoring absolute changes under `min_seconds` /
+    `min_mb` so small stages don't flap.
+    """
+    if not previous:
+        return []
+    regressions = []
+    for name, stage in current["stages"].items():
+        before = previous.get("stages", {}).get(name)
+        if not before:
+            continue
+        for key, floor in (("wall_seconds", min_seconds), ("peak_rss_mb", min_mb)):
+            old, new = before.get(key), stage.get(key)
+            if not old or new is None:
+                continue
+            if new - old > floor and new > old * (1 + tolerance):
+                regressions.append({
+                    "stage": name, "metric": key, "previous": old, "current": new,
+                    "change_pct": round((new / old - 1) * 100, 1),
+                })
+    return regressions
@@ -0,0 +1,168 @@
+# backend/app/trainer/search.py
+import os
+import math
+import time
+import shutil
+import itertools
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from sklearn.metrics import roc_auc_score, recall_score
+
+from backend.app.config import Config
+from backend.app.utils.logger import get_logger
+from backend.app.trainer.imbalance import build_classifier, resample
+
+logger = get_logger("HyperSearch")
+
+# Training matrix opened read-only from disk in each search worker: rows in
+# stratified training order, then the validation rows
+_X = None
+_y = None
+_n_train = None
+
+# Rows copied per block when the shared matrix is written
+SHARE_BLOCK_ROWS = 65536
+
+
+def candidate_grid(space: Dict[str, list] = Config.SEARCH_SPACE) -> List[dict]:
+    """Every combination of the search space, in a stable order."""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def share_matrix(directory: str, rows: Optional[np.ndarray] = None, **arrays: np.ndarray) -> str:
+    """
+    Write arrays once as .npy files that workers memory-map, reordered to
+    `rows` when given, block by block so no reordered copy is held in memory.
+    X is stored as float32, the dtype the forest converts its input to anyway.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name, array in arrays.items():
+        dtype = np.float32 if name == "X" else np.asarray(array[:0]).dtype
+        n_rows = len(array) if rows is None else len(rows)
+        out = np.lib.format.open_memmap(
+            os.path.join(directory, f"{name}.npy"), mode="w+", dtype=dtype, shape=(n_rows,) + array.shape[1:]
+        )
+        for start in range(0, n_rows, SHARE_BLOCK_ROWS):
+            stop = min(start + SHARE_BLOCK_ROWS, n_rows)
+            out[start:stop] = array[start:stop] if rows is None else array[rows[start:stop]]
+        out.flush()
+        del out
+    return directory
+
+
+def _open_shared(directory: str, n_train: int):
+    global _X, _y, _n_train
+    _X = np.load(os.path.join(directory, "X.npy"), mmap_mode="r")
+    _y = np.load(os.path.join(directory, "y.npy"), mmap_mode="r")
+    _n_train = n_train
+
+
+def _fit_candidate(index: int, params: dict, n_rows: int, n_jobs: int) -> dict:
+    """
+    Fit one candidate on the first `n_rows` of the shared training order and
+    score it on the validation rows. Both are slices, so views of the shared map.
+    """
+    start = time.perf_counter()
+    X_fit, y_fit = resample(_X[:n_rows], _y[:n_rows], params["imbalance"])
+    clf = build_classifier(params, n_jobs=n_jobs)
+    clf.fit(X_fit, y_fit)
+    y_val = _y[_n_train:]
+    y_prob = clf.predict_proba(_X[_n_train:])[:, list(clf.classes_).index(1)]
+    return {
+        "candidate": index,
+        "params": params,
+        "train_rows": int(n_rows),
+        "roc_auc": float(roc_auc_score(y_val, y_prob)),
+        "recall": float(recall_score(y_val, (y_prob > 0.5).astype(int), zero_division=0)),
+        "fit_seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _stratified_order(y: np.ndarray, rows: np.ndarray, seed: int) -> np.ndarray:
+    """
+    Shuffle `rows` so that every prefix keeps the class ratio, which lets each
+    rung train on a growing prefix that contains the previous rung's rows.
+    """
+    rng = np.random.default_rng(seed)
+    pos = rng.permutation(rows[y[rows] == 1])
+    neg = rng.permutation(rows[y[rows] != 1])
+    # Interleave by rank: each row's position is its fraction within its class
+    keys = np.concatenate([np.arange(len(pos)) / max(len(pos), 1), np.arange(len(neg)) / max(len(neg), 1)])
+    return np.concatenate([pos, neg])[np.argsort(keys, kind="stable")]
+
+
+def successive_halving(
+    X: np.ndarray,
+    y: np.ndarray,
+    candidates: List[dict],
+    workdir: str,
+    factor: int = Config.SEARCH_HALVING_FACTOR,
+    max_workers: int = Config.SEARCH_MAX_WORKERS,
+) -> Tuple[dict, List[dict]]:
+    """
+    Rank `candidates` by validation AUC with successive halving.
+
+    Every rung trains the surviving candidates concurrently in a process pool on
+    a stratified subsample, then keeps the best 1/`factor` of them for the next
+    rung, which gets `factor` times more rows. The final rung uses the whole
+    search-training split. Workers memory-map one on-disk copy of the matrix,
+    written in training order so every rung's rows and the validation rows are
+    contiguous slices of it, instead of receiving or indexing out a copy each.
+    They are started from a fork server (spawned where there is none): the
+    trainer's log listener thread is running. Returns the best params and the
+    leaderboard (one entry per candidate, from its last rung).
+    """
+    y = np.asarray(y)
+    rows = np.arange(len(y))
+    rng = np.random.default_rng(Config.RANDOM_SEED)
+    is_val = np.zeros(len(y), dtype=bool)
+    for label in np.unique(y):
+        label_rows = rows[y == label]
+        n_val = int(round(len(label_rows) * Config.SEARCH_VALIDATION_SIZE))
+        is_val[rng.choice(label_rows, n_val, replace=False)] = True
+    val_rows = rows[is_val]
+    train_order = _stratified_order(y, rows[~is_val], Config.RANDOM_SEED)
+
+    n_rungs = max(1, math.ceil(math.log(len(candidates), factor))) if len(candidates) > 1 else 1
+    share_matrix(workdir, rows=np.concatenate([train_order, val_rows]), X=X, y=y)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    cpus = os.cpu_count() or 1
+    results: Dict[int, dict] = {}
+    alive = list(range(len(candidates)))
+    try:
+        for rung in range(n_rungs):
+            n_rows = max(
+                int(len(train_order) / factor ** (n_rungs - 1 - rung)),
+                min(len(train_order), 1000),
+            )
+            workers = max(1, min(max_workers, len(alive)))
+            n_jobs = max(1, cpus // workers)
+            logger.info(
+                f"🔎 Rung {rung + 1}/{n_rungs}: {len(alive)} candidates on {n_rows} rows "
+                f"({workers} workers x {n_jobs} cores)"
+            )
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_open_shared,
+                                     initargs=(workdir, len(train_order))) as pool:
+                futures = [
+                    pool.submit(_fit_candidate, i, candidates[i], n_rows, n_jobs)
+                    for i in alive
+                ]
+                for future in futures:
+                    result = future.result()
+                    result["rung"] = rung + 1
+                    results[result["candidate"]] = result
+
+            alive.sort(key=lambda i: results[i]["roc_auc"], reverse=True)
+            if rung < n_rungs - 1:
+                alive = alive[:max(1, math.ceil(len(alive) / factor))]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    leaderboard = sorted(results.values(), key=lambda r: (r["rung"], r["roc_auc"]), reverse=True)
+    best = leaderboard[0]
+    logger.info(f"🏆 Best candidate: {best['params']} (validation AUC {best['roc_auc']:.4f})")
+    return best["params"], leaderboard
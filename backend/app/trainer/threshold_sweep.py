@@ -0,0 +1,102 @@
+# backend/app/trainer/threshold_sweep.py
+"""
+Pick the decision threshold on a validation slice held out of the training
+split (never the test split) by minimizing expected cost:
+
+    cost(t) = false_blocks(t) * Config.THRESHOLD_FALSE_POSITIVE_COST
+              + sum(amount of fraud with probability <= t)
+
+Every candidate threshold is evaluated at once: probabilities are sorted a
+single time and cumulative sums give the false blocks and missed fraud for
+each candidate via `searchsorted`, so a sweep is O(n log n) however many
+candidates there are.
+"""
+import os
+import json
+import numpy as np
+from typing import Optional
+
+from config import RULES_CONFIG
+from backend.app.config import Config
+from backend.app.model.thresholds import SEGMENT_FIELDS, parse_thresholds
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("ThresholdSweep")
+
+
+def sweep_thresholds(y_true: np.ndarray, y_prob: np.ndarray, amounts: Optional[np.ndarray] = None,
+                     false_positive_cost: float = Config.THRESHOLD_FALSE_POSITIVE_COST,
+                     step: float = Config.THRESHOLD_SWEEP_STEP) -> dict:
+    """
+    Cost, block rate, precision and recall for every threshold on a `step` grid.
+    `amounts` is the fraud loss per row; without it every missed fraud costs
+    `Config.THRESHOLD_MISSED_FRAUD_COST`.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    y_prob = np.asarray(y_prob, dtype=np.float64)
+    if amounts is None:
+        amounts = np.full(len(y_true), Config.THRESHOLD_MISSED_FRAUD_COST)
+    loss = np.where(y_true, np.asarray(amounts, dtype=np.float64), 0.0)
+
+    order = np.argsort(y_prob, kind="stable")
+    sorted_prob = y_prob[order]
+    # Prefix sums over rows sorted by probability: rows [0, k) are approved at threshold sorted_prob[k-1]
+    missed_loss = np.concatenate([[0.0], np.cumsum(loss[order])])
+    missed_fraud = np.concatenate([[0], np.cumsum(y_true[order])])
+    approved_genuine = np.concatenate([[0], np.cumsum(~y_true[order])])
+
+    thresholds = np.round(np.arange(step, 1.0, step), 6)
+    approved = np.searchsorted(sorted_prob, thresholds, side="right")  # rows with prob <= t
+    total_fraud = int(y_true.sum())
+    total_genuine = len(y_true) - total_fraud
+
+    false_blocks = total_genuine - approved_genuine[approved]
+    caught = total_fraud - missed_fraud[approved]
+    blocked = len(y_true) - approved
+    cost = false_blocks * false_positive_cost + missed_loss[approved]
+
+    best = int(np.argmin(cost))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(blocked > 0, caught / blocked, 0.0)
+    recall = caught / total_fraud if total_fraud else np.zeros(len(thresholds))
+
+    return {
+        "best_threshold": float(thresholds[best]),
+        "best_cost": float(cost[best]),
+        "false_positive_cost": false_positive_cost,
+        "rows": len(y_true),
+        "curve": {
+            "threshold": thresholds.tolist(),
+            "cost": np.round(cost, 2).tolist(),
+            "block_rate": np.round(blocked / max(len(y_true), 1), 6).tolist(),
+            "precision": np.round(precision, 6).tolist(),
+            "recall": np.round(recall, 6).tolist(),
+        },
+    }
+
+
+def save_thresholds(sweep: dict, path: str = Config.THRESHOLDS_PATH) -> dict:
+    """
+    Write the swept default threshold, keeping any per-segment overrides
+    already in the file. Written to a temp file and renamed so a serving
+    process polling the file never reads it half-written.
+    """
+    document = {"default": sweep["best_threshold"]}
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                previous = json.load(f)
+            parse_thresholds(previous, RULES_CONFIG["ml_threshold"])
+            for field in SEGMENT_FIELDS:
+                if previous.get(field):
+                    document[field] = previous[field]
+        except Exception as e:
+            logger.warning(f"⚠️ Dropping overrides from unreadable thresholds file {path}: {e}")
+    document["sweep"] = sweep
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(document, f, indent=4)
+    os.replace(tmp, path)
+    logger.info(f"✅ Thresholds saved at: {path} (default={sweep['best_threshold']}, cost={sweep['best_cost']:.2f})")
+    return document
@@ -1,25 +1,28 @@
 import os
 import json
-import hashlib
+import argparse
 import joblib
-import pandas as pd
+import numpy as np
 from datetime import datetime
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, roc_auc_score
-from imblearn.over_sampling import SMOTE
 
-from app.utils.logger import get_logger
-from app.utils.validator import validate_dataframe
-from app.utils.preprocessing import preprocess_data
-from app.config import Config
+from backend.app.utils.logger import get_logger
+from backend.app.utils.preprocessing import preprocess_data, FittedPreprocessor
+from backend.app.model.compiled_forest import CompiledForest
+from backend.app.model.artifact import save_artifact, artifact_digest, file_sha256
+from backend.app.trainer.data_loader import load_all_csvs_streaming
+from backend.app.trainer.imbalance import IMBALANCE_STRATEGIES, build_classifier, resample
+from backend.app.trainer.search import candidate_grid, successive_halving
+from backend.app.trainer.threshold_sweep import sweep_thresholds, save_thresholds
+from backend.app.trainer.profiler import NullTrainingProfiler, TrainingProfiler, compare_profiles
+from backend.app.config import Config
 
 logger = get_logger("FraudTrainer")
 
 def generate_model_hash(filepath: str) -> str:
     """Generate a SHA256 hash for the saved model file."""
-    with open(filepath, "rb") as f:
-        return hashlib.sha256(f.read()).hexdigest()
+    return file_sha256(filepath)
 
 def evaluate_model(y_true, y_pred, y_prob):
     """Print and return classification report and AUC."""
@@ -29,7 +32,9 @@ def evaluate_model(y_true, y_pred, y_prob):
     logger.info(f"AUC Score: {auc:.4f}")
     return report, auc
 
-def save_metadata(model_name: str, report: dict, auc_score: float, scaler_info: dict, hash_val: str):
+def save_metadata(model_name: str, report: dict, auc_score: float, scaler_info: dict, hash_val: str,
+                  params: dict = None, threshold: float = None, compiled_hash: str = None,
+                  profile: dict = None):
     """Save model training metadata securely."""
     metadata = {
         "model_name": model_name,
@@ -41,93 +46,181 @@ def save_metadata(model_name: str, report: dict, auc_score: float, scaler_info:
             "roc_auc": auc_score
         },
         "scaler": scaler_info,
-        "hash": hash_val
+        "hyperparameters": params,
+        "threshold": threshold,
+        "hash": hash_val,
+        "compiled_hash": compiled_hash,
+        "profile": profile
     }
     metadata_path = os.path.join(Config.MODEL_DIR, f"{model_name}_metadata.json")
     with open(metadata_path, "w") as f:
         json.dump(metadata, f, indent=4)
     logger.info(f"✅ Metadata saved at: {metadata_path}")
 
-def load_all_csvs():
-    """Load, validate, and combine all CSVs from /data."""
-    logger.info("🔍 Loading and validating datasets from /data")
-    dataframes = []
-
-    for file in os.listdir(Config.DATA_DIR):
-        if file.endswith(".csv"):
-            path = os.path.join(Config.DATA_DIR, file)
-            try:
-                df = pd.read_csv(path)
-                required_columns = Config.REQUIRED_COLUMNS.get(file)
-
-                if required_columns:
-                    # Add missing columns with NaN values
-                    for col in required_columns:
-                        if col not in df.columns:
-                            logger.warning(f"⚠️ Column '{col}' missing in {file}. Filling with NaN.")
-                            df[col] = pd.NA
-                else:
-                    logger.warning(f"⚠️ No schema defined for {file}. Skipping validation.")
-
-                # Validate the dataset
-                validate_dataframe(df, file)
-                dataframes.append(df)
-                logger.info(f"✅ Loaded {file} — shape: {df.shape}")
-            except Exception as e:
-                logger.warning(f"❌ Skipped {file}: {e}")
-
-    if not dataframes:
-        raise ValueError("No valid CSVs found in the data directory.")
-
-    # Combine all datasets
-    combined_df = pd.concat(dataframes, ignore_index=True)
-    logger.info(f"📊 Combined dataset shape: {combined_df.shape}")
-    return combined_df
-
-def train_fraud_model():
-    """Main training pipeline for the fraud detection model."""
+def export_compiled_forest(clf, scaler_info: dict, path: str = Config.COMPILED_MODEL_PATH) -> CompiledForest:
+    """Flatten the trained forest and write it as a memory-mappable artifact."""
+    compiled = CompiledForest.from_sklearn(clf)
+    save_artifact(path, compiled, scaler_info, Config.VERSION)
+    logger.info(f"✅ Compiled forest saved at: {path} ({compiled.n_nodes} nodes, max depth {compiled.max_depth})")
+    return compiled
+
+def save_leaderboard(model_name: str, leaderboard: list) -> str:
+    """Write the hyperparameter search results next to the model metadata."""
+    path = os.path.join(Config.MODEL_DIR, f"{model_name}_leaderboard.json")
+    with open(path, "w") as f:
+        json.dump(leaderboard, f, indent=4)
+    logger.info(f"✅ Search leaderboard saved at: {path}")
+    return path
+
+def default_params(imbalance: str = None) -> dict:
+    """Hyperparameters used when no search is run."""
+    return {
+        "n_estimators": Config.RF_N_ESTIMATORS,
+        "max_depth": None,
+        "min_samples_leaf": 1,
+        "imbalance": imbalance or Config.IMBALANCE_STRATEGY,
+    }
+
+def holdout_amounts(X: np.ndarray, scaler_info: dict):
+    """Unscaled transaction amounts of a scaled matrix, or None without an Amount feature."""
+    if "Amount" not in scaler_info["features"]:
+        return None
+    j = scaler_info["features"].index("Amount")
+    return X[:, j].astype(np.float64) * scaler_info["scale"][j] + scaler_info["mean"][j]
+
+def previous_profile(model_name: str):
+    """Training profile stored by the previous run of this model version, if it was profiled."""
+    try:
+        with open(os.path.join(Config.MODEL_DIR, f"{model_name}_metadata.json"), "r") as f:
+            return json.load(f).get("profile")
+    except (OSError, ValueError):
+        return None
+
+def report_profile(profile: dict, previous: dict):
+    """Attach and log regressions against the previous run's profile."""
+    profile["regressions"] = compare_profiles(profile, previous)
+    summary = ", ".join(f"{name} {stage['wall_seconds']}s/{stage['peak_rss_mb']}MB"
+                        for name, stage in profile["stages"].items())
+    logger.info(f"⏱️ Training profile: {summary}")
+    for r in profile["regressions"]:
+        logger.warning(
+            f"⚠️ {r['stage']} {r['metric']} regressed: {r['previous']} -> {r['current']} (+{r['change_pct']}%)"
+        )
+
+def load_all_csvs(rebuild_cache: bool = False):
+    """Load, validate, and combine all CSVs from /data via the columnar dataset cache."""
+    return load_all_csvs_streaming(rebuild_cache=rebuild_cache)
+
+def train_fraud_model(rebuild_cache: bool = False, search: bool = False, imbalance: str = None,
+                      profile: bool = False, trace_allocations: bool = False):
+    """
+    Main training pipeline for the fraud detection model. With `search`, the
+    hyperparameters come from a successive-halving search over
+    `Config.SEARCH_SPACE` on the training split instead of `Config`.
+    `imbalance` overrides `Config.IMBALANCE_STRATEGY` when not searching.
+    With `profile`, per-stage time and memory go into the metadata;
+    `trace_allocations` adds tracemalloc's top allocators and implies `profile`.
+    """
     logger.info("🚀 Starting training pipeline")
+    profiler = TrainingProfiler(trace_allocations) if profile or trace_allocations else NullTrainingProfiler()
+    model_name = f"fraud_model_{Config.VERSION}"
 
     # Load and merge all valid datasets
-    df = load_all_csvs()
+    with profiler.stage("load"):
+        df = load_all_csvs(rebuild_cache=rebuild_cache)
     logger.info(f"📊 Combined dataset shape: {df.shape}")
 
     # Preprocess: feature scaling, encoding, etc.
-    X, y, scaler_info = preprocess_data(df, "combined_dataset")
-
-    # Train/Test split with stratification
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, stratify=y, test_size=Config.TEST_SIZE, random_state=Config.RANDOM_SEED
-    )
+    with profiler.stage("preprocess"):
+        X, y, scaler_info = preprocess_data(df, "combined_dataset")
+        del df
+        # The forest trains on float32; converting once avoids a float64 split plus a copy per fit
+        X = X.astype(np.float32)
+
+    # Train/Test split with stratification; the threshold is picked on a validation slice of the
+    # training split so the test metrics stay unbiased
+    with profiler.stage("split"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, stratify=y, test_size=Config.TEST_SIZE, random_state=Config.RANDOM_SEED
+        )
+        X_train, X_val, y_train, y_val = train_test_split(
+            X_train, y_train, stratify=y_train, test_size=Config.THRESHOLD_VALIDATION_SIZE,
+            random_state=Config.RANDOM_SEED
+        )
+
+    # Pick hyperparameters
+    params = default_params(imbalance)
+    if search:
+        with profiler.stage("search"):
+            workdir = os.path.join(Config.CACHE_DIR, "search")
+            params, leaderboard = successive_halving(X_train, y_train, candidate_grid(), workdir)
+        save_leaderboard(model_name, leaderboard)
 
     # Handle class imbalance
-    sm = SMOTE(random_state=Config.SMOTE_RANDOM_STATE)
-    X_train_res, y_train_res = sm.fit_resample(X_train, y_train)
-
-    # Train model
-    clf = RandomForestClassifier(
-        n_estimators=Config.RF_N_ESTIMATORS,
-        random_state=Config.RANDOM_SEED,
-        class_weight=Config.RF_CLASS_WEIGHT
-    )
-    clf.fit(X_train_res, y_train_res)
-
-    # Evaluation
-    y_pred = clf.predict(X_test)
-    y_prob = clf.predict_proba(X_test)[:, 1]
-    report, auc_score = evaluate_model(y_test, y_pred, y_prob)
+    with profiler.stage("resample"):
+        X_train_res, y_train_res = resample(X_train, y_train, params["imbalance"])
+
+    # Train model on all cores
+    with profiler.stage("fit"):
+        clf = build_classifier(params, n_jobs=Config.TRAIN_N_JOBS)
+        clf.fit(X_train_res, y_train_res)
+
+    # Evaluation: cost-optimal threshold on the validation slice, metrics on the untouched test split
+    with profiler.stage("evaluate"):
+        fraud_column = list(clf.classes_).index(1)
+        val_prob = clf.predict_proba(X_val)[:, fraud_column]
+        sweep = sweep_thresholds(y_val, val_prob, holdout_amounts(X_val, scaler_info))
+        threshold = sweep["best_threshold"]
+        logger.info(f"🎯 Cost-optimal threshold on the validation slice: {threshold} (cost {sweep['best_cost']:.2f})")
+        y_prob = clf.predict_proba(X_test)[:, fraud_column]
+        y_pred = (y_prob > threshold).astype(int)
+        report, auc_score = evaluate_model(y_test, y_pred, y_prob)
 
     # Save model
-    model_filename = f"fraud_model_{Config.VERSION}.pkl"
-    model_path = os.path.join(Config.MODEL_DIR, model_filename)
-    joblib.dump(clf, model_path)
-    logger.info(f"✅ Model saved at: {model_path}")
-
-    # Save metadata
-    model_hash = generate_model_hash(model_path)
-    save_metadata(model_filename[:-4], report, auc_score, scaler_info, model_hash)
+    with profiler.stage("save"):
+        model_filename = f"{model_name}.pkl"
+        model_path = os.path.join(Config.MODEL_DIR, model_filename)
+        joblib.dump(clf, model_path)
+        logger.info(f"✅ Model saved at: {model_path}")
+        export_compiled_forest(clf, scaler_info)
+        FittedPreprocessor.from_dict(scaler_info).save(Config.PREPROCESSOR_PATH)
+        logger.info(f"✅ Preprocessor saved at: {Config.PREPROCESSOR_PATH}")
+        save_thresholds(sweep)
+        model_hash = generate_model_hash(model_path)
+        compiled_hash = artifact_digest(Config.COMPILED_MODEL_PATH) if os.path.isdir(Config.COMPILED_MODEL_PATH) else None
+
+    training_profile = profiler.finish()
+    if training_profile is not None:
+        report_profile(training_profile, previous_profile(model_name))
+
+    # Save metadata. Written last: serving processes watching the metadata file reload once it appears
+    save_metadata(model_name, report, auc_score, scaler_info, model_hash, params, threshold, compiled_hash,
+                  training_profile)
 
     logger.info("🎉 Training complete! Model & metadata saved securely.")
 
 if __name__ == "__main__":
-    train_fraud_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the fraud detection model.")
+    parser.add_argument(
+        "--rebuild-cache", action="store_true",
+        help="Re-parse every CSV instead of reusing the columnar dataset cache"
+    )
+    parser.add_argument(
+        "--search", action="store_true",
+        help="Pick hyperparameters with a parallel successive-halving search (writes a leaderboard)"
+    )
+    parser.add_argument(
+        "--imbalance", choices=IMBALANCE_STRATEGIES, default=None,
+        help=f"Class imbalance strategy (default: {Config.IMBALANCE_STRATEGY})"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Record wall/CPU time and peak RSS per stage in the metadata and compare with the previous run"
+    )
+    parser.add_argument(
+        "--tracemalloc", action="store_true",
+        help="Also record the top allocating source lines per stage (slower; implies --profile)"
+    )
+    args = parser.parse_args()
+    train_fraud_model(rebuild_cache=args.rebuild_cache, search=args.search, imbalance=args.imbalance,
+                      profile=args.profile, trace_allocations=args.tracemalloc)
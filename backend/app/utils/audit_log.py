@@ -0,0 +1,267 @@
+# backend/app/utils/audit_log.py
+"""
+Append-only binary audit log of scored transactions.
+
+The log is a directory of segment files named `audit-<start ms>.seg`. A segment
+starts with a magic string and a length-prefixed JSON header naming the raw
+feature columns, followed by length-prefixed records:
+
+    uint32 length | float64 timestamp | float32 probability | uint8 label |
+    float32 latency_ms | uint16 len(model_version) | uint16 len(transaction_id) |
+    uint16 len(rule) | model_version | transaction_id | rule |
+    float32 raw features[n_features]
+
+`rule` names the rules-stage rule that decided the transaction; it is empty
+when the model decided. Rule decisions never reach the model, so their
+probability is NaN. Segments of format version 1 have no rule field; the
+reader reports their records as model decisions.
+
+A new segment is started when the current one reaches the size limit, when the
+feature columns change (e.g. after a model reload), and on every process start,
+so files are never reopened for writing. A record cut short by a crash is
+ignored by the reader.
+"""
+import os
+import json
+import time
+import queue
+import struct
+import threading
+import numpy as np
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from backend.app.config import Config
+from backend.app.utils.logger import get_logger
+
+logger = get_logger("AuditLog")
+
+SEGMENT_MAGIC = b"FDAUDIT\x01"
+AUDIT_FORMAT_VERSION = 2
+_LENGTH = struct.Struct("<I")
+_RECORD = struct.Struct("<dfBfHHH")
+_RECORD_V1 = struct.Struct("<dfBfHH")
+
+
+def _segment_start(name: str) -> int:
+    return int(name[len("audit-"):].split(".")[0].split("-")[0])
+
+
+def list_segments(directory: str) -> List[Tuple[int, str]]:
+    """(start ms, path) of every segment in `directory`, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    names = [n for n in os.listdir(directory) if n.startswith("audit-") and n.endswith(".seg")]
+    return sorted((_segment_start(n), os.path.join(directory, n)) for n in names)
+
+
+def encode_records(features: np.ndarray, probabilities, labels, model_version: str,
+                   transaction_ids: Sequence[str], latency_ms: float, timestamp: float,
+                   rules: Optional[Sequence[Optional[str]]] = None) -> bytes:
+    """Pack a block of decisions that share a timestamp, model version and latency."""
+    version = model_version.encode("utf-8")
+    features = np.ascontiguousarray(features, dtype=np.float32)
+    parts = []
+    for i in range(len(features)):
+        txid = str(transaction_ids[i] or "").encode("utf-8")[:0xFFFF]
+        rule = (rules[i] or "").encode("utf-8")[:0xFFFF] if rules is not None else b""
+        row = features[i].tobytes()
+        body = _RECORD.pack(timestamp, probabilities[i], labels[i], latency_ms, len(version), len(txid), len(rule))
+        parts.append(_LENGTH.pack(len(body) + len(version) + len(txid) + len(rule) + len(row)))
+        parts.extend((body, version, txid, rule, row))
+    return b"".join(parts)
+
+
+class AuditLog:
+    """
+    Queues decisions from the request path and writes them from one background
+    thread, so a slow disk never delays a response. The queue is bounded;
+    when it is full the decision is dropped and counted rather than blocking.
+    """
+
+    def __init__(self, directory: str = Config.AUDIT_DIR,
+                 segment_max_bytes: int = Config.AUDIT_SEGMENT_MAX_BYTES,
+                 queue_size: int = Config.AUDIT_QUEUE_SIZE):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._features: Optional[List[str]] = None
+        self._segment_bytes = 0
+        self.written = 0
+        self.dropped = 0
+        self.segments = 0
+
+    def record(self, features: np.ndarray, feature_names: List[str], probabilities, labels,
+               model_version: str, transaction_ids: Sequence[str], latency_ms: float,
+               rules: Optional[Sequence[Optional[str]]] = None):
+        """
+        Queue one or more decisions. `features` holds the raw (unscaled) rows
+        in `feature_names` order so a replay can apply another model's preprocessing.
+        `rules` names the rule that decided each row (None where the model did).
+        """
+        self._ensure_started()
+        item = (time.time(), feature_names, np.atleast_2d(features), probabilities, labels,
+                model_version, transaction_ids, latency_ms, rules)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += len(item[2])
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    os.makedirs(self.directory, exist_ok=True)
+                    self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                    self._thread.start()
+
+    def _open_segment(self, feature_names: List[str], timestamp: float):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        start_ms = int(timestamp * 1000)
+        path = os.path.join(self.directory, f"audit-{start_ms:013d}.seg")
+        suffix = 0
+        while True:
+            try:
+                # Exclusive create: two workers rotating in the same millisecond never share a segment
+                self._file = open(path, "xb")
+                break
+            except FileExistsError:
+                suffix += 1
+                path = os.path.join(self.directory, f"audit-{start_ms:013d}-{suffix}.seg")
+        header = json.dumps({
+            "format_version": AUDIT_FORMAT_VERSION,
+            "features": list(feature_names),
+            "started": timestamp,
+        }).encode("utf-8")
+        self._file.write(SEGMENT_MAGIC + _LENGTH.pack(len(header)) + header)
+        self._features = list(feature_names)
+        self._segment_bytes = self._file.tell()
+        self.segments += 1
+
+    def _write(self, item):
+        timestamp, names, features, probabilities, labels, version, txids, latency_ms, rules = item
+        if self._file is None or names != self._features or self._segment_bytes >= self.segment_max_bytes:
+            self._open_segment(names, timestamp)
+        data = encode_records(features, probabilities, labels, version, txids, latency_ms, timestamp, rules)
+        self._file.write(data)
+        self._segment_bytes += len(data)
+        self.written += len(features)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            stop = item is None
+            try:
+                if not stop:
+                    self._write(item)
+                # Drain whatever else is queued before one flush
+                while not stop:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                    else:
+                        self._write(item)
+                if self._file is not None:
+                    self._file.flush()
+            except Exception as e:
+                logger.error(f"❌ Audit log write failed: {e}")
+            if stop:
+                if self._file is not None:
+                    os.fsync(self._file.fileno())
+                    self._file.close()
+                    self._file = None
+                return
+
+    def close(self, timeout: float = 5.0):
+        """Write everything queued so far, then stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+            "segments": self.segments,
+        }
+
+
+def read_segment(path: str, start: Optional[float] = None, end: Optional[float] = None) -> dict:
+    """
+    Decode one segment into columns, keeping records with `start <= timestamp < end`.
+    Returns the feature names, a float32 feature matrix and per-record arrays;
+    `rule` is "" for model decisions.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(SEGMENT_MAGIC):
+        raise ValueError(f"Not an audit segment: {path}")
+    offset = len(SEGMENT_MAGIC)
+    (header_len,) = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    header = json.loads(data[offset:offset + header_len])
+    offset += header_len
+    n_features = len(header["features"])
+    row_bytes = 4 * n_features
+    record = _RECORD if header.get("format_version", 1) >= 2 else _RECORD_V1
+
+    timestamps, probabilities, labels, latencies, versions, txids, rules, row_offsets = [], [], [], [], [], [], [], []
+    size = len(data)
+    while offset + _LENGTH.size <= size:
+        (length,) = _LENGTH.unpack_from(data, offset)
+        body = offset + _LENGTH.size
+        if body + length > size:
+            break  # partial record at the tail
+        ts, prob, label, latency, vlen, tlen, *rlen = record.unpack_from(data, body)
+        offset = body + length
+        if (start is not None and ts < start) or (end is not None and ts >= end):
+            continue
+        rlen = rlen[0] if rlen else 0
+        strings = body + record.size
+        timestamps.append(ts)
+        probabilities.append(prob)
+        labels.append(label)
+        latencies.append(latency)
+        versions.append(data[strings:strings + vlen].decode("utf-8"))
+        txids.append(data[strings + vlen:strings + vlen + tlen].decode("utf-8"))
+        rules.append(data[strings + vlen + tlen:strings + vlen + tlen + rlen].decode("utf-8"))
+        row_offsets.append(strings + vlen + tlen + rlen)
+
+    # Gather every feature row with one fancy-indexing pass over the raw bytes
+    raw = np.frombuffer(data, dtype=np.uint8)
+    byte_index = np.asarray(row_offsets, dtype=np.intp)[:, None] + np.arange(row_bytes, dtype=np.intp)
+    features = raw[byte_index].view(np.float32).reshape(len(row_offsets), n_features)
+
+    return {
+        "features": header["features"],
+        "X": features,
+        "timestamp": np.array(timestamps, dtype=np.float64),
+        "probability": np.array(probabilities, dtype=np.float32),
+        "label": np.array(labels, dtype=np.uint8),
+        "latency_ms": np.array(latencies, dtype=np.float32),
+        "model_version": versions,
+        "transaction_id": txids,
+        "rule": rules,
+    }
+
+
+def iter_range(directory: str, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[dict]:
+    """Decoded segments overlapping `[start, end)`, oldest first; segments outside it are not opened."""
+    segments = list_segments(directory)
+    for i, (start_ms, path) in enumerate(segments):
+        next_start = segments[i + 1][0] / 1000 if i + 1 < len(segments) else None
+        if start is not None and next_start is not None and next_start <= start:
+            continue
+        if end is not None and start_ms / 1000 >= end:
+            break
+        yield read_segment(path, start, end)
@@ -1,18 +1,23 @@
 import os
+import queue
+import atexit
+import random
+import threading
+import time
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from backend.app.config import Config
 
+# Shared by every logger in async mode: one bounded queue drained by one writer thread
+_log_queue = None
+_listener = None
+_listener_lock = threading.Lock()
+# Names of loggers set up by get_logger, so reconfigure_logging can reach them
+_configured = set()
 
-def get_logger(name: str) -> logging.Logger:
-    """Create and configure a logger."""
-    logger = logging.getLogger(name)
-    logger.setLevel(Config.LOG_LEVEL)
-
-    # Prevent adding handlers multiple times
-    if logger.handlers:
-        return logger
 
+def _build_handlers() -> list:
+    """The file and console handlers that do the actual writing."""
     # Ensure log directory exists
     os.makedirs(os.path.dirname(Config.LOG_FILE), exist_ok=True)
 
@@ -28,12 +33,151 @@ def get_logger(name: str) -> logging.Logger:
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
 
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(Config.LOG_LEVEL)
     console_handler.setFormatter(file_formatter)
-    logger.addHandler(console_handler)
+    return [file_handler, console_handler]
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the background writer without formatting them. The
+    message and its args are merged by the writer thread, so `%s` arguments
+    cost nothing on the caller. When the queue is full the record is dropped
+    and counted instead of blocking the request.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+class RequestLogFilter(logging.Filter):
+    """
+    Sampling plus a token-bucket rate limit for per-request log lines.
+    INFO and below are kept with probability `sample_rate`; everything below
+    ERROR is then capped at `rate_per_sec` (burst of one second). Errors always pass.
+    """
+
+    def __init__(self, sample_rate: float = None, rate_per_sec: float = None):
+        super().__init__()
+        self.sample_rate = Config.LOG_REQUEST_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.rate_per_sec = Config.LOG_REQUEST_RATE_LIMIT if rate_per_sec is None else rate_per_sec
+        self._tokens = self.rate_per_sec
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+        if record.levelno <= logging.INFO and random.random() >= self.sample_rate:
+            self.suppressed += 1
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_per_sec, self._tokens + (now - self._last) * self.rate_per_sec)
+            self._last = now
+            if self._tokens < 1:
+                self.suppressed += 1
+                return False
+            self._tokens -= 1
+        return True
+
+
+def _get_queue() -> queue.Queue:
+    """Start the shared background writer on first use."""
+    global _log_queue, _listener
+    with _listener_lock:
+        if _listener is None:
+            _log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+            _listener = QueueListener(_log_queue, *_build_handlers(), respect_handler_level=True)
+            _listener.start()
+    return _log_queue
+
+
+def stop_logging():
+    """Flush queued records and stop the background writer."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def logging_stats() -> dict:
+    """Queue depth and drop counters of the async logging pipeline."""
+    return {
+        "async": Config.LOG_ASYNC,
+        "queued": _log_queue.qsize() if _log_queue is not None else 0,
+        "dropped": NonBlockingQueueHandler.dropped,
+    }
+
+
+def _attach_handlers(logger: logging.Logger):
+    if Config.LOG_ASYNC:
+        # Writes happen on the listener thread; the caller only enqueues
+        logger.addHandler(NonBlockingQueueHandler(_get_queue()))
+    else:
+        for handler in _build_handlers():
+            logger.addHandler(handler)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Create and configure a logger."""
+    logger = logging.getLogger(name)
+    logger.setLevel(Config.LOG_LEVEL)
+
+    # Prevent adding handlers multiple times
+    if logger.handlers:
+        return logger
+
+    _attach_handlers(logger)
+    _configured.add(name)
+    return logger
+
+
+def reconfigure_logging():
+    """
+    Re-apply the current `Config` logging settings (async mode, sampling, rate
+    limit) to every logger created by `get_logger`.
+    """
+    stop_logging()
+    for name in _configured:
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        _attach_handlers(logger)
+        for f in logger.filters:
+            if isinstance(f, RequestLogFilter):
+                logger.removeFilter(f)
+                logger.addFilter(RequestLogFilter())
+
 
+def get_request_logger(name: str) -> logging.Logger:
+    """
+    Logger for per-request lines on the hot path: same output as `get_logger`,
+    but sampled and rate limited by a `RequestLogFilter`. Use %-style args so
+    formatting only happens for lines that are kept.
+    """
+    logger = get_logger(name)
+    # Usually a child of a module logger that has its own handler; don't write twice
+    logger.propagate = False
+    if not any(isinstance(f, RequestLogFilter) for f in logger.filters):
+        logger.addFilter(RequestLogFilter())
     return logger
@@ -0,0 +1,262 @@
+# backend/app/utils/metrics.py
+"""
+In-process metrics with Prometheus text exposition (`REGISTRY.render()`).
+
+Metric children are preallocated and updated with plain attribute/list
+increments, with no locks: under the GIL a concurrent increment from another
+thread can very rarely be lost, which is acceptable for monitoring and keeps
+`observe`/`inc` at well under a microsecond. Most updates happen on the event
+loop thread anyway.
+"""
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_MS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Bucket counters are preallocated so `observe` is a
+    bisect plus two additions; `snapshot` returns cumulative (le) counts.
+    """
+
+    def __init__(self, name: str, buckets: Iterable[float]):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": buckets}
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge(Counter):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Family:
+    """
+    A named metric and its children, one per label-value tuple. Look children
+    up once with `labels()` and keep them when the labels are fixed.
+    """
+
+    def __init__(self, name: str, help_text: str, kind: str, label_names: Tuple[str, ...] = (),
+                 factory: Callable = Counter):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self.factory = factory
+        self._children: Dict[Tuple, object] = {}
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, self.factory())
+        return child
+
+    def samples(self) -> Iterable[Tuple[Tuple, object]]:
+        return list(self._children.items())
+
+
+def _render_histogram(lines: List[str], name: str, label_names: Tuple, values: Tuple, hist: Histogram):
+    cumulative = 0
+    for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+        cumulative += count
+        le = f'le="{_format_value(bound)}"'
+        lines.append(f"{name}_bucket{_label_text(label_names, values, le)} {cumulative}")
+    labels = _label_text(label_names, values)
+    lines.append(f"{name}_sum{labels} {_format_value(round(hist.sum, 6))}")
+    lines.append(f"{name}_count{labels} {hist.count}")
+
+
+class Registry:
+    """Holds metric families plus callbacks read at scrape time, and renders them."""
+
+    def __init__(self):
+        self._families: Dict[str, Family] = {}
+        self._collectors: List[Tuple[str, str, str, Tuple[str, ...], Callable]] = []
+
+    def _family(self, name: str, help_text: str, kind: str, label_names, factory) -> Family:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = Family(name, help_text, kind, label_names, factory)
+        return family
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Family:
+        return self._family(name, help_text, "counter", label_names, Counter)
+
+    def gauge(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()) -> Family:
+        return self._family(name, help_text, "gauge", label_names, Gauge)
+
+    def histogram(self, name: str, help_text: str, buckets: Iterable[float] = LATENCY_MS_BUCKETS,
+                  label_names: Tuple[str, ...] = ()) -> Family:
+        buckets = tuple(buckets)
+        return self._family(name, help_text, "histogram", label_names, lambda: Histogram(name, buckets))
+
+    def collector(self, name: str, help_text: str, kind: str, fn: Callable, label_names: Tuple[str, ...] = ()):
+        """
+        Register `fn()`, called at scrape time. It returns a number or Histogram,
+        or a {label values tuple: number or Histogram} dict when `label_names` is set.
+        Returning None skips the metric.
+        """
+        self._collectors = [c for c in self._collectors if c[0] != name]
+        self._collectors.append((name, help_text, kind, tuple(label_names), fn))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self._families.values():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in family.samples():
+                if family.kind == "histogram":
+                    _render_histogram(lines, family.name, family.label_names, values, child)
+                else:
+                    lines.append(f"{family.name}{_label_text(family.label_names, values)} {_format_value(child.value)}")
+
+        for name, help_text, kind, label_names, fn in self._collectors:
+            try:
+                result = fn()
+            except Exception:
+                continue
+            if result is None:
+                continue
+            samples = result.items() if label_names else [((), result)]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for values, value in samples:
+                if isinstance(value, Histogram):
+                    _render_histogram(lines, name, label_names, values, value)
+                else:
+                    lines.append(f"{name}{_label_text(label_names, values)} {_format_value(float(value))}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class StageTimer:
+    """
+    Times consecutive stages of one request: `mark(stage)` observes the time
+    since the previous mark (or construction) in that stage's histogram.
+    """
+    __slots__ = ("_histograms", "_last")
+
+    def __init__(self, histograms: Dict[str, Histogram]):
+        self._histograms = histograms
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self._histograms[stage].observe((now - self._last) * 1000.0)
+        self._last = now
+
+
+class NullStageTimer:
+    """Stand-in when metrics are disabled."""
+    __slots__ = ()
+
+    def mark(self, stage: str) -> None:
+        pass
+
+
+NULL_STAGE_TIMER = NullStageTimer()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency by route and status, requests
+    in flight, and, for endpoints that stamp `scope["metrics.endpoint"] =
+    [started, finished]`, the time spent before the endpoint ran (body read,
+    JSON decode, Pydantic validation, auth) and after it returned (response
+    serialization) in `stage_histograms["parse"/"serialize"]`.
+    """
+
+    def __init__(self, app, enabled: Callable[[], bool], stage_histograms: Optional[Dict[str, Histogram]] = None,
+                 registry: Registry = REGISTRY):
+        self.app = app
+        self.enabled = enabled
+        self.stages = stage_histograms or {}
+        self.latency = registry.histogram(
+            "fraud_http_request_ms", "HTTP request latency in milliseconds", LATENCY_MS_BUCKETS,
+            ("route", "method", "status"),
+        )
+        self.in_flight = registry.gauge("fraud_http_requests_in_flight", "HTTP requests being handled").labels()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled():
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = [500]
+        response_started = [None]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                response_started[0] = time.perf_counter()
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            finished = time.perf_counter()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            self.latency.labels(path, scope["method"], status[0]).observe((finished - started) * 1000.0)
+            endpoint = scope.get("metrics.endpoint")
+            if endpoint is not None and self.stages:
+                self.stages["parse"].observe((endpoint[0] - started) * 1000.0)
+                if endpoint[1] is not None and response_started[0] is not None:
+                    self.stages["serialize"].observe((response_started[0] - endpoint[1]) * 1000.0)
@@ -1,10 +1,12 @@
+import json
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import SimpleImputer
+from datetime import datetime
+from typing import List, Optional, Tuple
 from backend.app.config import Config
+from backend.app.model.features import FEATURE_SPACE, fill_value
 from backend.app.utils.logger import get_logger
-from backend.app.utils.validator import validate_dataframe
+from backend.app.utils.validator import CompiledSchema, validate_dataframe
 
 logger = get_logger("Preprocessing")
 
@@ -29,7 +31,7 @@ def preprocess_data(df: pd.DataFrame, dataset_name: str):
     logger.info(f"📊 Initial shape: {df.shape}")
 
     # Handle missing values in critical columns
-    critical_columns = Config.REQUIRED_COLUMNS.get(dataset_name, [])
+    critical_columns = list(Config.REQUIRED_COLUMNS.get(dataset_name, []))
     if Config.TARGET_COLUMN in df.columns:
         critical_columns.append(Config.TARGET_COLUMN)
 
@@ -40,45 +42,210 @@ def preprocess_data(df: pd.DataFrame, dataset_name: str):
                 logger.warning(f"⚠️ Column '{col}' contains {missing_count} nulls. Filling with median.")
                 df[col] = df[col].fillna(df[col].median())
 
-    # Drop rows where the target column is still missing
+    # Drop rows where the target column is still missing (dropna copies the frame even when nothing is dropped)
     if Config.TARGET_COLUMN in df.columns:
         missing_target_count = df[Config.TARGET_COLUMN].isnull().sum()
         if missing_target_count > 0:
             logger.warning(f"⚠️ Dropping {missing_target_count} rows with missing target values.")
-        df.dropna(subset=[Config.TARGET_COLUMN], inplace=True)
+            df.dropna(subset=[Config.TARGET_COLUMN], inplace=True)
 
     logger.info(f"🧹 After handling critical missing values: {df.shape}")
 
     # Separate features and target
     X = df.drop(columns=[Config.TARGET_COLUMN])
-    y = df[Config.TARGET_COLUMN]
-
-    # Handle missing values in all features
-    logger.info("🔄 Imputing missing values for all features")
-    imputer = SimpleImputer(strategy="median")  # For numerical columns, use median
-    X_imputed = pd.DataFrame(imputer.fit_transform(X), columns=X.columns)
-    
-    # Double-check for remaining NaN values
-    if X_imputed.isnull().values.any():
-        logger.error("❌ Imputation failed! Features still contain NaN values.")
-        raise ValueError("Features still contain NaN values after imputation.")
+    y = df[Config.TARGET_COLUMN].astype(np.int64)  # Loader stores labels as float32
 
     # Select only numeric features
-    numeric_cols = X_imputed.select_dtypes(include=[np.number]).columns.tolist()
-    X_numeric = X_imputed[numeric_cols]
-
-    # Scale numeric features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X_numeric)
+    numeric_cols = X.select_dtypes(include=[np.number]).columns.tolist()
 
-    logger.info("⚙️ Features scaled successfully")
+    # Median-fill and standardize column by column into one float64 matrix, so peak memory
+    # stays at the output plus one column; the math matches FittedPreprocessor.transform
+    logger.info("🔄 Imputing missing values for all features")
+    X_scaled = np.empty((len(X), len(numeric_cols)), dtype=np.float64)
+    stats = {}
+    kept = []
+    for col in numeric_cols:
+        values = np.array(X[col].to_numpy(), dtype=np.float64)
+        missing = np.isnan(values)
+        has_missing = missing.any()
+        median = np.nanmedian(values) if has_missing else np.median(values)
+        if np.isnan(median):
+            logger.warning(f"⚠️ Column '{col}' has no values. Dropping it.")
+            continue
+        if has_missing:
+            values[missing] = median
+        mean = values.mean()
+        scale = values.std()
+        scale = scale if scale > 0 else 1.0  # constant columns are left unscaled, as StandardScaler does
+        values -= mean
+        values *= 1.0 / scale
+        X_scaled[:, len(kept)] = values
+        stats[col] = (float(mean), float(scale), float(median))
+        kept.append(col)
+    if len(kept) < len(numeric_cols):
+        X_scaled = np.ascontiguousarray(X_scaled[:, :len(kept)])
 
     # Collect scaling info for metadata
     scaler_info = {
-        "mean": scaler.mean_.tolist(),
-        "scale": scaler.scale_.tolist(),
-        "features": numeric_cols
+        "mean": [stats[col][0] for col in kept],
+        "scale": [stats[col][1] for col in kept],
+        "median": [stats[col][2] for col in kept],
+        "features": kept
     }
 
+    logger.info("⚙️ Features scaled successfully")
+
     logger.info("✅ Preprocessing complete")
-    return X_scaled, y.values, scaler_info
\ No newline at end of file
+    return X_scaled, y.values, scaler_info
+
+def parse_time_value(value) -> float:
+    """
+    Converts a transaction `time` field into the numeric `Time` feature.
+    Numeric values are used as-is; ISO timestamps become seconds since midnight.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    return float(parsed.hour * 3600 + parsed.minute * 60 + parsed.second)
+
+
+def _feature_source(feature: str, sample: dict):
+    """Resolve which record key feeds a model feature (exact name first, then lowercase)."""
+    if feature in sample:
+        return feature
+    if feature.lower() in sample:
+        return feature.lower()
+    return None
+
+
+def _column_to_float(values: list, feature: str, errors: List[Optional[str]]) -> np.ndarray:
+    """
+    Converts one feature column to float64 in a single NumPy call and only falls
+    back to per-row parsing when the fast path rejects the column.
+    """
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        converter = parse_time_value if feature == "Time" else float
+
+    column = np.empty(len(values), dtype=np.float64)
+    for i, value in enumerate(values):
+        if value is None:
+            column[i] = np.nan  # missing: median-filled by the preprocessor
+            continue
+        try:
+            column[i] = converter(value)
+        except (TypeError, ValueError):
+            column[i] = np.nan
+            if errors[i] is None:
+                errors[i] = f"Invalid value for '{feature}': {value!r}"
+    return column
+
+
+class FittedPreprocessor:
+    """
+    Transform-only preprocessing fitted by `preprocess_data`: median fill for
+    missing values, then `(x - mean) / scale`, over features in training order.
+
+    Works on NumPy arrays only, so serving never builds a DataFrame. Older
+    metadata without medians falls back to the mean (0 after scaling).
+    Features a request doesn't carry at all get the `fill_value`
+    training used for sources without them, not the median.
+    """
+
+    def __init__(self, features: List[str], mean, scale, median=None):
+        self.features = list(features)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.inv_scale = 1.0 / np.asarray(scale, dtype=np.float64)
+        self.median = self.mean.copy() if median is None else np.asarray(median, dtype=np.float64)
+        # Missing features are median-filled, so only dtype/range problems reject a row
+        self._schema = CompiledSchema("serving", self.features, allow_null=True)
+        self._positions = {name: j for j, name in enumerate(self.features)}
+        self._absent = np.array([fill_value(name) if name in FEATURE_SPACE else np.nan for name in self.features])
+
+    @classmethod
+    def from_dict(cls, info: dict) -> "FittedPreprocessor":
+        return cls(info["features"], info["mean"], info["scale"], info.get("median"))
+
+    def to_dict(self) -> dict:
+        return {
+            "features": self.features,
+            "mean": self.mean.tolist(),
+            "scale": (1.0 / self.inv_scale).tolist(),
+            "median": self.median.tolist(),
+        }
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    @classmethod
+    def load(cls, path: str) -> "FittedPreprocessor":
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    def positions(self, names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(index into `names`, feature column) for each of `names` the model was trained on."""
+        pairs = [(i, self._positions[name]) for i, name in enumerate(names) if name in self._positions]
+        src = np.array([i for i, _ in pairs], dtype=np.intp)
+        dst = np.array([j for _, j in pairs], dtype=np.intp)
+        return src, dst
+
+    def transform(self, X: np.ndarray, copy: bool = True) -> np.ndarray:
+        """
+        Median-fill NaNs and standardize a raw row or matrix. With `copy=False`
+        a float64 input matrix is transformed in place.
+        """
+        X = np.array(X, dtype=np.float64, ndmin=2) if copy else np.atleast_2d(np.asarray(X, dtype=np.float64))
+        np.copyto(X, np.broadcast_to(self.median, X.shape), where=np.isnan(X))
+        X -= self.mean
+        X *= self.inv_scale
+        return X
+
+    def raw_matrix(self, records: List[dict]) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """
+        Unscaled feature matrix for a batch of transaction dicts, plus a per-row
+        error list. Features the records don't carry get their training fill
+        value (NaN, so the median, outside the harmonized feature space); null
+        values are NaN.
+        """
+        n_rows = len(records)
+        errors: List[Optional[str]] = [None] * n_rows
+        raw = np.repeat(self._absent[None, :], n_rows, axis=0)
+        if n_rows == 0:
+            return raw, errors
+
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors[i] = "Row is not a JSON object"
+
+        sample = next((r for r in records if isinstance(r, dict)), {})
+        for j, feature in enumerate(self.features):
+            key = _feature_source(feature, sample)
+            if key is None:
+                continue
+            values = [r.get(key) if isinstance(r, dict) else None for r in records]
+            raw[:, j] = _column_to_float(values, feature, errors)
+
+        checked = self._schema.validate(raw)
+        for i in np.flatnonzero(checked.invalid):
+            if errors[i] is None:
+                errors[i] = checked.row_error(i)
+        return raw, errors
+
+    def transform_records(self, records: List[dict]) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """
+        Scaled feature matrix for a batch of transaction dicts. Rows with an
+        error are zero-filled and must not be scored.
+        """
+        raw, errors = self.raw_matrix(records)
+        X = self.transform(raw, copy=False)
+        bad = [i for i, error in enumerate(errors) if error is not None]
+        if bad:
+            X[bad] = 0.0
+        return X, errors
@@ -1,42 +1,233 @@
+import numpy as np
 import pandas as pd
-from typing import List
+from typing import Dict, List, Optional, Sequence
 from backend.app.config import Config
 from backend.app.utils.logger import get_logger
 
 logger = get_logger("Validator")
 
-def validate_dataframe(df: pd.DataFrame, filename: str) -> None:
+# Bits of ValidationResult.error_mask
+NULL = 1
+DTYPE = 2
+RANGE = 4
+
+_MESSAGES = {NULL: "Missing value for '{}'", DTYPE: "Invalid value for '{}'", RANGE: "Out-of-range value for '{}'"}
+
+
+class ColumnRule:
+    """Checks for one column, from `Config.COLUMN_RULES` (numeric and finite unless stated otherwise)."""
+
+    def __init__(self, name: str, dtype: str = "numeric", min: float = None, max: float = None,
+                 values: Sequence[float] = None):
+        self.name = name
+        self.numeric = dtype == "numeric"
+        self.min = min
+        self.max = max
+        self.values = tuple(values) if values is not None else None
+
+    def out_of_range(self, a: np.ndarray, null: np.ndarray) -> np.ndarray:
+        """Rows with a present value that is infinite, outside [min, max] or not one of `values`."""
+        if self.values is not None:
+            bad = ~null
+            for value in self.values:
+                bad &= a != value
+            return bad
+        bad = np.isinf(a) if a.dtype.kind == "f" else np.zeros(len(a), dtype=bool)
+        # NaN compares False, so nulls never count as out of range
+        if self.min is not None:
+            bad |= a < self.min
+        if self.max is not None:
+            bad |= a > self.max
+        return bad
+
+
+class ValidationResult:
+    """
+    Outcome of one validation pass: columns the input lacks, per-column
+    problem counts, and per row an `error_mask` of NULL/DTYPE/RANGE bits plus
+    the first column that failed. `invalid` is the rows to reject.
+    """
+
+    def __init__(self, n_rows: int, columns: List[str], missing: List[str], allow_null: bool):
+        self.n_rows = n_rows
+        self.columns = columns
+        self.missing_columns = missing
+        self.allow_null = allow_null
+        self.error_mask = np.zeros(n_rows, dtype=np.uint8)
+        self.first_column = np.full(n_rows, -1, dtype=np.int16)
+        self._first_kind = np.zeros(n_rows, dtype=np.uint8)
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def _flag(self, j: int, kind: int, rows: np.ndarray):
+        n_bad = int(np.count_nonzero(rows))
+        if not n_bad:
+            return
+        label = {NULL: "null", DTYPE: "dtype", RANGE: "range"}[kind]
+        self.counts.setdefault(self.columns[j], {})[label] = n_bad
+        self.error_mask[rows] |= kind
+        if kind == NULL and self.allow_null:
+            return
+        first = np.flatnonzero(rows & (self.first_column < 0))
+        self.first_column[first] = j
+        self._first_kind[first] = kind
+
+    @property
+    def invalid(self) -> np.ndarray:
+        return self.first_column >= 0
+
+    def row_error(self, i: int) -> Optional[str]:
+        j = int(self.first_column[i])
+        if j < 0:
+            return None
+        return _MESSAGES[int(self._first_kind[i])].format(self.columns[j])
+
+
+class CompiledSchema:
+    """
+    A schema compiled once into per-column rules. `validate` makes one
+    vectorized pass per column over a DataFrame, a NumPy matrix (columns in
+    `columns` order) or a list of dicts, without copying numeric columns.
+    """
+
+    def __init__(self, name: str, columns: Sequence[str], allow_null: bool = False):
+        self.name = name
+        self.columns = list(columns)
+        self.allow_null = allow_null
+        self.rules = [ColumnRule(col, **Config.COLUMN_RULES.get(col, {})) for col in self.columns]
+
+    def validate(self, data, columns: Sequence[str] = None) -> ValidationResult:
+        """`columns` names the matrix columns when `data` is an ndarray (default: the schema's)."""
+        if isinstance(data, pd.DataFrame):
+            present = set(data.columns)
+            get = lambda col: data[col]
+            n_rows = len(data)
+        elif isinstance(data, np.ndarray):
+            return self._validate_matrix(np.atleast_2d(data), columns or self.columns)
+        else:
+            records = list(data)
+            sample = next((r for r in records if isinstance(r, dict)), {})
+            present = set(sample)
+            get = lambda col: [r.get(col) if isinstance(r, dict) else None for r in records]
+            n_rows = len(records)
+
+        missing = [col for col in self.columns if col not in present]
+        result = ValidationResult(n_rows, self.columns, missing, self.allow_null)
+        for j, rule in enumerate(self.rules):
+            if rule.name in present:
+                self._check_column(result, j, rule, get(rule.name))
+        return result
+
+    def _validate_matrix(self, data: np.ndarray, columns: Sequence[str]) -> ValidationResult:
+        """
+        One isfinite scan of the whole matrix; only columns with a NaN/inf or
+        a range rule are then looked at one by one.
+        """
+        positions = {col: k for k, col in enumerate(columns)}
+        result = ValidationResult(len(data), self.columns, [c for c in self.columns if c not in positions],
+                                  self.allow_null)
+        if data.dtype.kind == "f":
+            finite = np.isfinite(data)
+            nonfinite_cols = ~finite.all(axis=0) if not finite.all() else np.zeros(data.shape[1], dtype=bool)
+        else:
+            nonfinite_cols = np.zeros(data.shape[1], dtype=bool)
+        no_rows = np.zeros(len(data), dtype=bool)
+        for j, rule in enumerate(self.rules):
+            k = positions.get(rule.name)
+            if k is None:
+                continue
+            column = data[:, k]
+            null = no_rows
+            if nonfinite_cols[k]:
+                null = np.isnan(column)
+                result._flag(j, NULL, null)
+            if rule.values is not None or rule.min is not None or rule.max is not None:
+                result._flag(j, RANGE, rule.out_of_range(column, null))
+            elif nonfinite_cols[k]:
+                result._flag(j, RANGE, np.isinf(column))
+        return result
+
+    @staticmethod
+    def _check_column(result: ValidationResult, j: int, rule: ColumnRule, column):
+        if isinstance(column, pd.Series):
+            values = column.to_numpy() if rule.numeric and column.dtype.kind in "fiub" else column
+        else:
+            values = column
+        if not rule.numeric:
+            result._flag(j, NULL, np.asarray(pd.isna(values), dtype=bool))
+            return
+
+        if not isinstance(values, np.ndarray) or values.dtype.kind not in "fiub":
+            # Object/string column: parse, and values that parse to NaN but weren't null are dtype errors
+            series = pd.Series(values, dtype=object)
+            null = np.asarray(series.isna(), dtype=bool)
+            values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+            unparsed = np.isnan(values) & ~null
+            result._flag(j, DTYPE, unparsed)
+            result._flag(j, NULL, null)
+            # Unparsed values are already rejected, not nulls and not out of range
+            result._flag(j, RANGE, rule.out_of_range(values, null | unparsed))
+            return
+        elif values.dtype.kind == "f":
+            null = np.isnan(values)
+        else:
+            null = np.zeros(len(values), dtype=bool)
+        result._flag(j, NULL, null)
+        result._flag(j, RANGE, rule.out_of_range(values, null))
+
+
+_compiled: Dict[tuple, CompiledSchema] = {}
+
+
+def get_schema(name: str, with_target: bool = False) -> CompiledSchema:
+    """
+    Compiled schema for a `Config.REQUIRED_COLUMNS` entry, built on first use.
+    `with_target` adds `Config.TARGET_COLUMN` when the entry doesn't list it.
+    """
+    schema = _compiled.get((name, with_target))
+    if schema is None:
+        columns = Config.REQUIRED_COLUMNS.get(name)
+        if columns is None:
+            raise ValueError(f"No schema defined in config for file: {name}")
+        if with_target and Config.TARGET_COLUMN not in columns:
+            columns = list(columns) + [Config.TARGET_COLUMN]
+        schema = _compiled[(name, with_target)] = CompiledSchema(name, columns)
+    return schema
+
+
+def check_target(result: ValidationResult, source: str, target_col: str = None) -> None:
+    """Raise unless the target column (default `Config.TARGET_COLUMN`) is present and binary where it isn't null."""
+    target_col = target_col or Config.TARGET_COLUMN
+    if target_col in result.missing_columns or target_col not in result.columns:
+        raise ValueError(f"Target column '{target_col}' not found in '{source}'.")
+    bad = result.counts.get(target_col, {})
+    if bad.get("range") or bad.get("dtype"):
+        raise ValueError(f"Target column '{target_col}' must be binary (0/1), found non-binary values in '{source}'")
+
+
+def log_problems(result: ValidationResult, source: str) -> None:
+    for col, counts in result.counts.items():
+        for kind, count in counts.items():
+            noun = "nulls" if kind == "null" else f"{kind} errors"
+            logger.warning(f"⚠️ Column '{col}' in '{source}' contains {count} {noun}")
+
+
+def validate_dataframe(df: pd.DataFrame, filename: str) -> ValidationResult:
     """
     Validates the structure and contents of a dataset based on filename.
+    Returns the per-row result so callers can drop or inspect invalid rows.
     """
     logger.info(f"🔎 Validating dataframe from file: {filename}")
 
     if df.empty:
         raise ValueError(f"The dataset from '{filename}' is empty.")
 
-    # Fetch expected schema for the file
-    required_columns: List[str] = Config.REQUIRED_COLUMNS.get(filename)
-    if required_columns is None:
-        raise ValueError(f"No schema defined in config for file: {filename}")
-
-    # Check missing columns
-    missing = [col for col in required_columns if col not in df.columns]
-    if missing:
-        raise ValueError(f"Missing columns in '{filename}': {missing}")
-
-    # Log null counts
-    for col in required_columns:
-        null_count = df[col].isnull().sum()
-        if null_count > 0:
-            logger.warning(f"⚠️ Column '{col}' in '{filename}' contains {null_count} nulls")
-
-    # Check target column
-    target_col = Config.TARGET_COLUMN
-    if target_col not in df.columns:
-        raise ValueError(f"Target column '{target_col}' not found in '{filename}'.")
+    # Fetch the compiled schema for the file
+    result = get_schema(filename, with_target=Config.TARGET_COLUMN in df.columns).validate(df)
+    if result.missing_columns:
+        raise ValueError(f"Missing columns in '{filename}': {result.missing_columns}")
 
-    unique_vals = df[target_col].dropna().unique()
-    if not set(unique_vals).issubset({0, 1}):
-        raise ValueError(f"Target column '{target_col}' must be binary (0/1), found in '{filename}': {unique_vals}")
+    log_problems(result, filename)
+    check_target(result, filename)
 
-    logger.info(f"✅ Validation successful for file: {filename}")
\ No newline at end of file
+    logger.info(f"✅ Validation successful for file: {filename}")
+    return result
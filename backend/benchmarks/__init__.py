@@ -0,0 +1,2 @@
+# backend/benchmarks/__init__.py
+# Offline benchmarks for the scoring stack. Run with `python -m backend.benchmarks.<name>`.
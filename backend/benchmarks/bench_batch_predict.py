@@ -0,0 +1,55 @@
+# backend/benchmarks/bench_batch_predict.py
+"""
+Compares rows/sec of looping over /api/predict against /api/predict/batch.
+
+    python -m backend.benchmarks.bench_batch_predict --rows 10000
+"""
+import argparse
+import json
+from fastapi.testclient import TestClient
+
+from backend.server import app
+from backend.benchmarks.common import AUTH_HEADERS, install_synthetic_model, synthetic_transactions, rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000, help="Rows sent to the batch endpoint")
+    parser.add_argument("--loop-rows", type=int, default=200, help="Rows sent one by one to /api/predict")
+    args = parser.parse_args()
+
+    install_synthetic_model()
+    client = TestClient(app)
+    batch = synthetic_transactions(args.rows)
+    single = batch[:args.loop_rows]
+
+    def loop_single():
+        for txn in single:
+            client.post("/api/predict", json=txn, headers=AUTH_HEADERS)
+
+    def json_batch():
+        client.post("/api/predict/batch", json=batch, headers=AUTH_HEADERS)
+
+    ndjson_body = "\n".join(json.dumps(txn) for txn in batch)
+
+    def ndjson_batch():
+        client.post(
+            "/api/predict/batch",
+            content=ndjson_body,
+            headers={**AUTH_HEADERS, "Content-Type": "application/x-ndjson"},
+        )
+
+    single_rate = rate(len(single), loop_single)
+    json_rate = rate(len(batch), json_batch)
+    ndjson_rate = rate(len(batch), ndjson_batch)
+
+    print(json.dumps({
+        "single_rows_per_sec": round(single_rate, 1),
+        "batch_json_rows_per_sec": round(json_rate, 1),
+        "batch_ndjson_rows_per_sec": round(ndjson_rate, 1),
+        "speedup": round(min(json_rate, ndjson_rate) / single_rate, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
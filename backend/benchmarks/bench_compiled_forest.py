@@ -0,0 +1,61 @@
+# backend/benchmarks/bench_compiled_forest.py
+"""
+Single-row and batch latency of the compiled forest against sklearn's
+predict_proba, plus the largest probability difference between the two.
+
+    python -m backend.benchmarks.bench_compiled_forest --rows 300
+"""
+import argparse
+import json
+import time
+import numpy as np
+
+from backend.app.model.compiled_forest import CompiledForest
+from backend.benchmarks.common import install_synthetic_model
+
+
+def p50_us(fn, rows: np.ndarray) -> float:
+    timings = []
+    for i in range(len(rows)):
+        row = rows[i:i + 1]
+        start = time.perf_counter()
+        fn(row)
+        timings.append(time.perf_counter() - start)
+    return round(float(np.median(timings)) * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=300, help="Single-row calls to time")
+    parser.add_argument("--batch", type=int, default=10000, help="Rows in the batch timing")
+    args = parser.parse_args()
+
+    clf = install_synthetic_model()
+    compiled = CompiledForest.from_sklearn(clf)
+    rng = np.random.default_rng(1)
+    rows = rng.standard_normal((max(args.rows, args.batch), clf.n_features_in_))
+    batch = rows[:args.batch]
+
+    start = time.perf_counter()
+    compiled_batch = compiled.predict_proba(batch)
+    compiled_batch_s = time.perf_counter() - start
+    start = time.perf_counter()
+    sklearn_batch = clf.predict_proba(batch)
+    sklearn_batch_s = time.perf_counter() - start
+
+    print(json.dumps({
+        "forest": repr(compiled),
+        "max_abs_diff": float(np.abs(compiled_batch - sklearn_batch).max()),
+        "single_row_p50_us": {
+            "compiled": p50_us(compiled.predict_proba, rows[:args.rows]),
+            "sklearn": p50_us(clf.predict_proba, rows[:args.rows]),
+        },
+        "batch_rows_per_sec": {
+            "compiled": round(args.batch / compiled_batch_s, 1),
+            "sklearn": round(args.batch / sklearn_batch_s, 1),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
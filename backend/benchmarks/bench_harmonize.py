@@ -0,0 +1,99 @@
+# backend/benchmarks/bench_harmonize.py
+"""
+Training-data memory and preprocessing time: sources projected onto the
+common feature space (harmonize.py) against the old union of their columns,
+where every source is NaN-padded for the columns it lacks (PaySim's label
+aliased to Class so it can be trained on at all).
+
+Each mode runs in its own interpreter so peak RSS is not shared. Source
+caches are built once in a temporary directory and reused by both modes.
+
+    python -m backend.benchmarks.bench_harmonize --data-dir backend/data
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+
+from backend.app.config import Config
+from backend.app.trainer import data_loader
+from backend.app.trainer.harmonize import adapter_for
+from backend.app.trainer.profiler import TrainingProfiler
+from backend.app.utils.preprocessing import preprocess_data
+
+
+def union_frame() -> pd.DataFrame:
+    """The combined frame as built before harmonization: every source column, NaN where a source lacks it."""
+    sources = []
+    for file in sorted(os.listdir(Config.DATA_DIR)):
+        cache_dir = os.path.join(Config.CACHE_DIR, os.path.splitext(file)[0])
+        manifest = data_loader._read_manifest(cache_dir)
+        if file.endswith(".csv") and manifest is not None:
+            sources.append((file, data_loader._open_columns(cache_dir, manifest), manifest["rows"]))
+    columns = []
+    for file, arrays, _ in sources:
+        label = adapter_for(file).label
+        columns += [Config.TARGET_COLUMN if c == label else c for c in arrays if c not in columns]
+    columns = list(dict.fromkeys(columns))
+    total = sum(rows for _, _, rows in sources)
+    out = {col: np.full(total, np.nan, dtype=np.float32) for col in columns}
+    offset = 0
+    for file, arrays, rows in sources:
+        label = adapter_for(file).label
+        for col, values in arrays.items():
+            out[Config.TARGET_COLUMN if col == label else col][offset:offset + rows] = values
+        offset += rows
+    return pd.DataFrame(out, copy=False)
+
+
+def run_mode(mode: str) -> dict:
+    profiler = TrainingProfiler()
+    with profiler.stage("load"):
+        df = union_frame() if mode == "union" else data_loader.load_all_csvs_streaming()
+    shape = df.shape
+    nan_share = float(np.mean([np.isnan(df[c].to_numpy()).mean() for c in df.columns]))
+    with profiler.stage("preprocess"):
+        X, _, _ = preprocess_data(df, "combined_dataset")
+    profile = profiler.finish()
+    return {
+        "shape": list(shape), "nan_share": round(nan_share, 3), "features": X.shape[1],
+        "stages": {name: {k: s[k] for k in ("wall_seconds", "peak_rss_mb", "rss_growth_mb")}
+                   for name, s in profile["stages"].items()},
+        "max_rss_mb": profile["max_rss_mb"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--data-dir", default=Config.DATA_DIR)
+    parser.add_argument("--cache-dir", default=None, help="Reuse source caches from here (default: a temp dir)")
+    parser.add_argument("--mode", choices=("union", "harmonized"), default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    Config.DATA_DIR = args.data_dir
+
+    if args.mode:
+        Config.CACHE_DIR = args.cache_dir
+        print(json.dumps(run_mode(args.mode)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = args.cache_dir or tmp
+        Config.CACHE_DIR = cache_dir
+        data_loader.load_all_csvs_streaming()  # build the source caches once
+        results = {}
+        for mode in ("union", "harmonized"):
+            out = subprocess.run(
+                [sys.executable, "-m", "backend.benchmarks.bench_harmonize", "--data-dir", args.data_dir,
+                 "--cache-dir", cache_dir, "--mode", mode],
+                capture_output=True, text=True, check=True,
+            )
+            results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_hot_reload.py
+"""
+/api/predict latency while models are reloaded back to back, against a run
+without reloads. Reloads verify the SHA256 and load the candidate on a worker
+thread, once from the memory-mapped artifact and once from the joblib pickle.
+
+    python -m backend.benchmarks.bench_hot_reload --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import joblib
+
+from backend.app.config import Config
+from backend.app.model import fraud_detector
+from backend.app.model.artifact import artifact_digest, file_sha256, save_artifact
+from backend.app.model.compiled_forest import CompiledForest
+from backend.app.model.hot_reload import model_paths
+from backend.benchmarks.bench_microbatch import drive
+from backend.benchmarks.common import fit_synthetic_model, install_synthetic_model, serve_model, synthetic_transactions
+
+VERSION = "bench"
+
+
+def write_candidate(model_dir: str, clf, compiled: bool):
+    """Write a candidate version the way the trainer does, with its hashes in the metadata."""
+    paths = model_paths(VERSION, model_dir)
+    joblib.dump(clf, paths["pickle"])
+    scaler = fraud_detector.load_metadata()["scaler"]
+    metadata = {"model_name": f"fraud_model_{VERSION}", "scaler": scaler, "hash": file_sha256(paths["pickle"])}
+    if compiled:
+        save_artifact(paths["compiled"], CompiledForest.from_sklearn(clf), scaler, VERSION)
+        metadata["compiled_hash"] = artifact_digest(paths["compiled"])
+    with open(paths["metadata"], "w") as f:
+        json.dump(metadata, f)
+
+
+async def drive_with_reloads(transactions: list, concurrency: int) -> dict:
+    stop = asyncio.Event()
+    reloads = []
+
+    async def reloader():
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            await loop.run_in_executor(None, fraud_detector.reload_model, VERSION)
+            reloads.append(1)
+
+    task = asyncio.create_task(reloader())
+    result = await drive(transactions, concurrency)
+    stop.set()
+    await task
+    result["reloads"] = len(reloads)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    serving = install_synthetic_model()
+    candidate = fit_synthetic_model(seed=1)
+    transactions = synthetic_transactions(args.requests)
+    Config.AUDIT_ENABLED = False
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.MODEL_DIR = tmp
+        serve_model(serving)
+        results["no_reload"] = asyncio.run(drive(transactions, args.concurrency))
+        for source, compiled in (("artifact", True), ("pickle", False)):
+            write_candidate(tmp, candidate, compiled)
+            serve_model(serving)
+            results[f"reloading_{source}"] = asyncio.run(drive_with_reloads(transactions, args.concurrency))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# backend/benchmarks/bench_metrics.py
+"""
+Overhead of the /metrics instrumentation on /api/predict.
+
+Runs the same concurrent load with `Config.METRICS_ENABLED` off and on,
+alternating for several rounds so drift affects both equally, and reports
+the median p50/p99 of each plus the relative difference. It also times the
+instrumentation calls a request makes in isolation (stage marks, the
+middleware's histogram and gauge updates, decision counters) and relates that
+to the measured request latency, which is a noise-free upper bound.
+
+    python -m backend.benchmarks.bench_metrics --requests 2000 --concurrency 64 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import timeit
+
+from backend.app.config import Config
+from backend.app.model import fraud_detector
+from backend.app.utils.metrics import REGISTRY
+from backend.benchmarks.bench_microbatch import drive
+from backend.benchmarks.common import install_synthetic_model, synthetic_transactions
+
+
+def instrumentation_cost_us(repeat: int = 100_000) -> float:
+    """Microseconds of metric updates per scored /api/predict request."""
+    latency = REGISTRY.histogram("fraud_http_request_ms", "").labels("/api/predict", "POST", 200)
+    in_flight = REGISTRY.gauge("fraud_http_requests_in_flight", "").labels()
+    parse, serialize = fraud_detector.STAGE_HISTOGRAMS["parse"], fraud_detector.STAGE_HISTOGRAMS["serialize"]
+
+    def one_request():
+        timer = fraud_detector.stage_timer()
+        in_flight.inc()
+        for stage in ("validate", "velocity", "rules", "score", "audit"):
+            timer.mark(stage)
+        fraud_detector.count_decisions([0], "model")
+        in_flight.dec()
+        latency.observe(1.0)
+        parse.observe(0.1)
+        serialize.observe(0.1)
+
+    return timeit.timeit(one_request, number=repeat) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    install_synthetic_model()
+    transactions = synthetic_transactions(args.requests)
+    Config.AUDIT_ENABLED = False
+
+    runs = {False: [], True: []}
+    asyncio.run(drive(transactions[:200], args.concurrency))  # warm-up
+    for _ in range(args.rounds):
+        for enabled in (False, True):
+            Config.METRICS_ENABLED = enabled
+            runs[enabled].append(asyncio.run(drive(transactions, args.concurrency)))
+
+    def summary(results):
+        return {key: round(statistics.median(r[key] for r in results), 2)
+                for key in ("requests_per_sec", "p50_ms", "p99_ms")}
+
+    off, on = summary(runs[False]), summary(runs[True])
+    cost_us = instrumentation_cost_us()
+    # Mean latency per request when requests run one after another
+    serial_ms = 1000.0 / off["requests_per_sec"]
+    print(json.dumps({
+        "metrics_off": off,
+        "metrics_on": on,
+        "p50_overhead_pct": round((on["p50_ms"] / off["p50_ms"] - 1) * 100, 2),
+        "throughput_overhead_pct": round((off["requests_per_sec"] / on["requests_per_sec"] - 1) * 100, 2),
+        "instrumentation_us_per_request": round(cost_us, 2),
+        "instrumentation_share_of_request_pct": round(cost_us / (serial_ms * 1000.0) * 100, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# backend/benchmarks/bench_microbatch.py
+"""
+Drives concurrent /api/predict calls in-process with and without the
+micro-batcher and reports throughput, p50/p99 latency and batch sizes.
+
+    python -m backend.benchmarks.bench_microbatch --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+import httpx
+
+from backend.app.config import Config
+from backend.app.model import fraud_detector
+from backend.server import app
+from backend.benchmarks.common import AUTH_HEADERS, install_synthetic_model, synthetic_transactions
+
+
+async def drive(transactions: list, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(txn):
+            async with semaphore:
+                start = time.perf_counter()
+                await client.post("/api/predict", json=txn, headers=AUTH_HEADERS)
+                latencies.append((time.perf_counter() - start) * 1000.0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(txn) for txn in transactions))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests_per_sec": round(len(transactions) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    install_synthetic_model()
+    transactions = synthetic_transactions(args.requests)
+
+    Config.BATCHING_ENABLED = False
+    unbatched = asyncio.run(drive(transactions, args.concurrency))
+
+    Config.BATCHING_ENABLED = True
+    batched = asyncio.run(drive(transactions, args.concurrency))
+    batched["batcher"] = fraud_detector.get_batcher().stats()
+
+    print(json.dumps({"unbatched": unbatched, "batched": batched}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
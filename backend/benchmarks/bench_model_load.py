@@ -0,0 +1,91 @@
+# backend/benchmarks/bench_model_load.py
+"""
+Cold-start time and memory of the trainer's joblib pickle against the
+memory-mapped artifact. Each load runs in a fresh interpreter.
+
+    python -m backend.benchmarks.bench_model_load --runs 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import joblib
+import numpy as np
+
+from backend.app.model.artifact import save_artifact
+from backend.app.model.compiled_forest import CompiledForest
+from backend.app.model.fraud_detector import load_metadata
+from backend.benchmarks.common import install_synthetic_model
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Runs in a child interpreter; imports happen before the timer starts.
+LOADER = r"""
+import json, sys, time
+import numpy as np
+
+def status():
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0])
+    return fields
+
+kind, path, n_features = sys.argv[1], sys.argv[2], int(sys.argv[3])
+if kind == "pickle":
+    import joblib, sklearn.ensemble
+else:
+    from backend.app.model.artifact import load_artifact
+before = status()
+start = time.perf_counter()
+if kind == "pickle":
+    model = joblib.load(path)
+else:
+    model, _ = load_artifact(path)
+load_s = time.perf_counter() - start
+model.predict_proba(np.zeros((1, n_features)))
+after = status()
+print(json.dumps({
+    "load_ms": round(load_s * 1000, 2),
+    "rss_delta_kb": after["VmRSS"] - before["VmRSS"],
+    "anon_delta_kb": after["RssAnon"] - before["RssAnon"],
+}))
+"""
+
+
+def measure(kind: str, path: str, n_features: int, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", LOADER, kind, path, str(n_features)],
+            capture_output=True, text=True, check=True, cwd=REPO_ROOT,
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {key: float(np.median([s[key] for s in samples])) for key in samples[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--train-rows", type=int, default=50000, help="Rows used to fit the synthetic forest")
+    args = parser.parse_args()
+
+    clf = install_synthetic_model(n_rows=args.train_rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, "model.pkl")
+        artifact_path = os.path.join(tmp, "model.fmodel")
+        joblib.dump(clf, pickle_path)
+        save_artifact(artifact_path, CompiledForest.from_sklearn(clf), load_metadata()["scaler"], "bench")
+
+        print(json.dumps({
+            "pickle": measure("pickle", pickle_path, clf.n_features_in_, args.runs),
+            "artifact_mmap": measure("artifact", artifact_path, clf.n_features_in_, args.runs),
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
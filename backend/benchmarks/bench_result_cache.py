@@ -0,0 +1,70 @@
+# backend/benchmarks/bench_result_cache.py
+"""
+Gateway retry storm against /api/predict, in-process: every transaction is
+sent `--retries` times, duplicates interleaved and concurrent, without the
+result cache and with each store. Reports throughput, p50/p99 latency and how
+many requests actually reached validation and scoring, plus lookup rates of
+the two stores.
+
+    python -m backend.benchmarks.bench_result_cache --transactions 500 --retries 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from backend.app.config import Config
+from backend.app.model import fraud_detector
+from backend.app.model.result_cache import ResultCache, result_key
+from backend.benchmarks.bench_microbatch import drive
+from backend.benchmarks.common import install_synthetic_model, synthetic_transactions
+
+
+def retry_storm(transactions: list, retries: int) -> list:
+    """Each transaction `retries` times, copies spread so duplicates overlap in flight."""
+    return [txn for _ in range(retries) for txn in transactions]
+
+
+def lookup_rate(cache: ResultCache, n: int = 100_000) -> dict:
+    keys = [result_key(f"txn-{i}", {"amount": i}) for i in range(n)]
+    start = time.perf_counter()
+    for key in keys:
+        cache.put(key, {"prediction": 0, "probability": 0.01})
+    put_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys:
+        cache.get(key)
+    get_s = time.perf_counter() - start
+    return {"puts_per_sec": round(n / put_s), "gets_per_sec": round(n / get_s)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=500)
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    install_synthetic_model()
+    requests = retry_storm(synthetic_transactions(args.transactions), args.retries)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("off", "memory", "shared"):
+            Config.RESULT_CACHE_ENABLED = backend != "off"
+            cache = None
+            if backend != "off":
+                cache = ResultCache(backend, path=os.path.join(tmp, "results.bin"))
+            fraud_detector._result_cache = cache
+            fraud_detector._velocity_store = None  # same velocity history for every run
+            results[backend] = asyncio.run(drive(requests, args.concurrency))
+            results[backend]["scored"] = cache.misses if cache is not None else len(requests)
+            if cache is not None:
+                results[backend]["cache"] = cache.stats()
+                results[backend]["lookups"] = lookup_rate(ResultCache(backend, path=os.path.join(tmp, "lookups.bin")))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
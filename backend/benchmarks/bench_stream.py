@@ -0,0 +1,73 @@
+# backend/benchmarks/bench_stream.py
+"""
+Transactions/sec through the streaming channel (/api/predict/stream) against
+one /api/predict POST per transaction, both in-process on one worker. The
+stream client keeps its full credit in flight, sending `--message-rows`
+transactions per WebSocket message.
+
+    python -m backend.benchmarks.bench_stream --transactions 5000 --message-rows 1 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from starlette.testclient import TestClient
+
+from backend.app.model import fraud_detector
+from backend.server import app
+from backend.benchmarks.bench_microbatch import drive
+from backend.benchmarks.common import AUTH_HEADERS, install_synthetic_model, synthetic_transactions
+
+
+def stream_rate(transactions: list, message_rows: int) -> dict:
+    token = AUTH_HEADERS["Authorization"].split()[-1]
+    messages = [
+        json.dumps([dict(txn, id=start + i) for i, txn in enumerate(transactions[start:start + message_rows])])
+        for start in range(0, len(transactions), message_rows)
+    ]
+    n = len(transactions)
+    errors = 0
+    with TestClient(app).websocket_connect(f"/api/predict/stream?token={token}") as ws:
+        credit = json.loads(ws.receive_text())["credit"]
+        start = time.perf_counter()
+        sent = received = 0
+        for message in messages:
+            rows = min(message_rows, n - sent)
+            while sent - received + rows > credit:
+                results = json.loads(ws.receive_text())
+                received += len(results)
+                errors += sum(r["status"] == "error" for r in results)
+            ws.send_text(message)
+            sent += rows
+        while received < n:
+            results = json.loads(ws.receive_text())
+            received += len(results)
+            errors += sum(r["status"] == "error" for r in results)
+        elapsed = time.perf_counter() - start
+    return {"transactions_per_sec": round(n / elapsed, 1), "errors": errors, "messages": len(messages)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent POSTs for the per-request baseline")
+    parser.add_argument("--message-rows", type=int, nargs="+", default=[1, 50])
+    args = parser.parse_args()
+
+    install_synthetic_model()
+    transactions = synthetic_transactions(args.transactions)
+
+    fraud_detector._velocity_store = None
+    baseline = asyncio.run(drive(transactions, args.concurrency))
+    results = {"per_request": {"transactions_per_sec": baseline["requests_per_sec"], **baseline}}
+    for rows in args.message_rows:
+        fraud_detector._velocity_store = None  # same velocity history for every run
+        stream = stream_rate(transactions, rows)
+        stream["speedup"] = round(stream["transactions_per_sec"] / baseline["requests_per_sec"], 2)
+        results[f"stream_{rows}_per_message"] = stream
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# backend/benchmarks/suite.py
+"""
+Repeatable benchmark suite for the serving stack. Runs offline: it builds a
+synthetic dataset shaped like `MODEL_CONFIG["expected_features"]`, trains a
+small forest on it, writes it the way the trainer does (pickle, compiled
+artifact, metadata with hashes) to a temporary model directory and serves it
+from there.
+
+Stages:
+- `validate_dataframe` and `preprocess_data` on the synthetic frame
+- serving preprocessing (`raw_matrix` + `transform`) per batch size
+- `load_model` cold (globals reset, page cache warm) and warm, for the pickle and the artifact
+- `predict_proba` of the sklearn forest and the compiled forest at batch sizes 1..10k
+- an in-process ASGI load test of `/api/predict` at several concurrency levels (throughput, p50/p95/p99)
+
+Results are written as JSON; `--compare` prints the change against an earlier run.
+
+    python -m backend.benchmarks.suite --output bench.json
+    python -m backend.benchmarks.suite --output new.json --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+
+from config import MODEL_CONFIG
+from backend.app.config import Config
+from backend.app.model import fraud_detector
+from backend.app.model.artifact import artifact_digest, file_sha256, save_artifact
+from backend.app.model.compiled_forest import CompiledForest
+from backend.app.model.hot_reload import model_paths
+from backend.app.utils.audit_log import AuditLog
+from backend.app.utils.preprocessing import FittedPreprocessor, preprocess_data
+from backend.app.utils.validator import validate_dataframe
+from backend.benchmarks.bench_microbatch import drive
+from backend.benchmarks.common import synthetic_transactions
+
+VERSION = "bench"
+BATCH_SIZES = (1, 10, 100, 1000, 10_000)
+SCHEMA_NAME = "creditcard.csv"  # validate_dataframe schema the synthetic frame follows
+
+# Higher is better for these keys; lower for everything else (timings)
+HIGHER_IS_BETTER = ("rows_per_sec", "requests_per_sec")
+
+
+def synthetic_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Credit-card-like frame: PCA-style V columns, Time, Amount and a rare Class."""
+    rng = np.random.default_rng(seed)
+    frame = {}
+    for feature in MODEL_CONFIG["expected_features"]:
+        if feature == "Time":
+            frame[feature] = rng.uniform(0, 172_800, n_rows)
+        elif feature == "Amount":
+            frame[feature] = np.round(rng.gamma(2.0, 60.0, n_rows), 2)
+        else:
+            frame[feature] = rng.standard_normal(n_rows)
+    df = pd.DataFrame(frame)
+    signal = df["V14"].to_numpy() * -1.5 + df["V4"].to_numpy() + rng.standard_normal(n_rows)
+    df[Config.TARGET_COLUMN] = (signal > 3.0).astype(np.int64)
+    return df
+
+
+def timed(fn, repeat: int = 5) -> float:
+    """Median wall seconds of `repeat` calls."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def throughput(n_rows: int, seconds: float) -> dict:
+    return {"ms": round(seconds * 1000.0, 4), "rows_per_sec": round(n_rows / seconds, 1)}
+
+
+def install_model(model_dir: str, df: pd.DataFrame, n_estimators: int, seed: int = 0):
+    """Fit a forest on `df`, write it like the trainer does, and point the API at it."""
+    X, y, scaler_info = preprocess_data(df.copy(), "combined_dataset")
+    clf = RandomForestClassifier(n_estimators=n_estimators, random_state=seed, n_jobs=-1)
+    clf.fit(X.astype(np.float32), y)
+
+    paths = model_paths(VERSION, model_dir)
+    joblib.dump(clf, paths["pickle"])
+    save_artifact(paths["compiled"], CompiledForest.from_sklearn(clf), scaler_info, VERSION)
+    preprocessor_path = os.path.join(model_dir, f"fraud_model_{VERSION}_preprocessor.json")
+    FittedPreprocessor.from_dict(scaler_info).save(preprocessor_path)
+    with open(paths["metadata"], "w") as f:
+        json.dump({
+            "model_name": f"fraud_model_{VERSION}",
+            "scaler": scaler_info,
+            "hash": file_sha256(paths["pickle"]),
+            "compiled_hash": artifact_digest(paths["compiled"]),
+        }, f)
+
+    Config.MODEL_DIR = model_dir
+    fraud_detector.MODEL_PATH = paths["pickle"]
+    fraud_detector.COMPILED_MODEL_PATH = paths["compiled"]
+    fraud_detector.METADATA_PATH = paths["metadata"]
+    fraud_detector.PREPROCESSOR_PATH = preprocessor_path
+    fraud_detector._model = fraud_detector._metadata = fraud_detector._preprocessor = None
+    fraud_detector._audit_log = AuditLog(directory=os.path.join(model_dir, "audit"))
+    return clf, X
+
+
+def bench_training_stages(df: pd.DataFrame) -> dict:
+    n = len(df)
+    return {
+        "validate_dataframe": throughput(n, timed(lambda: validate_dataframe(df, SCHEMA_NAME), repeat=3)),
+        "preprocess_data": throughput(n, timed(lambda: preprocess_data(df.copy(), "combined_dataset"), repeat=3)),
+    }
+
+
+def bench_serving_preprocessing(df: pd.DataFrame) -> dict:
+    preprocessor = fraud_detector.get_preprocessor()
+    features = df.drop(columns=[Config.TARGET_COLUMN])
+    results = {}
+    for size in BATCH_SIZES:
+        records = features.iloc[:size].to_dict(orient="records")
+        results[str(size)] = throughput(
+            size, timed(lambda: preprocessor.transform(preprocessor.raw_matrix(records)[0], copy=False))
+        )
+    return results
+
+
+def bench_load_model() -> dict:
+    results = {}
+    compiled_path = fraud_detector.COMPILED_MODEL_PATH
+    for source in ("artifact", "pickle"):
+        # load_model() prefers the artifact; hide it to time the pickle
+        fraud_detector.COMPILED_MODEL_PATH = compiled_path if source == "artifact" else compiled_path + ".hidden"
+
+        def cold():
+            fraud_detector._model = None
+            fraud_detector.load_model()
+
+        results[source] = {
+            "cold_ms": round(timed(cold, repeat=3) * 1000.0, 3),
+            "warm_ms": round(timed(fraud_detector.load_model, repeat=1000) * 1000.0, 6),
+        }
+    fraud_detector.COMPILED_MODEL_PATH = compiled_path
+    fraud_detector._model = None
+    fraud_detector.load_model()
+    return results
+
+
+def bench_predict_proba(clf, X: np.ndarray) -> dict:
+    compiled = CompiledForest.from_sklearn(clf)
+    results = {"sklearn": {}, "compiled": {}}
+    for size in BATCH_SIZES:
+        batch = np.ascontiguousarray(np.resize(X, (size, X.shape[1])))
+        repeat = 20 if size <= 100 else 5
+        results["sklearn"][str(size)] = throughput(size, timed(lambda: clf.predict_proba(batch), repeat))
+        results["compiled"][str(size)] = throughput(size, timed(lambda: compiled.predict_proba(batch), repeat))
+    return results
+
+
+def bench_load_test(n_requests: int, concurrency_levels) -> dict:
+    transactions = synthetic_transactions(n_requests)
+    asyncio.run(drive(transactions[:200], 16))  # warm-up: pool threads, batcher, caches
+    return {str(c): asyncio.run(drive(transactions, c)) for c in concurrency_levels}
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict) -> dict:
+    """Per-metric change in % (positive = better) between two suite results."""
+    now, before = flatten(current["results"]), flatten(baseline["results"])
+    changes = {}
+    for key, value in now.items():
+        old = before.get(key)
+        if not old:
+            continue
+        change = (value / old - 1.0) * 100.0
+        changes[key] = round(change if key.endswith(HIGHER_IS_BETTER) else -change, 1) + 0.0
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic rows for the training-side stages")
+    parser.add_argument("--train-rows", type=int, default=20_000, help="Rows the synthetic model is fit on")
+    parser.add_argument("--n-estimators", type=int, default=Config.RF_N_ESTIMATORS)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--output", default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    report = {"environment": environment(), "parameters": vars(args), "results": {}}
+    results = report["results"]
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        clf, X = install_model(model_dir, df.iloc[:args.train_rows], args.n_estimators)
+        results["training_stages"] = bench_training_stages(df)
+        results["serving_preprocessing"] = bench_serving_preprocessing(df)
+        results["load_model"] = bench_load_model()
+        results["predict_proba"] = bench_predict_proba(clf, X)
+        results["load_test"] = bench_load_test(args.requests, args.concurrency)
+        fraud_detector.get_audit_log().close()
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["change_pct_vs_baseline"] = compare(report, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,25 @@
 import os
 import sys
-from fastapi.responses import JSONResponse
-from fastapi import FastAPI, HTTPException, APIRouter
+import json
+import time
+import asyncio
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi import FastAPI, HTTPException, APIRouter, Depends, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional
-from backend.app.model.fraud_detector import predict_fraud, load_model
-from backend.app.utils.logger import get_logger
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional
+from backend.app.config import Config
+from backend.app.model.fraud_detector import (
+    predict_fraud, predict_fraud_batch, serving_state, warm_up_until_ready, get_batcher, get_scoring_pool, get_audit_log,
+    get_velocity_store, get_rules_engine, get_threshold_policy, get_result_cache, oauth2_scheme, reload_model,
+    promote_shadow, stop_shadow, model_state, start_model_watcher, stop_model_watcher, STAGE_HISTOGRAMS, count_error
+)
+from backend.app.model.hot_reload import ModelValidationError, ReloadInProgress
+from backend.app.model.worker_pool import ScoringPoolFull
+from backend.app.model.stream import ScoringStream, stream_stats
+from backend.app.utils.logger import get_logger, get_request_logger, logging_stats, stop_logging
+from backend.app.utils.security import verify_token
+from backend.app.utils.metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware
 
 # === Setup System Path for Imports ===
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -33,8 +46,16 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# Per-route latency, requests in flight, and parse/serialize time for /api/predict
+app.add_middleware(
+    MetricsMiddleware,
+    enabled=lambda: Config.METRICS_ENABLED,
+    stage_histograms=STAGE_HISTOGRAMS
+)
+
 # === Logger ===
 logger = get_logger(__name__)
+request_logger = get_request_logger(f"{__name__}.requests")  # Sampled per-request lines
 
 # === Pydantic Schema ===
 class Transaction(BaseModel):
@@ -50,16 +71,118 @@ class Transaction(BaseModel):
     merchant_name: Optional[str] = None
     merchant_category: Optional[str] = None
 
+# Pydantic v1 names, kept working for deployments that still pin it
+PYDANTIC_V2 = hasattr(BaseModel, "model_dump")
+
+def model_to_dict(model: BaseModel) -> dict:
+    """Field values as a plain dict."""
+    return model.model_dump() if PYDANTIC_V2 else model.dict()
+
+def fields_set(model: BaseModel) -> set:
+    """Fields the client sent, as opposed to schema defaults."""
+    return model.model_fields_set if PYDANTIC_V2 else model.__fields_set__
+
+class ModelReloadRequest(BaseModel):
+    version: Optional[str] = None  # Defaults to Config.VERSION
+    shadow: bool = False  # Score a sample of traffic with it instead of serving it
+    sample_rate: Optional[float] = None  # Shadow sample rate (default Config.SHADOW_SAMPLE_RATE)
+
+# === Batch Payload Parsing ===
+def parse_batch_body(body: bytes, content_type: str) -> List:
+    """
+    Decode a batch payload: a JSON array, or NDJSON (one object per line).
+    Lines that are not valid JSON are kept as error markers so row indices stay aligned.
+    """
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        rows = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(ValueError(f"Invalid JSON line: {e}"))
+        return rows
+
+    rows = json.loads(body)
+    if not isinstance(rows, list):
+        raise ValueError("Batch body must be a JSON array of transactions")
+    return rows
+
+def validate_rows(rows: List):
+    """
+    Check decoded rows against the Transaction schema. Returns the records
+    (None where invalid) and a per-row error message (None where valid).
+    """
+    records = [None] * len(rows)
+    row_errors = [None] * len(rows)
+    for i, row in enumerate(rows):
+        try:
+            if isinstance(row, Exception):
+                raise row
+            if not isinstance(row, dict):
+                raise ValueError("Row is not a JSON object")
+            records[i] = model_to_dict(Transaction(**row))
+        except ValidationError as err:
+            row_errors[i] = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in err.errors())
+        except ValueError as err:
+            row_errors[i] = str(err)
+    return records, row_errors
+
+async def score_transactions(rows: List) -> List[dict]:
+    """
+    Validate and score decoded rows with one model call. Returns one result
+    per row, in input order; raises ScoringPoolFull when the pool is saturated.
+    """
+    records, row_errors = validate_rows(rows)
+    valid_idx = [i for i, err in enumerate(row_errors) if err is None]
+    count_error("invalid_input", len(rows) - len(valid_idx))
+    scored = await predict_fraud_batch([records[i] for i in valid_idx])
+
+    results = [None] * len(rows)
+    for i, err in enumerate(row_errors):
+        if err is not None:
+            results[i] = {"status": "error", "error": err}
+    for i, result in zip(valid_idx, scored):
+        transaction_id = records[i]["transaction_id"]
+        if "error" in result:
+            results[i] = {"transaction_id": transaction_id, "status": "error", "error": result["error"]}
+            continue
+        results[i] = {
+            "transaction_id": transaction_id,
+            "status": "blocked" if result["prediction"] == 1 else "approved",
+            "fraud_prediction": result["prediction"],
+            "fraud_probability": result["probability"],
+            "rule": result.get("rule")
+        }
+    return results
+
+def parse_stream_message(text: str) -> List[tuple]:
+    """
+    (correlation id, row) pairs from one stream message: a transaction object
+    carrying an "id", or a JSON array of them. Bad JSON becomes one error row.
+    """
+    try:
+        payload = json.loads(text)
+    except ValueError as e:
+        return [(None, ValueError(f"Invalid JSON message: {e}"))]
+    rows = payload if isinstance(payload, list) else [payload]
+    return [(row.get("id") if isinstance(row, dict) else None, row) for row in rows]
+
 # === API Router ===
 api_router = APIRouter(prefix="/api")
 
 @api_router.post("/predict")
-async def predict_transaction(transaction: Transaction):
+async def predict_transaction(transaction: Transaction, request: Request, token: str = Depends(oauth2_scheme)):
+    # Endpoint start/end stamps let MetricsMiddleware time parsing and serialization
+    timing = request.scope["metrics.endpoint"] = [time.perf_counter(), None]
     try:
-        logger.info(f"[INPUT] Transaction received: {transaction.dict()}")
+        request_logger.info("[INPUT] Transaction received: %s", transaction)
 
+        # Only an id the gateway sent identifies a retry; the schema default would merge unrelated transactions
+        idempotency_key = transaction.transaction_id if "transaction_id" in fields_set(transaction) else None
         # ✅ Await the coroutine
-        prediction_result = await predict_fraud(transaction.dict())
+        prediction_result = await predict_fraud(model_to_dict(transaction), token, idempotency_key)
 
         if not prediction_result or "prediction" not in prediction_result or "probability" not in prediction_result:
             logger.error(f"[ERROR] Invalid model output: {prediction_result}")
@@ -67,10 +190,10 @@ async def predict_transaction(transaction: Transaction):
 
         prediction = prediction_result["prediction"]
         probability = prediction_result["probability"]
-        logger.info(f"[OUTPUT] Prediction: {prediction}, Probability: {probability}")
+        request_logger.info("[OUTPUT] Prediction: %s, Probability: %s", prediction, probability)
 
         if prediction == 1:
-            logger.warning(f"[FRAUD] Transaction {transaction.transaction_id} BLOCKED (Probability: {probability})")
+            request_logger.warning("[FRAUD] Transaction %s BLOCKED (Probability: %s)", transaction.transaction_id, probability)
             return JSONResponse(
                 status_code=403,
                 content={
@@ -79,7 +202,11 @@ async def predict_transaction(transaction: Transaction):
                         "transaction_id": transaction.transaction_id,
                         "fraud_prediction": prediction,
                         "fraud_probability": probability,
-                        "message": f"❌ Transaction blocked: Fraudulent with probability {probability}"
+                        "rule": prediction_result.get("rule"),
+                        "message": (
+                            f"❌ Transaction blocked by rule {prediction_result['rule']}"
+                            if probability is None else f"❌ Transaction blocked: Fraudulent with probability {probability}"
+                        )
                     }
                 }
             )
@@ -90,12 +217,13 @@ async def predict_transaction(transaction: Transaction):
                 "transaction_id": transaction.transaction_id,
                 "fraud_prediction": prediction,
                 "fraud_probability": probability,
+                "rule": prediction_result.get("rule"),
                 "message": "✅ Transaction is Safe"
             }
         }
 
     except HTTPException as http_err:
-        logger.warning(f"[HTTP ERROR] {str(http_err)}")
+        request_logger.warning("[HTTP ERROR] %s", http_err)
         raise http_err
     except Exception as err:
         logger.error(f"[UNEXPECTED ERROR] {str(err)}")
@@ -107,42 +235,232 @@ async def predict_transaction(transaction: Transaction):
                 "detail": str(err)
             }
         )
+    finally:
+        timing[1] = time.perf_counter()
 
-@api_router.get("/health")
-def health_check():
+@api_router.post("/predict/batch")
+async def predict_transaction_batch(request: Request, token: str = Depends(oauth2_scheme)):
     """
-    Checks whether the ML model loads correctly.
+    Scores a JSON array or NDJSON stream of transactions in one model call.
+    Each row gets its own result, in input order; bad rows report an error
+    instead of failing the batch.
     """
+    verify_token(token)
+
     try:
-        load_model()
-        return {"status": "OK", "message": "Fraud Detection API is Live"}
-    except Exception as e:
-        logger.error(f"[HEALTH CHECK ERROR] {str(e)}")
+        rows = parse_batch_body(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {err}")
+
+    if len(rows) > Config.BATCH_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {Config.BATCH_MAX_ROWS} rows")
+
+    try:
+        results = [{"index": i, **result} for i, result in enumerate(await score_transactions(rows))]
+    except ScoringPoolFull as busy:
+        logger.warning(f"[BATCH] {busy}")
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error", "message": "Scoring capacity exhausted, retry later"},
+            headers={"Retry-After": str(busy.retry_after)}
+        )
+    except Exception as err:
+        logger.error(f"[BATCH ERROR] {str(err)}")
         return JSONResponse(
             status_code=500,
             content={
-                "status": "ERROR",
-                "message": f"Model load failed: {str(e)}"
+                "status": "error",
+                "message": "Internal Server Error",
+                "detail": str(err)
             }
         )
 
+    blocked = sum(1 for r in results if r["status"] == "blocked")
+    errors = sum(1 for r in results if r["status"] == "error")
+    logger.info(f"[BATCH] Scored {len(rows)} rows: {blocked} blocked, {errors} errors")
+
+    return {"status": "ok", "count": len(rows), "blocked": blocked, "errors": errors, "results": results}
+
+@api_router.websocket("/predict/stream")
+async def predict_stream(websocket: WebSocket):
+    """
+    Long-lived scoring channel for high-rate clients. Authenticate with a
+    `token` query parameter or a Bearer header. The server's first message is
+    {"type": "hello", "credit": N}; after that the client sends transactions
+    (objects with a correlation "id", alone or in a JSON array) and receives
+    JSON arrays of results tagged with those ids, in the order scoring
+    finishes. At most N transactions may be unanswered (see ScoringStream).
+    """
+    token = websocket.query_params.get("token")
+    if token is None:
+        token = websocket.headers.get("authorization", "").removeprefix("Bearer ").strip()
+    try:
+        verify_token(token)
+    except HTTPException:
+        await websocket.close(code=1008)  # Policy violation
+        return
+
+    await websocket.accept()
+    stream = ScoringStream(score_transactions, lambda results: websocket.send_text(json.dumps(results)))
+    try:
+        await websocket.send_text(json.dumps({"type": "hello", "credit": stream.credit}))
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            text = message.get("text")
+            if text is None:
+                text = (message.get("bytes") or b"").decode("utf-8", "replace")
+            stream.submit(parse_stream_message(text))
+    finally:
+        await stream.close()
+        logger.info(f"[STREAM] Closed after {stream.rows} rows")
+
+@api_router.get("/health/live")
+def liveness_check():
+    """
+    Liveness: the process is up and serving requests. Never touches the model.
+    """
+    return {"status": "OK", "message": "Fraud Detection API is Live"}
+
+@api_router.get("/health/ready")
+def readiness_check():
+    """
+    Readiness: the model is loaded and has been warmed up. Reads the cached
+    model-state record only, so polling is free even while loading is failing.
+    """
+    state = serving_state()
+    if not state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "NOT_READY", "model": state})
+    return {"status": "OK", "message": "Fraud Detection API is Ready", "model": state}
+
+@api_router.get("/health")
+def health_check():
+    """
+    Kept for existing load balancer checks; same as /health/ready.
+    """
+    return readiness_check()
+
 @api_router.get("/status")
 def model_status():
     """
-    Extra endpoint to verify model integrity and metadata (if supported).
+    Model-state record and serving component stats. Does not load the model.
     """
     try:
-        model = load_model()
-        return {"status": "OK", "message": "Model Loaded", "model": str(model)}
+        state = serving_state()
+        return {
+            "status": "OK" if state["ready"] else "NOT_READY",
+            "message": "Model Loaded" if state["loaded"] else "Model Not Loaded",
+            "model": state,
+            "batcher": get_batcher().stats(),
+            "scoring_pool": get_scoring_pool().stats(),
+            "logging": logging_stats(),
+            "audit_log": get_audit_log().stats(),
+            "velocity_store": get_velocity_store().stats(),
+            "rules": get_rules_engine().stats(),
+            "thresholds": get_threshold_policy().stats(),
+            "result_cache": get_result_cache().stats(),
+            "streams": stream_stats()
+        }
     except Exception as e:
         logger.error(f"[STATUS ERROR] {str(e)}")
         return JSONResponse(
             status_code=500,
             content={
                 "status": "ERROR",
-                "message": f"Could not load model: {str(e)}"
+                "message": f"Could not read service status: {str(e)}"
             }
         )
 
+@app.get("/metrics")
+def metrics():
+    """
+    Prometheus text exposition of request, stage, decision and component metrics.
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+# === Admin: hot model reload ===
+def require_admin(token: str):
+    user = verify_token(token)
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return user
+
+@api_router.get("/admin/model")
+def admin_model_state(token: str = Depends(oauth2_scheme)):
+    """
+    Serving model version, shadow comparison stats and watcher state.
+    """
+    require_admin(token)
+    return model_state()
+
+@api_router.post("/admin/model/reload")
+async def admin_reload_model(body: Optional[ModelReloadRequest] = None, token: str = Depends(oauth2_scheme)):
+    """
+    Load, verify (SHA256 from the metadata) and swap in a model version, or load
+    it as a shadow model. Loading runs on a worker thread; requests keep being
+    served by the current model until the swap.
+    """
+    require_admin(token)
+    body = body or ModelReloadRequest()
+    if body.sample_rate is not None and not 0.0 <= body.sample_rate <= 1.0:
+        raise HTTPException(status_code=400, detail="sample_rate must be between 0 and 1")
+    loop = asyncio.get_running_loop()
+    try:
+        loaded = await loop.run_in_executor(None, reload_model, body.version, body.shadow, body.sample_rate)
+    except ReloadInProgress as err:
+        raise HTTPException(status_code=409, detail=str(err))
+    except FileNotFoundError as err:
+        raise HTTPException(status_code=404, detail=f"Model files not found: {err}")
+    except ModelValidationError as err:
+        logger.error(f"[RELOAD REJECTED] {err}")
+        raise HTTPException(status_code=422, detail=str(err))
+    logger.info(f"[RELOAD] {'Shadowing' if body.shadow else 'Serving'} model {loaded['version']}")
+    return {"status": "shadow" if body.shadow else "serving", "model": loaded}
+
+@api_router.post("/admin/model/promote")
+async def admin_promote_shadow(token: str = Depends(oauth2_scheme)):
+    """
+    Serve the current shadow model.
+    """
+    require_admin(token)
+    loop = asyncio.get_running_loop()
+    try:
+        stats = await loop.run_in_executor(None, promote_shadow)
+    except LookupError as err:
+        raise HTTPException(status_code=404, detail=str(err))
+    except ModelValidationError as err:
+        raise HTTPException(status_code=422, detail=str(err))
+    return {"status": "serving", "shadow_stats": stats}
+
+@api_router.delete("/admin/model/shadow")
+def admin_stop_shadow(token: str = Depends(oauth2_scheme)):
+    """
+    Stop shadow scoring and return the final comparison stats.
+    """
+    require_admin(token)
+    stats = stop_shadow()
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No shadow model loaded")
+    return {"status": "stopped", "shadow_stats": stats}
+
+@app.on_event("startup")
+async def start_serving_model():
+    # Load and warm up in the background: liveness answers at once, readiness once warm
+    app.state.warm_up = asyncio.create_task(warm_up_until_ready())
+    if Config.MODEL_WATCH_ENABLED:
+        start_model_watcher()
+
+@app.on_event("shutdown")
+def shutdown_scoring_pool():
+    warm_up = getattr(app.state, "warm_up", None)
+    if warm_up is not None:
+        warm_up.cancel()
+    stop_model_watcher()
+    stop_shadow()
+    get_scoring_pool().shutdown()
+    get_audit_log().close()
+    stop_logging()
+
 # === Register Routes ===
 app.include_router(api_router)
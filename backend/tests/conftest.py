@@ -0,0 +1,106 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures. `serving` writes a small synthetic model version the way the
+trainer does (pickle, metadata with its SHA256, thresholds file) into a
+temporary model directory and points the serving module at it, so tests run
+the real load, rules, scoring and audit paths without a trained artifact.
+"""
+import os
+import json
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from backend.app.config import Config
+from backend.app.model import fraud_detector
+from backend.app.model.artifact import file_sha256
+from backend.app.model.hot_reload import model_paths
+from backend.app.model.thresholds import ThresholdPolicy
+from backend.app.utils.audit_log import AuditLog
+
+FEATURES = ["Time", "V1", "V2", "Amount"]
+FRAUD_AMOUNT = 500.0  # The synthetic model flags amounts above this
+
+
+def fit_forest(n_estimators: int = 10, n_rows: int = 2000, seed: int = 0):
+    """(forest, scaler info) trained on random rows where fraud is Amount > FRAUD_AMOUNT."""
+    rng = np.random.default_rng(seed)
+    raw = np.column_stack([
+        rng.integers(0, 86400, n_rows),
+        rng.standard_normal(n_rows),
+        rng.standard_normal(n_rows),
+        rng.uniform(0, 1000, n_rows),
+    ]).astype(np.float64)
+    y = (raw[:, 3] > FRAUD_AMOUNT).astype(int)
+    scaler = {
+        "features": FEATURES,
+        "mean": raw.mean(axis=0).tolist(),
+        "scale": raw.std(axis=0).tolist(),
+        "median": np.median(raw, axis=0).tolist(),
+    }
+    X = (raw - raw.mean(axis=0)) / raw.std(axis=0)
+    clf = RandomForestClassifier(n_estimators=n_estimators, max_depth=6, random_state=seed)
+    clf.fit(X, y)
+    return clf, scaler
+
+
+def write_model_version(model_dir: str, clf, scaler: dict, version: str = Config.VERSION,
+                        thresholds: dict = None) -> dict:
+    """Save `clf` as `version` the way the trainer does; returns its paths."""
+    os.makedirs(model_dir, exist_ok=True)
+    paths = model_paths(version, model_dir)
+    joblib.dump(clf, paths["pickle"])
+    metadata = {"model_name": f"fraud_model_{version}", "scaler": scaler, "hash": file_sha256(paths["pickle"])}
+    with open(paths["metadata"], "w") as f:
+        json.dump(metadata, f)
+    with open(paths["thresholds"], "w") as f:
+        json.dump(thresholds or {"default": 0.5}, f)
+    return paths
+
+
+@pytest.fixture
+def serving(tmp_path, monkeypatch):
+    """Serve a synthetic model from `tmp_path`; yields its paths. Audit segments go to tmp_path/audit."""
+    clf, scaler = fit_forest()
+    model_dir = str(tmp_path / "models")
+    paths = write_model_version(model_dir, clf, scaler)
+
+    monkeypatch.setattr(Config, "MODEL_DIR", model_dir)
+    monkeypatch.setattr(Config, "AUDIT_DIR", str(tmp_path / "audit"))
+    monkeypatch.setattr(Config, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(fraud_detector, "MODEL_PATH", paths["pickle"])
+    monkeypatch.setattr(fraud_detector, "COMPILED_MODEL_PATH", paths["compiled"])
+    monkeypatch.setattr(fraud_detector, "METADATA_PATH", paths["metadata"])
+    monkeypatch.setattr(fraud_detector, "PREPROCESSOR_PATH", str(tmp_path / "no_preprocessor.json"))
+    monkeypatch.setattr(fraud_detector, "_state", dict(fraud_detector._state, load_failures=0))
+    monkeypatch.setattr(fraud_detector, "_next_load_attempt", 0.0)
+    for name in ("_model", "_metadata", "_preprocessor", "_model_version", "_velocity_store", "_result_cache",
+                 "_batcher", "_scoring_pool", "_shadow"):
+        monkeypatch.setattr(fraud_detector, name, None)
+    monkeypatch.setattr(fraud_detector, "_worker_artifact", (None, None))
+    monkeypatch.setattr(fraud_detector, "_threshold_policy", ThresholdPolicy(paths["thresholds"]))
+    audit_log = AuditLog(str(tmp_path / "audit"))
+    monkeypatch.setattr(fraud_detector, "_audit_log", audit_log)
+
+    yield paths
+
+    audit_log.close()
+    if fraud_detector._scoring_pool is not None:
+        fraud_detector._scoring_pool.shutdown()
+
+
+@pytest.fixture
+def client(serving):
+    from fastapi.testclient import TestClient
+    from backend.server import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def retrain(serving):
+    """Write a freshly fitted model as `version` into the serving model directory; returns its paths."""
+    def write(seed: int = 1, version: str = Config.VERSION) -> dict:
+        clf, scaler = fit_forest(seed=seed)
+        return write_model_version(Config.MODEL_DIR, clf, scaler, version)
+    return write
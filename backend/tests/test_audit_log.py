@@ -0,0 +1,25 @@
+# backend/tests/test_audit_log.py
+import os
+
+import numpy as np
+
+from backend.app.utils import audit_log
+from backend.app.utils.audit_log import AuditLog, iter_range
+
+FEATURES = ["Time", "Amount"]
+
+
+def test_workers_rotating_in_the_same_millisecond_write_separate_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_log.time, "time", lambda: 1_700_000_000.0)
+    # Both workers look before either creates the file
+    monkeypatch.setattr(audit_log.os.path, "exists", lambda path: False)
+    logs = [AuditLog(str(tmp_path)), AuditLog(str(tmp_path))]
+    for worker, log in enumerate(logs):
+        log.record(np.array([[1.0, 2.0], [3.0, 4.0]]), FEATURES, [0.1, 0.9], [0, 1], "1.0.0",
+                   [f"w{worker}-a", f"w{worker}-b"], 1.0)
+    for log in logs:
+        log.close()
+
+    assert sorted(os.listdir(tmp_path)) == ["audit-1700000000000-1.seg", "audit-1700000000000.seg"]
+    segments = [sorted(segment["transaction_id"]) for segment in iter_range(str(tmp_path))]
+    assert sorted(segments) == [["w0-a", "w0-b"], ["w1-a", "w1-b"]]
@@ -0,0 +1,61 @@
+# backend/tests/test_batcher.py
+import asyncio
+
+import numpy as np
+
+from backend.app.model.batcher import MicroBatcher
+
+
+async def row_sums(X: np.ndarray) -> np.ndarray:
+    return X.sum(axis=1)
+
+
+def test_concurrent_rows_are_scored_in_one_batch():
+    calls = []
+
+    async def score(X):
+        calls.append(len(X))
+        return await row_sums(X)
+
+    async def main():
+        batcher = MicroBatcher(score, max_wait_ms=50, max_batch=8)
+        return await asyncio.gather(*(batcher.submit(np.array([i, 1.0])) for i in range(5)))
+
+    assert asyncio.run(main()) == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert calls == [5]
+
+
+def test_rows_queued_when_the_worker_dies_are_scored_by_its_replacement():
+    async def main():
+        batcher = MicroBatcher(row_sums, max_wait_ms=50, max_batch=8)
+        first = asyncio.ensure_future(batcher.submit(np.array([1.0, 1.0])))
+        await asyncio.sleep(0)
+        batcher._worker.cancel()
+        await asyncio.sleep(0)
+        second = await asyncio.wait_for(batcher.submit(np.array([2.0, 2.0])), 1.0)
+        return await asyncio.wait_for(first, 1.0), second
+
+    assert asyncio.run(main()) == (2.0, 4.0)
+
+
+def test_rows_left_on_a_finished_loop_are_not_carried_into_the_next():
+    batches = []
+
+    async def score(X):
+        batches.append(X[:, 0].tolist())
+        return await row_sums(X)
+
+    batcher = MicroBatcher(score, max_wait_ms=50, max_batch=8)
+
+    async def queue_and_leave():
+        asyncio.ensure_future(batcher.submit(np.array([1.0])))
+        await asyncio.sleep(0)
+        batcher._worker.cancel()
+
+    asyncio.run(queue_and_leave())
+
+    async def next_loop():
+        return await asyncio.wait_for(batcher.submit(np.array([3.0])), 1.0)
+
+    assert asyncio.run(next_loop()) == 3.0
+    assert batches == [[3.0]]
@@ -0,0 +1,70 @@
+# backend/tests/test_bulk_score.py
+import joblib
+import numpy as np
+import pandas as pd
+
+from backend.app.config import Config
+from backend.app.trainer.bulk_score import bulk_score
+from backend.app.utils.preprocessing import FittedPreprocessor
+
+
+def test_chunks_are_scored_in_blocks_and_ids_are_copied_exactly(serving, tmp_path, monkeypatch):
+    rng = np.random.default_rng(5)
+    n = 1000
+    frame = pd.DataFrame({
+        "transaction_id": [f"t{i:05d}" for i in range(n)],
+        "Time": 123_456_789 + np.arange(n),  # Beyond float32's exact integers, and a model feature
+        "V1": rng.standard_normal(n).round(4),
+        "V2": rng.standard_normal(n).round(4),
+        "Amount": rng.uniform(0, 1000, n).round(2),
+    })
+    frame.to_csv(tmp_path / "input.csv", index=False)
+    preprocessor_path = str(tmp_path / "preprocessor.json")
+    with open(serving["metadata"]) as f:
+        preprocessor = FittedPreprocessor.from_dict(pd.read_json(f, typ="series")["scaler"])
+    preprocessor.save(preprocessor_path)
+    monkeypatch.setattr(Config, "BULK_SCORE_BLOCK_CELLS", 70 * 10)  # 70-row blocks for the 10-tree model
+
+    summary = bulk_score(str(tmp_path / "input.csv"), str(tmp_path / "scores.csv"), serving["pickle"],
+                         preprocessor_path, threshold=0.5, id_columns=["transaction_id", "Time"], workers=1,
+                         chunk_mb=0.01)
+    scores = pd.read_csv(tmp_path / "scores.csv", dtype={"transaction_id": str, "Time": str})
+
+    raw = frame[preprocessor.features].to_numpy(dtype=np.float32).astype(np.float64)
+    expected = joblib.load(serving["pickle"]).predict_proba(preprocessor.transform(raw))[:, 1]
+    assert summary["rows"] == n and summary["chunks"] > 1
+    assert scores["transaction_id"].tolist() == frame["transaction_id"].tolist()
+    assert scores["Time"].tolist() == frame["Time"].astype(str).tolist()
+    np.testing.assert_allclose(scores["fraud_probability"], expected, atol=1e-6)
+    np.testing.assert_array_equal(scores["prediction"], (expected.round(6) > 0.5).astype(int))
+
+
+def test_workers_score_like_one_process_and_bad_cells_only_fail_their_row(serving, tmp_path):
+    rng = np.random.default_rng(6)
+    n = 400
+    frame = pd.DataFrame({
+        "transaction_id": [f"t{i}" for i in range(n)],
+        "Time": rng.integers(0, 86400, n),
+        "V1": rng.standard_normal(n).round(4).astype(object),
+        "V2": rng.standard_normal(n).round(4),
+        "Amount": rng.uniform(0, 1000, n).round(2),
+    })
+    frame.loc[7, "V1"] = "1.2.3"
+    frame.to_csv(tmp_path / "input.csv", index=False)
+    preprocessor_path = str(tmp_path / "preprocessor.json")
+    with open(serving["metadata"]) as f:
+        FittedPreprocessor.from_dict(pd.read_json(f, typ="series")["scaler"]).save(preprocessor_path)
+
+    outputs = {}
+    for workers in (1, 2):
+        path = tmp_path / f"scores_{workers}.csv"
+        summary = bulk_score(str(tmp_path / "input.csv"), str(path), serving["pickle"], preprocessor_path,
+                             threshold=0.5, id_columns=["transaction_id"], workers=workers, chunk_mb=0.004)
+        assert summary["rows"] == n and summary["errors"] == 1 and summary["chunks"] > 1
+        outputs[workers] = pd.read_csv(path)
+
+    single, pooled = outputs[1], outputs[2]
+    assert single.loc[7, "error"] == "Invalid value for 'V1': '1.2.3'"
+    assert np.isnan(single.loc[7, "fraud_probability"]) and np.isnan(single.loc[7, "prediction"])
+    assert single["error"].notna().sum() == 1
+    pd.testing.assert_frame_equal(single, pooled)
@@ -0,0 +1,113 @@
+# backend/tests/test_compiled_forest.py
+import json
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from backend.app.model import compiled_forest
+from backend.app.model.artifact import estimator_path, file_sha256, load_artifact, open_model, save_artifact
+from backend.app.model.compiled_forest import CompiledForest, HybridForest
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((3000, 8))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + 0.3 * rng.standard_normal(len(X)) > 0.8).astype(int)
+    return RandomForestClassifier(n_estimators=25, random_state=0).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return np.random.default_rng(1).standard_normal((2000, 8))
+
+
+def test_predict_proba_matches_sklearn(forest, rows):
+    compiled = CompiledForest.from_sklearn(forest)
+    np.testing.assert_allclose(compiled.predict_proba(rows), forest.predict_proba(rows), atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(rows), forest.predict(rows))
+
+
+def test_single_rows_and_float32_inputs_match_sklearn(forest, rows):
+    compiled = CompiledForest.from_sklearn(forest)
+    np.testing.assert_allclose(compiled.predict_proba(rows[0]), forest.predict_proba(rows[:1]), atol=1e-12)
+    as_float32 = rows.astype(np.float32)
+    np.testing.assert_allclose(compiled.predict_proba(as_float32), forest.predict_proba(as_float32), atol=1e-12)
+
+
+@pytest.mark.parametrize("block_slots", [1, 25 * 7, 25 * 333])
+def test_blocked_traversal_matches_sklearn(forest, rows, monkeypatch, block_slots):
+    monkeypatch.setattr(compiled_forest, "BLOCK_SLOTS", block_slots)
+    compiled = CompiledForest.from_sklearn(forest)
+    np.testing.assert_allclose(compiled.predict_proba(rows[:500]), forest.predict_proba(rows[:500]), atol=1e-12)
+
+
+def test_memory_mapped_artifact_scores_like_the_forest(forest, rows, tmp_path):
+    path = str(tmp_path / "model.fmodel")
+    save_artifact(path, CompiledForest.from_sklearn(forest), {"features": list("abcdefgh")}, "test")
+    loaded, manifest = load_artifact(path)
+    assert manifest["model_version"] == "test"
+    assert isinstance(loaded.value, np.memmap)
+    np.testing.assert_allclose(loaded.predict_proba(rows), forest.predict_proba(rows), atol=1e-12)
+
+
+class Recorder:
+    """Wraps a model and records the batch sizes it scored."""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = []
+
+    def predict_proba(self, X):
+        self.calls.append(len(np.atleast_2d(X)))
+        return self.model.predict_proba(X)
+
+
+def test_hybrid_forest_sends_large_batches_to_sklearn(forest, rows):
+    compiled, estimator = Recorder(CompiledForest.from_sklearn(forest)), Recorder(forest)
+    compiled.classes_ = forest.classes_
+    compiled.n_estimators = forest.n_estimators
+    hybrid = HybridForest(compiled, lambda: estimator, max_compiled_rows=100)
+
+    small, large = hybrid.predict_proba(rows[:100]), hybrid.predict_proba(rows)
+
+    assert compiled.calls == [100] and estimator.calls == [len(rows)]
+    np.testing.assert_allclose(small, forest.predict_proba(rows[:100]), atol=1e-12)
+    np.testing.assert_allclose(large, forest.predict_proba(rows), atol=1e-12)
+
+
+def test_open_model_pairs_an_artifact_with_its_pickle(forest, rows, tmp_path):
+    path = str(tmp_path / "fraud_model_test.fmodel")
+    save_artifact(path, CompiledForest.from_sklearn(forest), {"features": list("abcdefgh")}, "test")
+    joblib.dump(forest, estimator_path(path))
+
+    verified = open_model(path, file_sha256(estimator_path(path)))
+    assert isinstance(verified, HybridForest)
+    assert verified.estimator() is not None
+
+    tampered = open_model(path, "0" * 64)
+    assert tampered.estimator() is None  # Fails verification; the compiled forest keeps scoring
+    np.testing.assert_allclose(tampered.predict_proba(rows), forest.predict_proba(rows), atol=1e-12)
+
+    os.remove(estimator_path(path))
+    assert open_model(path).estimator() is None
+
+
+def test_a_pickle_retrained_in_place_after_open_is_not_mixed_in(forest, rows, tmp_path):
+    path = str(tmp_path / "fraud_model_test.fmodel")
+    save_artifact(path, CompiledForest.from_sklearn(forest), {"features": list("abcdefgh")}, "test")
+    joblib.dump(forest, estimator_path(path))
+    assert open_model(path).estimator() is None  # No SHA256 recorded: the pickle is never trusted
+
+    with open(str(tmp_path / "fraud_model_test_metadata.json"), "w") as f:
+        json.dump({"hash": file_sha256(estimator_path(path))}, f)
+    assert open_model(path).estimator() is not None
+
+    opened = open_model(path)
+    retrained = RandomForestClassifier(n_estimators=3, random_state=1).fit(rows[:200], rows[:200, 0] > 0)
+    joblib.dump(retrained, estimator_path(path))  # The trainer's in-place rewrite
+    assert opened.estimator() is None
+    np.testing.assert_allclose(opened.predict_proba(rows), forest.predict_proba(rows), atol=1e-12)
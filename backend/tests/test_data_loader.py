@@ -0,0 +1,135 @@
+# backend/tests/test_data_loader.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app.config import Config
+from backend.app.model.features import FEATURE_SPACE, fill_value
+from backend.app.model.velocity import VELOCITY_FEATURES, VelocityStore
+from backend.app.trainer import data_loader
+
+CARD_FILE = "creditcard.csv"
+PAYSIM_FILE = "PS_20174392719_1491204439457_log.csv"
+PAYSIM_TYPES = ["CASH_IN", "CASH_OUT", "DEBIT", "PAYMENT", "TRANSFER"]
+
+
+def write_sources(data_dir, n: int = 2500, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    card = pd.DataFrame({
+        "Time": np.arange(n),
+        **{f"V{i}": rng.standard_normal(n).round(5) for i in range(1, 5)},
+        "Amount": rng.uniform(0, 1000, n).round(2),
+        "Class": (rng.random(n) < 0.1).astype(int),
+    })
+    card.loc[0, "Class"] = 0
+    card.to_csv(os.path.join(data_dir, CARD_FILE), index=False)
+    paysim = pd.DataFrame({
+        "step": np.sort(rng.integers(1, 60, n)),
+        "type": rng.choice(PAYSIM_TYPES, n),
+        "amount": rng.uniform(0, 5000, n).round(2),
+        "nameOrig": [f"C{i}" for i in rng.integers(0, 40, n)],
+        "oldbalanceOrg": rng.uniform(0, 1e4, n).round(2),
+        "newbalanceOrig": rng.uniform(0, 1e4, n).round(2),
+        "nameDest": [f"M{i}" for i in rng.integers(0, 20, n)],
+        "oldbalanceDest": rng.uniform(0, 1e4, n).round(2),
+        "newbalanceDest": rng.uniform(0, 1e4, n).round(2),
+        "isFraud": (rng.random(n) < 0.1).astype(int),
+    })
+    paysim.to_csv(os.path.join(data_dir, PAYSIM_FILE), index=False)
+
+
+def plain_load(data_dir) -> pd.DataFrame:
+    """The combined dataset computed directly with pandas, with no streaming and no cache."""
+    card = pd.read_csv(os.path.join(data_dir, CARD_FILE))
+    paysim = pd.read_csv(os.path.join(data_dir, PAYSIM_FILE))
+
+    def f32(series):
+        return series.to_numpy(dtype=np.float32)
+
+    amount = f32(paysim["amount"])
+    old_orig, new_orig = f32(paysim["oldbalanceOrg"]), f32(paysim["newbalanceOrig"])
+    old_dest, new_dest = f32(paysim["oldbalanceDest"]), f32(paysim["newbalanceDest"])
+    history = VelocityStore().update_many(
+        paysim["nameOrig"].tolist(), f32(paysim["step"]).astype(np.float64) * 3600,
+        amount.astype(np.float64), paysim["nameDest"].tolist(),
+    )
+    paysim_rows = {
+        "Time": f32(paysim["step"]) * np.float32(3600),
+        "Amount": amount,
+        "type_code": pd.Categorical(paysim["type"], categories=PAYSIM_TYPES).codes.astype(np.float32) + 1,
+        "orig_balance_delta": new_orig - old_orig,
+        "dest_balance_delta": new_dest - old_dest,
+        "orig_balance_error": old_orig - amount - new_orig,
+        "dest_balance_error": old_dest + amount - new_dest,
+        **{name: history[:, k] for k, name in enumerate(VELOCITY_FEATURES)},
+        "Class": f32(paysim["isFraud"]),
+    }
+    card_rows = {col: f32(card[col]) for col in card.columns}
+
+    columns = [name for name in FEATURE_SPACE if name in paysim_rows or name in card_rows] + ["Class"]
+    frames = [
+        pd.DataFrame({col: rows.get(col, np.full(len(rows["Class"]), fill_value(col), dtype=np.float32))
+                      for col in columns})
+        for rows in (paysim_rows, card_rows)  # Sources are loaded in file name order
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    """Two small sources in a temporary data directory, streamed in 1000-row chunks; yields the build log."""
+    monkeypatch.setattr(Config, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(Config, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(data_loader, "chunk_rows_for_budget", lambda n_columns: 1000)
+    write_sources(Config.DATA_DIR)
+
+    built = []
+    build_source_cache = data_loader._build_source_cache
+
+    def build(file, path, cache_dir):
+        built.append(file)
+        return build_source_cache(file, path, cache_dir)
+
+    monkeypatch.setattr(data_loader, "_build_source_cache", build)
+    return built
+
+
+def test_streamed_and_cached_loads_match_a_plain_pandas_load(sources):
+    expected = plain_load(Config.DATA_DIR)
+
+    first = data_loader.load_all_csvs_streaming()
+    assert sorted(sources) == [PAYSIM_FILE, CARD_FILE]
+    pd.testing.assert_frame_equal(first, expected)
+
+    cached = data_loader.load_all_csvs_streaming()
+    assert len(sources) == 2  # Nothing re-parsed
+    pd.testing.assert_frame_equal(cached, expected)
+
+    data_loader.load_all_csvs_streaming(rebuild_cache=True)
+    assert len(sources) == 4
+
+
+def test_source_changes_and_format_bumps_invalidate_the_cache(sources, monkeypatch):
+    data_loader.load_all_csvs_streaming()
+    path = os.path.join(Config.DATA_DIR, CARD_FILE)
+
+    os.utime(path, ns=(1, 1))  # Touched only: the content hash still matches
+    data_loader.load_all_csvs_streaming()
+    assert len(sources) == 2
+
+    with open(path) as f:
+        lines = f.read().split("\n")
+    lines[1] = lines[1][:-1] + "1"  # Row 0's Class, same file size
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+    os.utime(path, ns=(2, 2))
+    loaded = data_loader.load_all_csvs_streaming()
+    assert sources[2:] == [CARD_FILE]
+    pd.testing.assert_frame_equal(loaded, plain_load(Config.DATA_DIR))
+
+    monkeypatch.setattr(data_loader, "CACHE_FORMAT_VERSION", data_loader.CACHE_FORMAT_VERSION + 1)
+    data_loader.load_all_csvs_streaming()
+    assert sorted(sources[3:]) == [PAYSIM_FILE, CARD_FILE]
@@ -0,0 +1,106 @@
+# backend/tests/test_model_loading.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.app.config import Config
+from backend.app.model import fraud_detector
+
+
+class FakeClock:
+    """Stands in for fraud_detector's `time` module with a monotonic clock the test moves."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def loader(serving, monkeypatch):
+    """Wraps the real model loader; set `.failures` to fail that many calls, read `.calls` to count them."""
+    open_model = fraud_detector.open_model
+
+    class Loader:
+        calls = 0
+        failures = 0
+        delay = 0.0
+
+        def __call__(self, *args):
+            self.calls += 1
+            time.sleep(self.delay)
+            if self.failures:
+                self.failures -= 1
+                raise OSError("disk unavailable")
+            return open_model(*args)
+
+    instance = Loader()
+    monkeypatch.setattr(fraud_detector, "open_model", instance)
+    return instance
+
+
+def test_concurrent_callers_share_one_load(loader):
+    loader.delay = 0.2
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(fraud_detector.load_model())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.calls == 1
+    assert len(models) == 8 and all(model is models[0] for model in models)
+
+
+def test_failed_loads_are_retried_with_exponential_backoff(loader, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(fraud_detector, "time", clock)
+    monkeypatch.setattr(Config, "MODEL_LOAD_BACKOFF_SECONDS", 1.0)
+    monkeypatch.setattr(Config, "MODEL_LOAD_BACKOFF_MAX_SECONDS", 4.0)
+    loader.failures = 4
+
+    def attempt():
+        with pytest.raises(RuntimeError):
+            fraud_detector.load_model()
+        return loader.calls
+
+    assert attempt() == 1
+    # Each failure doubles the wait, up to the cap; callers inside it fail without touching the disk
+    for backoff, calls in ((1.0, 2), (2.0, 3), (4.0, 4)):
+        clock.now += backoff - 0.1
+        assert attempt() == calls - 1
+        assert fraud_detector.serving_state()["next_load_attempt_in_s"] == pytest.approx(0.1)
+        clock.now += 0.1
+        assert attempt() == calls
+    assert fraud_detector.serving_state()["load_failures"] == 4
+
+    clock.now += 4.0  # The cap, not 8s
+    assert fraud_detector.load_model() is not None and loader.calls == 5
+    assert fraud_detector.serving_state()["loaded"] and fraud_detector.serving_state()["last_error"] is None
+
+
+def test_readiness_is_503_until_the_warm_up_has_scored(client, loader, monkeypatch):
+    monkeypatch.setattr(Config, "MODEL_LOAD_BACKOFF_SECONDS", 0.01)
+    loader.failures = 2
+    statuses = []
+    score_rows_async = fraud_detector.score_rows_async
+
+    async def score_and_poll(raw):
+        statuses.append(client.get("/api/health/ready").status_code)  # Loaded, not warmed yet
+        return await score_rows_async(raw)
+
+    monkeypatch.setattr(fraud_detector, "score_rows_async", score_and_poll)
+    assert client.get("/api/health/ready").status_code == 503
+
+    asyncio.run(fraud_detector.warm_up_until_ready())
+
+    assert loader.calls == 3 and statuses == [503]
+    ready = client.get("/api/health/ready")
+    assert ready.status_code == 200
+    assert ready.json()["model"]["load_failures"] == 2 and ready.json()["model"]["warm_up_ms"] is not None
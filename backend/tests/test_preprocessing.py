@@ -0,0 +1,22 @@
+# backend/tests/test_preprocessing.py
+import numpy as np
+
+from backend.app.config import Config
+from backend.app.utils.preprocessing import FittedPreprocessor
+
+FEATURES = ["Time", "Amount", "type_code", "card_seconds_since_last", "card_txn_count_1h", "legacy_score"]
+
+
+def test_absent_features_get_the_training_fill_value_and_nulls_the_median():
+    preprocessor = FittedPreprocessor(FEATURES, mean=[0.0] * 6, scale=[1.0] * 6, median=[1, 2, 3, 4, 5, 6])
+    records = [
+        {"time": "10", "amount": 25.0},
+        {"time": "20", "amount": None},
+    ]
+
+    raw, errors = preprocessor.raw_matrix(records)
+    X = preprocessor.transform(raw)
+
+    assert errors == [None, None]
+    np.testing.assert_array_equal(X[0], [10.0, 25.0, 0.0, Config.VELOCITY_TTL_SECONDS, 0.0, 6.0])
+    np.testing.assert_array_equal(X[1], [20.0, 2.0, 0.0, Config.VELOCITY_TTL_SECONDS, 0.0, 6.0])
@@ -0,0 +1,65 @@
+# backend/tests/test_profiler.py
+import time
+import tracemalloc
+
+import numpy as np
+
+from backend.app.trainer.profiler import NullTrainingProfiler, TrainingProfiler, compare_profiles
+
+
+def stage(wall_seconds: float, peak_rss_mb: float) -> dict:
+    return {"wall_seconds": wall_seconds, "peak_rss_mb": peak_rss_mb}
+
+
+def test_stages_record_time_and_memory_in_the_order_they_ran():
+    profiler = TrainingProfiler(sample_interval=0.01)
+    with profiler.stage("sleep"):
+        time.sleep(0.1)
+    with profiler.stage("allocate"):
+        block = np.ones(64 * 1024 * 1024 // 8)  # 64 MB, every page touched, live when the stage ends
+    del block
+    profile = profiler.finish()
+
+    assert list(profile["stages"]) == ["sleep", "allocate"]
+    sleep, allocate = profile["stages"]["sleep"], profile["stages"]["allocate"]
+    assert sleep["wall_seconds"] >= 0.1 and sleep["cpu_seconds"] < 0.1
+    assert allocate["rss_growth_mb"] >= 48
+    assert allocate["peak_rss_mb"] >= allocate["rss_growth_mb"]
+    assert "top_allocations" not in allocate and not tracemalloc.is_tracing()
+    assert profile["max_rss_mb"] >= allocate["rss_growth_mb"]
+
+
+def test_traced_stages_list_the_lines_whose_allocations_are_still_live():
+    profiler = TrainingProfiler(trace_allocations=True)
+    with profiler.stage("allocate"):
+        kept = bytearray(4 * 1024 * 1024)  # Still referenced when the stage ends
+    profile = profiler.finish()
+
+    record = profile["stages"]["allocate"]
+    top = record["top_allocations"][0]
+    assert top["location"].rsplit(":", 1)[0].endswith("test_profiler.py")
+    assert top["size_mb"] >= 3.9 and record["traced_peak_mb"] >= 3.9
+    assert not tracemalloc.is_tracing()
+    del kept
+
+
+def test_regressions_need_both_the_relative_and_the_absolute_change():
+    previous = {"stages": {"fit": stage(10.0, 1000.0), "save": stage(0.1, 100.0)}}
+    current = {"stages": {
+        "fit": stage(13.0, 1100.0),  # 30% slower (flagged); 10% bigger (not)
+        "save": stage(0.5, 100.0),  # 5x slower but only 0.4s
+        "search": stage(100.0, 5000.0),  # Not in the previous run
+    }}
+
+    regressions = compare_profiles(current, previous, tolerance=0.2, min_seconds=1.0, min_mb=64.0)
+
+    assert regressions == [{"stage": "fit", "metric": "wall_seconds", "previous": 10.0, "current": 13.0,
+                            "change_pct": 30.0}]
+    assert compare_profiles(current, None) == []
+
+
+def test_the_null_profiler_runs_stages_without_a_profile():
+    profiler = NullTrainingProfiler()
+    with profiler.stage("fit"):
+        pass
+    assert profiler.finish() is None
@@ -0,0 +1,62 @@
+# backend/tests/test_replay.py
+import json
+
+import joblib
+import numpy as np
+
+from backend.app.model.replay import replay
+from backend.app.utils.audit_log import AuditLog
+from backend.app.utils.preprocessing import FittedPreprocessor
+
+
+def audit_traffic(directory: str, model, preprocessor: FittedPreprocessor, threshold: float, n: int = 200):
+    """Record `n` model decisions at `threshold` and two rule decisions, as serving would."""
+    rng = np.random.default_rng(3)
+    raw = np.column_stack([
+        rng.integers(0, 86400, n), rng.standard_normal(n), rng.standard_normal(n), rng.uniform(0, 1000, n),
+    ]).astype(np.float64)
+    probability = model.predict_proba(preprocessor.transform(raw))[:, 1]
+    log = AuditLog(directory)
+    log.record(raw, preprocessor.features, probability, (probability > threshold).astype(int), "1.0.0",
+               [f"txn-{i}" for i in range(n)], 1.0)
+    log.record(raw[:2], preprocessor.features, [np.nan, np.nan], [1, 0], "1.0.0", ["r-0", "r-1"], 1.0,
+               ["amount_threshold", "auto_approve_small_amount"])
+    log.close()
+    return probability
+
+
+def test_replay_leaves_rule_decisions_out_of_the_comparison(serving, tmp_path):
+    model = joblib.load(serving["pickle"])
+    with open(serving["metadata"]) as f:
+        preprocessor = FittedPreprocessor.from_dict(json.load(f)["scaler"])
+    probability = audit_traffic(str(tmp_path / "replay"), model, preprocessor, 0.5)
+
+    report = replay(str(tmp_path / "replay"), model, preprocessor, threshold=0.5)
+
+    assert report["records"] == len(probability)
+    assert report["flipped_to_blocked"] == report["flipped_to_approved"] == 0
+    assert report["old"]["blocked"] == report["new"]["blocked"] == int((probability > 0.5).sum())
+    assert report["rule_decided"] == {
+        "records": 2, "blocked": 1, "by_rule": {"amount_threshold": 1, "auto_approve_small_amount": 1},
+    }
+    assert sum(report["probability_histogram"]["old"]) == len(probability)
+
+
+def test_replay_decides_with_the_serving_thresholds_file_by_default(serving, tmp_path):
+    model = joblib.load(serving["pickle"])
+    with open(serving["metadata"]) as f:
+        preprocessor = FittedPreprocessor.from_dict(json.load(f)["scaler"])
+    with open(serving["thresholds"], "w") as f:
+        json.dump({"default": 0.9}, f)
+    probability = audit_traffic(str(tmp_path / "replay"), model, preprocessor, 0.9)
+    served_blocks = int((probability > 0.9).sum())
+    assert served_blocks < int((probability > 0.5).sum())  # the two thresholds disagree on this traffic
+
+    report = replay(str(tmp_path / "replay"), model, preprocessor, thresholds_path=serving["thresholds"])
+    assert report["threshold"] == 0.9
+    assert report["flipped_to_blocked"] == report["flipped_to_approved"] == 0
+    assert report["new"]["blocked"] == served_blocks
+
+    override = replay(str(tmp_path / "replay"), model, preprocessor, threshold=0.5,
+                      thresholds_path=serving["thresholds"])
+    assert override["flipped_to_blocked"] == int((probability > 0.5).sum()) - served_blocks
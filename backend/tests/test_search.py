@@ -0,0 +1,39 @@
+# backend/tests/test_search.py
+import numpy as np
+
+from backend.app.trainer import search
+from backend.app.trainer.search import share_matrix, successive_halving
+
+CANDIDATES = [
+    {"n_estimators": 5, "max_depth": 2, "min_samples_leaf": 1, "imbalance": "class_weight"},
+    {"n_estimators": 5, "max_depth": 6, "min_samples_leaf": 1, "imbalance": "class_weight"},
+    {"n_estimators": 5, "max_depth": None, "min_samples_leaf": 5, "imbalance": "class_weight"},
+]
+
+
+def test_the_shared_matrix_is_written_in_the_given_row_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "SHARE_BLOCK_ROWS", 7)
+    X = np.arange(60, dtype=np.float64).reshape(30, 2)
+    y = np.arange(30) % 2
+    rows = np.random.default_rng(0).permutation(30)
+
+    share_matrix(str(tmp_path), rows=rows, X=X, y=y)
+
+    shared = np.load(str(tmp_path / "X.npy"), mmap_mode="r")
+    assert shared.dtype == np.float32
+    np.testing.assert_array_equal(shared, X[rows])
+    np.testing.assert_array_equal(np.load(str(tmp_path / "y.npy")), y[rows])
+
+
+def test_successive_halving_ranks_candidates_in_started_workers(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((3000, 4)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * rng.standard_normal(3000) > 1.2).astype(int)
+
+    best, leaderboard = successive_halving(X, y, CANDIDATES, str(tmp_path / "search"), factor=3, max_workers=2)
+
+    assert sorted(r["candidate"] for r in leaderboard) == [0, 1, 2]
+    assert best == leaderboard[0]["params"]
+    assert leaderboard[0]["train_rows"] == 2400  # the last rung trains on the whole search-training split
+    assert leaderboard[0]["roc_auc"] > 0.8
+    assert not (tmp_path / "search").exists()
@@ -0,0 +1,116 @@
+# backend/tests/test_stream.py
+import asyncio
+import functools
+import threading
+import time
+
+import pytest
+
+from backend import server
+from backend.app.config import Config
+from backend.app.model.stream import ScoringStream, stream_stats
+
+STREAM_URL = "/api/predict/stream?token=fake-jwt-token-demo-only"
+
+
+def transaction(correlation_id: str, amount: float = 100.0) -> dict:
+    return {"id": correlation_id, "amount": amount, "time": "3600", "card_number": f"4111-{correlation_id}",
+            "merchant_id": "m", "card_type": "Visa", "location": "US", "transaction_id": correlation_id}
+
+
+def receive_results(websocket, n: int) -> dict:
+    """Read frames until `n` results have arrived; returns them by correlation id."""
+    results = {}
+    while len(results) < n:
+        for result in websocket.receive_json():
+            results[result["id"]] = result
+    return results
+
+
+def wait_for(condition, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def gated_scoring(monkeypatch):
+    """
+    Hold every stream batch until the returned event is set. Its `.started`
+    and `.scored` list the correlation ids of batches that began and finished scoring.
+    """
+    gate = threading.Event()
+    gate.started, gate.scored = [], []
+    score_transactions = server.score_transactions
+
+    async def score(rows):
+        ids = [row.get("id") if isinstance(row, dict) else None for row in rows]
+        gate.started.append(ids)
+        deadline = time.monotonic() + 10
+        while not gate.is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(0.005)
+        results = await score_transactions(rows)
+        gate.scored.append(ids)
+        return results
+
+    monkeypatch.setattr(server, "score_transactions", score)
+    monkeypatch.setattr(server, "ScoringStream", functools.partial(ScoringStream, credit=2))
+    return gate
+
+
+def test_rows_beyond_the_credit_are_rejected_until_results_return_it(client, gated_scoring):
+    with client.websocket_connect(STREAM_URL) as websocket:
+        assert websocket.receive_json() == {"type": "hello", "credit": 2}
+
+        websocket.send_json([transaction("a", 900.0), transaction("b"), transaction("c")])
+        rejected = websocket.receive_json()
+        assert [(r["id"], r["error"]) for r in rejected] == [("c", "credit_exceeded")]
+
+        gated_scoring.set()
+        results = receive_results(websocket, 2)
+        assert results["a"]["status"] == "blocked" and results["b"]["status"] == "approved"
+
+        # Sending the results gave both credits back
+        websocket.send_json([transaction("d"), transaction("e")])
+        results = receive_results(websocket, 2)
+        assert {r["status"] for r in results.values()} == {"approved"}
+
+
+def test_malformed_frames_get_an_error_row_and_the_stream_keeps_going(client, gated_scoring):
+    gated_scoring.set()
+    with client.websocket_connect(STREAM_URL) as websocket:
+        websocket.receive_json()
+
+        websocket.send_text("{not json")
+        [bad_json] = websocket.receive_json()
+        assert bad_json["id"] is None and bad_json["error"].startswith("Invalid JSON message")
+
+        websocket.send_bytes(b"\xff\xfe")
+        [bad_bytes] = websocket.receive_json()
+        assert bad_bytes["error"].startswith("Invalid JSON message")
+
+        websocket.send_json([{"id": "x", "amount": "lots"}, "not an object"])
+        results = websocket.receive_json()
+        assert [(r["id"], r["status"]) for r in results] == [("x", "error"), (None, "error")]
+        assert results[1]["error"] == "Row is not a JSON object"
+
+        # Error rows returned their credit too
+        websocket.send_json([transaction("ok-1"), transaction("ok-2")])
+        assert {r["status"] for r in receive_results(websocket, 2).values()} == {"approved"}
+
+
+def test_disconnecting_lets_batches_in_flight_finish_and_closes_the_stream(client, gated_scoring, monkeypatch):
+    monkeypatch.setattr(Config, "MODEL_WATCH_ENABLED", False)
+    monkeypatch.setattr(server, "stop_logging", lambda: None)  # Other tests keep logging after this app's shutdown
+    open_before = stream_stats()["open"]
+    with client:  # One event loop for the whole test, like a server's, so batches can outlive their connection
+        with client.websocket_connect(STREAM_URL) as websocket:
+            websocket.receive_json()
+            websocket.send_json([transaction("a"), transaction("b")])
+            wait_for(lambda: gated_scoring.started)
+        # The client is gone and its handler cancelled; the batch is still scoring
+        assert stream_stats()["open"] == open_before and gated_scoring.scored == []
+
+        gated_scoring.set()
+        wait_for(lambda: gated_scoring.scored)
+        assert gated_scoring.scored == [["a", "b"]]
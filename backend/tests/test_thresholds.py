@@ -0,0 +1,65 @@
+# backend/tests/test_thresholds.py
+import json
+import os
+
+import numpy as np
+import pytest
+
+from backend.app.model.thresholds import ThresholdPolicy, parse_thresholds
+
+TABLE = {
+    "default": 0.7,
+    "merchant_category": {"Gambling": 0.4},
+    "card_type": {"prepaid": 0.5},
+}
+RECORDS = [
+    {"merchant_category": "gambling", "card_type": "Prepaid"},
+    {"merchant_category": "grocery", "card_type": "PREPAID"},
+    {"merchant_category": None, "card_type": "Visa"},
+    {},
+]
+
+
+def write(path, table):
+    with open(path, "w") as f:
+        json.dump(table, f)
+
+
+def test_thresholds_come_from_the_file_most_specific_segment_first(tmp_path):
+    path = str(tmp_path / "thresholds.json")
+    write(path, TABLE)
+    policy = ThresholdPolicy(path, default=0.82)
+
+    assert [policy.threshold(r) for r in RECORDS] == [0.4, 0.5, 0.7, 0.7]
+    assert policy.thresholds(RECORDS).tolist() == [0.4, 0.5, 0.7, 0.7]
+    columns = {field: [r.get(field) for r in RECORDS] for field in ("merchant_category", "card_type")}
+    np.testing.assert_array_equal(policy.column_thresholds(columns, len(RECORDS)), [0.4, 0.5, 0.7, 0.7])
+
+
+def test_missing_file_falls_back_to_ml_threshold(tmp_path):
+    policy = ThresholdPolicy(str(tmp_path / "missing.json"), default=0.82)
+    assert policy.threshold({"card_type": "prepaid"}) == 0.82
+    assert policy.stats()["loaded_from_file"] is False
+
+
+def test_edits_are_picked_up_and_invalid_files_keep_the_previous_table(tmp_path):
+    path = str(tmp_path / "thresholds.json")
+    write(path, TABLE)
+    policy = ThresholdPolicy(path, default=0.82, reload_seconds=0.0)
+
+    write(path, {"default": 0.9})
+    os.utime(path, (1, 1))  # a distinct mtime, however fast the test runs
+    assert policy.threshold({}) == 0.9
+
+    write(path, {"default": 1.5})
+    os.utime(path, (2, 2))
+    assert policy.threshold({}) == 0.9
+    assert policy.reload_errors == 1
+
+    os.remove(path)
+    assert policy.threshold({}) == 0.82
+
+
+def test_out_of_range_thresholds_are_rejected():
+    with pytest.raises(ValueError):
+        parse_thresholds({"card_type": {"visa": -0.1}}, 0.5)
@@ -0,0 +1,94 @@
+# backend/tests/test_validator.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.app.utils.validator import CompiledSchema, check_target
+
+COLUMNS = ["Time", "Amount", "Class", "type"]
+VALID = {"Time": 1, "Amount": 5.0, "Class": 0, "type": "CASH_IN"}
+RECORDS = [
+    VALID,
+    {**VALID, "Time": "abc"},
+    {**VALID, "Amount": -1.0},
+    {**VALID, "Class": 2},
+    {**VALID, "Time": None},
+    {**VALID, "Amount": float("inf")},
+    {**VALID, "type": None},
+    {**VALID, "Time": "12.5"},  # Numeric text is fine
+    {**VALID, "Time": "abc", "Amount": -1.0},  # The first failing column is reported
+    {**VALID, "Class": "x"},  # A dtype error, not also a range error
+]
+ERRORS = [
+    None,
+    "Invalid value for 'Time'",
+    "Out-of-range value for 'Amount'",
+    "Out-of-range value for 'Class'",
+    "Missing value for 'Time'",
+    "Out-of-range value for 'Amount'",
+    "Missing value for 'type'",
+    None,
+    "Invalid value for 'Time'",
+    "Invalid value for 'Class'",
+]
+
+
+@pytest.mark.parametrize("as_frame", [False, True], ids=["records", "dataframe"])
+def test_bad_dtypes_nulls_and_out_of_range_values_are_rejected_per_row(as_frame):
+    schema = CompiledSchema("test", COLUMNS)
+    data = pd.DataFrame(RECORDS) if as_frame else RECORDS
+
+    result = schema.validate(data)
+
+    assert result.missing_columns == []
+    assert [result.row_error(i) for i in range(len(RECORDS))] == ERRORS
+    np.testing.assert_array_equal(result.invalid, [error is not None for error in ERRORS])
+    assert result.counts == {
+        "Time": {"dtype": 2, "null": 1},
+        "Amount": {"range": 3},
+        "Class": {"range": 1, "dtype": 1},
+        "type": {"null": 1},
+    }
+
+
+def test_matrices_are_checked_without_a_dtype_pass():
+    schema = CompiledSchema("test", ["Time", "Amount", "Class"])
+    matrix = np.array([
+        [1.0, 5.0, 0.0],
+        [np.nan, 5.0, 1.0],
+        [1.0, np.inf, 0.0],
+        [np.inf, 5.0, 0.0],
+        [1.0, -0.5, 0.0],
+        [1.0, 5.0, 0.5],
+    ])
+
+    result = schema.validate(matrix)
+
+    assert [result.row_error(i) for i in range(len(matrix))] == [
+        None,
+        "Missing value for 'Time'",
+        "Out-of-range value for 'Amount'",
+        "Out-of-range value for 'Time'",
+        "Out-of-range value for 'Amount'",
+        "Out-of-range value for 'Class'",
+    ]
+    assert schema.validate(matrix[:, :2], columns=["Time", "Amount"]).missing_columns == ["Class"]
+
+
+def test_nulls_only_reject_rows_when_the_schema_forbids_them():
+    records = [{"Time": None, "Amount": 5.0}, {"Time": 1, "Amount": -5.0}]
+
+    lenient = CompiledSchema("test", ["Time", "Amount"], allow_null=True).validate(records)
+
+    assert [lenient.row_error(i) for i in range(2)] == [None, "Out-of-range value for 'Amount'"]
+    assert lenient.counts["Time"] == {"null": 1}
+
+
+def test_a_non_binary_target_fails_the_dataset():
+    schema = CompiledSchema("test", COLUMNS)
+    check_target(schema.validate([VALID]), "test.csv")
+
+    with pytest.raises(ValueError, match="must be binary"):
+        check_target(schema.validate([VALID, {**VALID, "Class": 2}]), "test.csv")
+    with pytest.raises(ValueError, match="not found"):
+        check_target(schema.validate([{"Time": 1}]), "test.csv")
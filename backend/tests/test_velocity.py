@@ -0,0 +1,94 @@
+# backend/tests/test_velocity.py
+import random
+
+import pytest
+
+from backend.app.model.velocity import VELOCITY_FEATURES, WINDOWS, VelocityStore
+
+
+def brute_force(history: list, ttl_seconds: float, merchant_slots: int) -> list:
+    """Recompute every event's features from the full, time-ordered history of its card."""
+    rows = []
+    for index, (key, timestamp, amount, merchant, location) in enumerate(history):
+        past = [event for event in history[:index] if event[0] == key]
+        seconds = int(timestamp)
+        features = []
+        for _, window, n_buckets in WINDOWS:
+            width = window // n_buckets
+            oldest_bucket = seconds // width - n_buckets + 1
+            in_window = [event[2] for event in past if int(event[1]) // width >= oldest_bucket] + [amount]
+            features += [len(in_window), sum(in_window)]
+
+        last_seen = {}
+        for event in past + [history[index]]:
+            if event[3] is not None:
+                last_seen[event[3]] = int(event[1])
+        recent = sum(1 for t in last_seen.values() if t > seconds - 86400)
+        features.append(min(recent, merchant_slots))
+
+        locations = [event[4] for event in past if event[4] is not None]
+        features.append(int(location is not None and bool(locations) and locations[-1] != location))
+
+        elapsed = timestamp - past[-1][1] if past else ttl_seconds
+        features.append(min(elapsed, ttl_seconds) if elapsed > 0 else 0.0)
+        rows.append(features)
+    return rows
+
+
+def random_history(seed: int, n: int = 1500) -> list:
+    rng = random.Random(seed)
+    history, timestamp = [], 0.0
+    for _ in range(n):
+        # Mostly bursts of seconds, sometimes minutes, hours or most of a day apart
+        timestamp += rng.choice([rng.uniform(0, 15), rng.uniform(0, 600), rng.uniform(0, 7200), rng.uniform(0, 80000)])
+        history.append((
+            f"card{rng.randrange(4)}",
+            timestamp,
+            round(rng.uniform(1, 500), 2),
+            rng.choice([None, *(f"merchant{i}" for i in range(12))]),
+            rng.choice([None, "US", "FR", "BR"]),
+        ))
+    return history
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_features_match_a_brute_force_recount_of_the_history(seed):
+    history = random_history(seed)
+    store = VelocityStore(capacity=16, ttl_seconds=3600, merchant_slots=4)
+
+    actual = [store.update(*event) for event in history]
+    expected = brute_force(history, ttl_seconds=3600, merchant_slots=4)
+
+    assert store.evictions == 0
+    for event, got, want in zip(history, actual, expected):
+        assert got == pytest.approx(want, abs=1e-3), (event, dict(zip(VELOCITY_FEATURES, zip(got, want))))
+
+
+def test_buckets_expire_at_their_resolution():
+    store = VelocityStore(capacity=4)
+    store.update("card", 9.9, 10.0)
+    one_minute = VELOCITY_FEATURES.index("card_txn_count_1m")
+
+    assert store.update("card", 59.9, 1.0)[one_minute] == 2
+    assert store.update("card", 60, 1.0)[one_minute] == 2  # The 0-10s bucket slid out after 50.1s
+    assert store.update("card", 200, 1.0)[one_minute] == 1
+
+
+def test_full_stores_evict_idle_cards_then_the_least_recently_seen():
+    store = VelocityStore(capacity=3, ttl_seconds=100)
+    store.update("a", 0, 5.0, "m1", "US")
+    store.update("b", 10, 5.0)
+    store.update("c", 20, 5.0)
+
+    store.update("d", 50, 5.0)  # Nobody is idle past the TTL: the least recently seen card goes
+    assert sorted(store._slots) == ["b", "c", "d"] and store.evictions == 1
+
+    features = dict(zip(VELOCITY_FEATURES, store.update("a", 60, 7.0, "m2", "FR")))
+    assert sorted(store._slots) == ["a", "c", "d"] and store.evictions == 2
+    assert features["card_txn_count_24h"] == 1 and features["card_amount_24h"] == 7.0
+    assert features["card_distinct_merchants_24h"] == 1
+    assert features["card_location_changed"] == 0
+    assert features["card_seconds_since_last"] == 100
+
+    store.update("e", 300, 5.0)  # Every card is idle past the TTL
+    assert list(store._slots) == ["e"] and store.evictions == 5
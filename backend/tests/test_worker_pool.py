@@ -0,0 +1,41 @@
+# backend/tests/test_worker_pool.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.app.model import fraud_detector
+from backend.app.model.worker_pool import ScoringPool, ScoringPoolFull
+
+
+def serving_model_type(_) -> str:
+    return type(fraud_detector._model).__name__
+
+
+def test_process_workers_are_not_forked_and_score_like_the_api_process(serving):
+    pool = ScoringPool(
+        fraud_detector.score_rows, mode="process", size=1,
+        preload=fraud_detector.load_serving_state, initializer=fraud_detector.init_scoring_worker,
+    )
+    raw = np.array([[3600.0, 0.0, 0.0, 900.0], [3600.0, 0.0, 0.0, 100.0], [np.nan] * 4])
+    large = np.random.default_rng(0).uniform(0, 1000, (2000, 4))
+    try:
+        in_worker = asyncio.run(pool.run(raw))
+        large_in_worker = asyncio.run(pool.run(large))
+        assert pool._executor._mp_context.get_start_method() != "fork"
+        pool.fn = serving_model_type
+        # The pickled forest was compiled once here; workers only map its arrays
+        assert asyncio.run(pool.run(None)) == "CompiledForest"
+    finally:
+        pool.shutdown()
+
+    np.testing.assert_allclose(in_worker, fraud_detector.score_rows(raw))
+    np.testing.assert_allclose(large_in_worker, fraud_detector.score_rows(large), atol=1e-12)
+    assert in_worker[0] > 0.5 > in_worker[1]
+
+
+def test_a_full_pool_rejects_instead_of_queueing():
+    pool = ScoringPool(lambda: None, mode="thread", size=1, max_pending=0)
+    with pytest.raises(ScoringPoolFull):
+        asyncio.run(pool.run())
+    assert pool.rejected == 1
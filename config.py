@@ -22,7 +22,9 @@ RULES_CONFIG = {
     "allowed_countries": ["US", "CA", "GB", "DE", "FR"],
     "high_risk_countries": ["RU", "CN", "NG", "IR", "KP"],
     "geo_check": True,
-    "device_check": True
+    "device_check": True,
+    "auto_approve_amount": 20,        # USD; approved without the model in allowed countries...
+    "auto_approve_max_hourly_txns": 3 # ...unless the card has more transactions in the last hour
 }
 
 # === Model Configuration ===
@@ -0,0 +1,2 @@
+# conftest.py
+# Lets a plain `pytest` run import `backend.app...` and the root `config` module the way the server does.